@@ -13,6 +13,18 @@ from .demo_database import (
     DEMO_COLLECTIONS,
     DEMO_DB_SUFFIX,
 )
+from .projections import build_projection, PROJECTION_FIELDS, PROJECTION_SHAPES
+from .delta_sync import changes_since, record_tombstone, record_tombstones, UPDATED_AT_FIELDS
+from .bulk_converts import bulk_create_converts, bulk_update_converts, bulk_delete_converts
+from .exports import stream_export, EXPORT_BATCH_SIZE
+from .workflow_store import load_workflow_state, save_workflow_batch
+from .sequence_store import load_sequence_state, save_sequence_batch
+from .playbook_store import load_playbook_state, save_playbook_batch
+from .sms_store import save_sms_logs
+from .dialer_store import load_dialer_state
+from .campaign_segments import segment_query, resolve_segment
+from .call_search import search_calls
+from .call_analytics_store import save_call_analytics_state, load_call_analytics_states
 
 __all__ = [
     "get_demo_database",
@@ -24,4 +36,29 @@ __all__ = [
     "get_demo_stats",
     "DEMO_COLLECTIONS",
     "DEMO_DB_SUFFIX",
+    "build_projection",
+    "PROJECTION_FIELDS",
+    "PROJECTION_SHAPES",
+    "changes_since",
+    "record_tombstone",
+    "record_tombstones",
+    "UPDATED_AT_FIELDS",
+    "bulk_create_converts",
+    "bulk_update_converts",
+    "bulk_delete_converts",
+    "stream_export",
+    "EXPORT_BATCH_SIZE",
+    "load_workflow_state",
+    "save_workflow_batch",
+    "load_sequence_state",
+    "save_sequence_batch",
+    "load_playbook_state",
+    "save_playbook_batch",
+    "save_sms_logs",
+    "load_dialer_state",
+    "segment_query",
+    "resolve_segment",
+    "search_calls",
+    "save_call_analytics_state",
+    "load_call_analytics_states",
 ]
@@ -0,0 +1,102 @@
+"""
+Mongo Bulk Writes for Converts
+The Mongo counterpart of the standalone server's /converts/bulk endpoints:
+one unordered bulk_write per request, with per-item results mapped back
+from the write errors.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from .delta_sync import record_tombstones
+
+
+async def _bulk_write(collection, operations: List[Any]) -> Dict[int, str]:
+    """Run operations unordered; return error messages by operation index."""
+    if not operations:
+        return {}
+    try:
+        await collection.bulk_write(operations, ordered=False)
+    except BulkWriteError as e:
+        return {error["index"]: error.get("errmsg", "Write failed") for error in e.details.get("writeErrors", [])}
+    return {}
+
+
+async def bulk_create_converts(
+    db: AsyncIOMotorDatabase,
+    converts: List[Dict[str, Any]],
+    created_by: str,
+) -> List[Dict[str, Any]]:
+    """Insert already-validated convert documents; returns one result per document.
+
+    Usage in a router:
+        valid = [ConvertCreate.model_validate(item).model_dump(mode="json") for item in items]
+        results = await bulk_create_converts(db, valid, current_user.id)
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    documents = [
+        dict(convert, id=str(uuid.uuid4()), created_at=now, updated_at=now, created_by=created_by)
+        for convert in converts
+    ]
+    errors = await _bulk_write(db.converts, [InsertOne(document) for document in documents])
+
+    return [
+        {"index": index, "id": document["id"], "status": "error", "error": errors[index]}
+        if index in errors else
+        {"index": index, "id": document["id"], "status": "created"}
+        for index, document in enumerate(documents)
+    ]
+
+
+async def bulk_update_converts(
+    db: AsyncIOMotorDatabase,
+    updates: List[Dict[str, Any]],
+) -> List[Dict[str, Any]]:
+    """Apply partial updates, each a dict with the convert "id" and the fields to set."""
+    now = datetime.now(timezone.utc).isoformat()
+    ids = [update["id"] for update in updates]
+    operations = [
+        UpdateOne(
+            {"id": update["id"]},
+            {"$set": dict({key: value for key, value in update.items() if key != "id"}, updated_at=now)},
+        )
+        for update in updates
+    ]
+    errors = await _bulk_write(db.converts, operations)
+
+    # bulk_write only reports counts for matches, so look up which ids exist
+    found = {doc["id"] async for doc in db.converts.find({"id": {"$in": ids}}, {"_id": 0, "id": 1})}
+    results = []
+    for index, convert_id in enumerate(ids):
+        if index in errors:
+            results.append({"index": index, "id": convert_id, "status": "error", "error": errors[index]})
+        elif convert_id not in found:
+            results.append({"index": index, "id": convert_id, "status": "error", "error": "Convert not found"})
+        else:
+            results.append({"index": index, "id": convert_id, "status": "updated"})
+    return results
+
+
+async def bulk_delete_converts(db: AsyncIOMotorDatabase, ids: List[str]) -> List[Dict[str, Any]]:
+    """Delete converts by id, leaving delta sync tombstones for the ones that existed."""
+    found = {doc["id"] async for doc in db.converts.find({"id": {"$in": ids}}, {"_id": 0, "id": 1})}
+    errors = await _bulk_write(db.converts, [DeleteOne({"id": convert_id}) for convert_id in ids])
+
+    results = []
+    deleted = []
+    for index, convert_id in enumerate(ids):
+        if index in errors:
+            results.append({"index": index, "id": convert_id, "status": "error", "error": errors[index]})
+        elif convert_id not in found:
+            results.append({"index": index, "id": convert_id, "status": "error", "error": "Convert not found"})
+        else:
+            deleted.append(convert_id)
+            results.append({"index": index, "id": convert_id, "status": "deleted"})
+
+    await record_tombstones(db, "converts", deleted)
+    return results
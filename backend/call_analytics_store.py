@@ -0,0 +1,29 @@
+"""
+Mongo Storage for Voice Call Analytics
+Each worker process publishes the to_dict() state of its call rollups
+under its own id; any process can load them all and merge them with
+CallAnalytics.merged, since the sketches and counts add exactly.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+
+async def save_call_analytics_state(db: AsyncIOMotorDatabase, worker_id: str, state: Dict[str, Any]):
+    """Replace this worker's published rollups.
+
+    Usage on a timer in each worker:
+        await save_call_analytics_state(db, worker_id, call_analytics.to_dict())
+    """
+    await db.voice_call_rollups.replace_one(
+        {"id": worker_id},
+        {"id": worker_id, "state": state, "updated_at": datetime.now(timezone.utc).isoformat()},
+        upsert=True,
+    )
+
+
+async def load_call_analytics_states(db: AsyncIOMotorDatabase) -> List[Dict[str, Any]]:
+    """Every worker's published rollups, ready for CallAnalytics.merged."""
+    return [record["state"] async for record in db.voice_call_rollups.find({}, {"_id": 0, "state": 1})]
@@ -0,0 +1,44 @@
+"""
+Voice Call Search for Mongo
+Full-text search over voice call transcripts and notes through the
+voice_calls $text index (notes weighted above transcripts), ranked by
+text score. Mongo's text search stems words but has no prefix matching,
+so "bapt*" is searched as "bapt".
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+
+async def search_calls(
+    db: AsyncIOMotorDatabase,
+    query: str,
+    limit: int = 20,
+    offset: int = 0,
+    status: Optional[str] = None,
+    client_id: Optional[str] = None,
+    match_all: bool = True,
+) -> Tuple[int, List[Dict[str, Any]]]:
+    """Total matches and one page of calls, best match first, each with its "score".
+
+    With match_all every word must occur; $text matches any of them, so
+    the words are quoted as phrases, which $text ANDs together.
+    """
+    words = [word.rstrip("*") for word in query.split() if word.rstrip("*")]
+    if not words:
+        return 0, []
+    search = " ".join(f'"{word}"' for word in words) if match_all else " ".join(words)
+    criteria: Dict[str, Any] = {"$text": {"$search": search}}
+    if status:
+        criteria["status"] = status
+    if client_id:
+        criteria["client_id"] = client_id
+    total = await db.voice_calls.count_documents(criteria)
+    cursor = (
+        db.voice_calls.find(criteria, {"_id": 0, "score": {"$meta": "textScore"}})
+        .sort([("score", {"$meta": "textScore"})])
+        .skip(offset)
+        .limit(limit)
+    )
+    return total, await cursor.to_list(limit)
@@ -0,0 +1,75 @@
+"""
+Campaign Segment Resolution for Mongo
+Turns a voice campaign's segment filter into queries the indexes answer:
+health score ranges on health_scores (client_id, score), stage and worker
+on converts, and last call outcome from each convert's latest ended call.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+UNASSIGNED = "unassigned"
+NEVER_CALLED = "none"
+
+ENDED_STATUSES = ["completed", "voicemail", "no_answer", "failed"]
+
+
+def _as_list(value) -> List[Any]:
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+def segment_query(segment: Dict[str, Any], client_id: Optional[str] = None) -> Dict[str, Any]:
+    """Converts filter for the stage and assigned worker parts of a segment."""
+    query: Dict[str, Any] = {}
+    if client_id:
+        query["client_id"] = client_id
+    if segment.get("stage") is not None:
+        query["stage"] = {"$in": _as_list(segment["stage"])}
+    if segment.get("assigned_worker_id") is not None:
+        query["assigned_worker_id"] = {
+            "$in": [None if w == UNASSIGNED else w for w in _as_list(segment["assigned_worker_id"])]
+        }
+    return query
+
+
+async def last_call_outcomes(db: AsyncIOMotorDatabase, convert_ids: List[str]) -> Dict[str, str]:
+    """Convert id -> outcome (or end status) of its latest ended call."""
+    pipeline = [
+        {"$match": {"convert_id": {"$in": convert_ids}, "status": {"$in": ENDED_STATUSES}}},
+        {"$sort": {"convert_id": 1, "ended_at": -1}},
+        {"$group": {"_id": "$convert_id", "outcome": {"$first": {"$ifNull": ["$outcome", "$status"]}}}},
+    ]
+    return {row["_id"]: row["outcome"] async for row in db.voice_calls.aggregate(pipeline)}
+
+
+async def resolve_segment(
+    db: AsyncIOMotorDatabase,
+    segment: Dict[str, Any],
+    client_id: Optional[str] = None,
+) -> List[str]:
+    """Ids of converts in a segment; lowest health score first when the segment has a score range."""
+    query = segment_query(segment, client_id)
+    ordered: Optional[List[str]] = None
+    low, high = segment.get("min_health_score"), segment.get("max_health_score")
+    if low is not None or high is not None:
+        score: Dict[str, Any] = {}
+        if low is not None:
+            score["$gte"] = low
+        if high is not None:
+            score["$lte"] = high
+        criteria: Dict[str, Any] = {"score": score}
+        if client_id:
+            criteria["client_id"] = client_id
+        cursor = db.health_scores.find(criteria, {"_id": 0, "convert_id": 1}).sort("score", 1)
+        ordered = list(dict.fromkeys([row["convert_id"] async for row in cursor]))
+        query["id"] = {"$in": ordered}
+
+    matched = {convert["id"] async for convert in db.converts.find(query, {"_id": 0, "id": 1})}
+    convert_ids = [convert_id for convert_id in ordered if convert_id in matched] if ordered is not None else list(matched)
+    outcomes = segment.get("last_call_outcome")
+    if outcomes is None or not convert_ids:
+        return convert_ids
+    wanted = set(_as_list(outcomes))
+    last = await last_call_outcomes(db, convert_ids)
+    return [convert_id for convert_id in convert_ids if last.get(convert_id, NEVER_CALLED) in wanted]
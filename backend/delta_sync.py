@@ -0,0 +1,94 @@
+"""
+Mongo Delta Sync Helpers
+Serve ``?since=`` requests from the ``updated_at`` indexes: records whose
+timestamp is newer than the client's token, plus tombstones recorded when
+records are deleted.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+
+# Seconds before the client's token that each pull reads again, for writes that commit late
+SYNC_OVERLAP_SECONDS = 5.0
+
+# Field each collection's delta queries are ordered on (all indexed in create_demo_indexes)
+UPDATED_AT_FIELDS = {
+    "converts": "updated_at",
+    "alerts": "updated_at",
+    "voice_calls": "updated_at",
+    "health_scores": "calculated_at",
+}
+
+
+async def record_tombstone(db: AsyncIOMotorDatabase, collection: str, record_id: str):
+    """Remember a delete so delta sync can tell clients to drop the record."""
+    await record_tombstones(db, collection, [record_id])
+
+
+async def record_tombstones(db: AsyncIOMotorDatabase, collection: str, record_ids: List[str]):
+    """record_tombstone for a batch of deletes, in one insert."""
+    if not record_ids:
+        return
+    now = datetime.now(timezone.utc).isoformat()
+    await db.tombstones.insert_many([
+        {"collection": collection, "id": record_id, "deleted_at": now}
+        for record_id in record_ids
+    ])
+
+
+async def changes_since(
+    db: AsyncIOMotorDatabase,
+    collection: str,
+    since: Optional[str],
+    query: Optional[Dict[str, Any]] = None,
+    projection: Optional[Dict[str, int]] = None,
+) -> Dict[str, Any]:
+    """Records of a collection changed after ``since`` (an ISO timestamp token).
+    
+    Usage in a router:
+        return await changes_since(db, "converts", since, {"stage": stage}, build_projection("converts", fields))
+    
+    The returned token is the newest timestamp actually read, to pass back
+    as ``since``. Each pull re-reads the SYNC_OVERLAP_SECONDS before the
+    token, so a write that commits late with an earlier timestamp is still
+    picked up; clients upsert by id, so re-sent records are harmless.
+    An empty ``since`` returns every matching record with ``full`` set.
+    """
+    field = UPDATED_AT_FIELDS[collection]
+    criteria = dict(query or {})
+    lower = None
+    if since:
+        lower = (_parse(since) - timedelta(seconds=SYNC_OVERLAP_SECONDS)).isoformat()
+        criteria[field] = {"$gte": lower}
+    if projection and any(projection.get(key) for key in projection if key != "_id"):
+        # The token is read from the records, so an inclusion projection must keep the field
+        projection = dict(projection, **{field: 1})
+    
+    changed: List[Dict[str, Any]] = await db[collection].find(
+        criteria, projection or {"_id": 0}
+    ).sort(field, 1).to_list(None)
+    
+    deleted: List[str] = []
+    newest = [record[field] for record in changed[-1:] if record.get(field)]
+    if since:
+        cursor = db.tombstones.find(
+            {"collection": collection, "deleted_at": {"$gte": lower}},
+            {"_id": 0, "id": 1, "deleted_at": 1},
+        ).sort("deleted_at", 1)
+        tombstones = await cursor.to_list(None)
+        # A record re-created after its delete is in changed; don't tell the client to drop it
+        changed_ids = {record.get("id") for record in changed}
+        deleted = [record_id for record_id in dict.fromkeys(t["id"] for t in tombstones) if record_id not in changed_ids]
+        newest += [t["deleted_at"] for t in tombstones[-1:]]
+        newest.append(since)
+    token = max(newest) if newest else datetime.now(timezone.utc).isoformat()
+    
+    return {"token": token, "full": not since, "changed": changed, "deleted": deleted}
+
+
+def _parse(token: str) -> datetime:
+    parsed = datetime.fromisoformat(token.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
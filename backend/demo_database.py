@@ -4,7 +4,7 @@ Connects to a separate demo database with 'demo_' prefix.
 """
 
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
-from typing import Optional
+from typing import Any, Dict, Optional
 import os
 from dotenv import load_dotenv
 
@@ -129,12 +129,14 @@ DEMO_COLLECTIONS = {
     "sms_settings": "sms_settings",
     "sms_campaigns": "sms_campaigns",
     "voice_calls": "voice_calls",
+    "voice_campaigns": "voice_campaigns",
     "call_scripts": "call_scripts",
     
     # Analytics
     "analytics_events": "analytics_events",
     "reports": "reports",
     "dashboards": "dashboards",
+    "voice_call_rollups": "voice_call_rollups",
     
     # RBAC
     "roles": "roles",
@@ -165,6 +167,9 @@ DEMO_COLLECTIONS = {
     # Demo-specific
     "demo_metadata": "demo_metadata",
     "demo_reset_log": "demo_reset_log",
+    
+    # Delta sync
+    "tombstones": "tombstones",
 }
 
 
@@ -190,6 +195,7 @@ async def create_demo_indexes(db: AsyncIOMotorDatabase):
     await db.converts.create_index("assigned_worker_id")
     await db.converts.create_index("stage")
     await db.converts.create_index("created_at")
+    await db.converts.create_index("updated_at")
     await db.converts.create_index([("client_id", 1), ("stage", 1)])
     await db.converts.create_index([("first_name", "text"), ("last_name", "text")])
     
@@ -209,6 +215,8 @@ async def create_demo_indexes(db: AsyncIOMotorDatabase):
     await db.workflow_definitions.create_index("id", unique=True)
     await db.workflow_executions.create_index("workflow_id")
     await db.workflow_executions.create_index("convert_id")
+    await db.workflow_executions.create_index("id", unique=True)
+    await db.workflow_executions.create_index([("status", 1), ("next_run_at", 1)])
     await db.followup_tasks.create_index("assignee_id")
     await db.followup_tasks.create_index("convert_id")
     await db.followup_tasks.create_index("due_date")
@@ -216,20 +224,45 @@ async def create_demo_indexes(db: AsyncIOMotorDatabase):
     # Sequences and Playbooks
     await db.sequence_definitions.create_index("id", unique=True)
     await db.sequence_executions.create_index("convert_id")
+    await db.sequence_executions.create_index("id", unique=True)
+    await db.sequence_executions.create_index([("sequence_id", 1), ("status", 1)])
     await db.playbooks.create_index("id", unique=True)
     await db.playbook_executions.create_index("convert_id")
+    await db.playbook_executions.create_index("id", unique=True)
+    await db.playbook_executions.create_index([("playbook_id", 1), ("status", 1)])
     
     # Health Score and Alerts
     await db.health_scores.create_index("convert_id")
     await db.health_scores.create_index([("client_id", 1), ("score", 1)])
+    await db.health_scores.create_index("calculated_at")
     await db.alerts.create_index("convert_id")
     await db.alerts.create_index("assigned_to")
     await db.alerts.create_index("status")
+    await db.alerts.create_index("updated_at")
+    await db.alerts.create_index([("convert_id", 1), ("rule_id", 1), ("status", 1)])
+    await db.alert_rules.create_index([("client_id", 1), ("id", 1)], unique=True)
     
     # Communications
     await db.sms_logs.create_index("convert_id")
     await db.sms_logs.create_index("created_at")
+    await db.sms_logs.create_index("id", unique=True)
+    await db.sms_logs.create_index([("status", 1), ("created_at", 1)])
     await db.voice_calls.create_index("convert_id")
+    await db.voice_calls.create_index("updated_at")
+    await db.voice_calls.create_index([("status", 1), ("scheduled_time", 1)])
+    await db.voice_calls.create_index([("convert_id", 1), ("ended_at", -1)])
+    await db.voice_calls.create_index("campaign_id")
+    await db.voice_calls.create_index(
+        [("transcript", "text"), ("notes", "text")],
+        # Notes are written by workers and say more per word than a transcript
+        weights={"transcript": 1, "notes": 2},
+        name="voice_calls_text",
+    )
+    await db.voice_campaigns.create_index("id", unique=True)
+    await db.voice_call_rollups.create_index("id", unique=True)
+    
+    # Delta sync tombstones
+    await db.tombstones.create_index([("collection", 1), ("deleted_at", 1)])
     
     # Analytics and Audit
     await db.audit_logs.create_index("user_id")
@@ -5,6 +5,7 @@ A lightweight FastAPI server configured specifically for demo mode.
 
 from fastapi import FastAPI, APIRouter, HTTPException, status, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
@@ -86,6 +87,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON payloads (convert and health-score lists)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
 # Create API router
 api_router = APIRouter(prefix="/api")
 
@@ -0,0 +1,30 @@
+"""
+Mongo Storage for the Voice Dialer
+Loads the calls still to be placed, with their converts' phone numbers,
+so the dialer can rebuild its queue after a restart.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+
+async def load_dialer_state(
+    db: AsyncIOMotorDatabase,
+    client_id: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Optional[str]]]:
+    """Scheduled and interrupted calls, earliest first, and convert id -> phone for them.
+
+    Usage at startup:
+        calls, phones = await load_dialer_state(db)
+        voice_dialer.load(calls, phones.get)
+    """
+    criteria: Dict[str, Any] = {"status": {"$in": ["scheduled", "in_progress"]}}
+    if client_id:
+        criteria["client_id"] = client_id
+    calls = await db.voice_calls.find(criteria, {"_id": 0}).sort("scheduled_time", 1).to_list(None)
+    converts = await db.converts.find(
+        {"id": {"$in": list({call["convert_id"] for call in calls})}},
+        {"_id": 0, "id": 1, "phone": 1},
+    ).to_list(None)
+    return calls, {convert["id"]: convert.get("phone") for convert in converts}
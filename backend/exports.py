@@ -0,0 +1,67 @@
+"""
+Mongo Streaming Exports
+Streams a collection query as NDJSON or CSV straight from a Motor cursor,
+one cursor batch at a time, for use as a StreamingResponse body.
+"""
+
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Dict, Optional, Sequence
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+
+# Documents per cursor batch (and per streamed chunk). Large enough to keep
+# round trips rare, small enough that a batch of convert documents stays well
+# under Mongo's 16 MB reply size.
+EXPORT_BATCH_SIZE = 1000
+
+
+def _cell(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str, separators=(",", ":"))
+    return value
+
+
+async def stream_export(
+    db: AsyncIOMotorDatabase,
+    collection: str,
+    query: Dict[str, Any],
+    file_format: str,
+    columns: Sequence[str],
+    projection: Optional[Dict[str, int]] = None,
+) -> AsyncIterator[bytes]:
+    """Yield an export of ``collection`` matching ``query`` as NDJSON or CSV chunks.
+
+    Usage in a router:
+        body = stream_export(db, "converts", {"stage": stage}, "csv", columns, build_projection("converts", fields))
+        return StreamingResponse(body, media_type="text/csv")
+    """
+    cursor = db[collection].find(query, projection or {"_id": 0}).batch_size(EXPORT_BATCH_SIZE)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if file_format == "csv":
+        writer.writerow(columns)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    pending = 0
+    async for document in cursor:
+        if file_format == "csv":
+            writer.writerow([_cell(document.get(column)) for column in columns])
+        else:
+            buffer.write(json.dumps(document, default=str, separators=(",", ":")))
+            buffer.write("\n")
+        pending += 1
+        if pending >= EXPORT_BATCH_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
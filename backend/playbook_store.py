@@ -0,0 +1,41 @@
+"""
+Mongo Storage for the Playbook Runtime
+Loads playbooks and the active executions whose current steps the runtime
+puts back on its work queues after a restart, and persists each batch of
+changed executions in one bulk write.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne
+
+
+async def load_playbook_state(
+    db: AsyncIOMotorDatabase,
+    client_id: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Active playbooks and their active executions.
+
+    Usage at startup:
+        definitions, executions = await load_playbook_state(db)
+        playbook_runtime.load(definitions, executions)
+    """
+    criteria: Dict[str, Any] = {"is_active": True}
+    if client_id:
+        criteria["client_id"] = client_id
+    definitions = await db.playbooks.find(criteria, {"_id": 0}).to_list(None)
+    executions = await db.playbook_executions.find(
+        {"status": "active", "playbook_id": {"$in": [d["id"] for d in definitions]}},
+        {"_id": 0},
+    ).to_list(None)
+    return definitions, executions
+
+
+async def save_playbook_batch(db: AsyncIOMotorDatabase, executions: List[Dict[str, Any]]):
+    """Upsert changed executions (PlaybookRuntime.to_dict())."""
+    if executions:
+        await db.playbook_executions.bulk_write(
+            [ReplaceOne({"id": execution["id"]}, execution, upsert=True) for execution in executions],
+            ordered=False,
+        )
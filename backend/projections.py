@@ -0,0 +1,85 @@
+"""
+Mongo Field Projections for List Endpoints
+Turns a ``fields=`` query parameter (a shape name or a comma-separated
+field list) into a Mongo projection, so list queries only fetch the
+columns a view renders. Only fields in a collection's allowlist can be
+requested, so internal fields (password hashes, tenant ids) never leak.
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+
+# Predefined shapes per collection, matching the standalone server's shapes
+PROJECTION_SHAPES = {
+    "converts": {
+        "card": ("id", "first_name", "last_name", "phone", "occupation", "stage", "health_score"),
+        "summary": ("id", "first_name", "last_name", "phone", "stage", "source",
+                    "health_score", "assigned_worker_id", "created_at"),
+    },
+    "alerts": {
+        "card": ("id", "convert_id", "title", "severity", "status", "created_at"),
+        "summary": ("id", "convert_id", "type", "title", "severity", "status",
+                    "assigned_to", "created_at", "updated_at"),
+    },
+    "voice_calls": {
+        "card": ("id", "convert_id", "status", "outcome", "duration_seconds", "scheduled_time"),
+        "summary": ("id", "convert_id", "agent_id", "script_id", "status", "outcome",
+                    "duration_seconds", "scheduled_time", "started_at", "ended_at", "created_at"),
+    },
+}
+
+# Fields clients may project per collection, matching the standalone server's allowlists
+PROJECTION_FIELDS = {
+    "converts": frozenset({
+        "id", "first_name", "last_name", "phone", "email", "gender", "date_of_birth", "address", "city",
+        "state", "occupation", "source", "source_date", "stage", "notes", "assigned_worker_id",
+        "health_score", "sentiment_score", "created_at", "updated_at", "created_by",
+    }),
+    "alerts": frozenset({
+        "id", "convert_id", "rule_id", "type", "title", "description", "severity", "status",
+        "assigned_to", "created_at", "updated_at",
+    }),
+    "voice_calls": frozenset({
+        "id", "convert_id", "agent_id", "script_id", "status", "scheduled_time", "started_at", "ended_at",
+        "duration_seconds", "recording_url", "transcript", "notes", "outcome", "sentiment",
+        "sentiment_score", "greeting", "script_text", "created_at", "updated_at",
+    }),
+}
+
+
+@lru_cache(maxsize=256)
+def _parse_fields(collection: str, fields: str) -> Tuple[str, ...]:
+    """Resolve a shape name or field list to field names (cached per collection)."""
+    shapes = PROJECTION_SHAPES.get(collection, {})
+    if fields in shapes:
+        return shapes[fields]
+
+    allowed = PROJECTION_FIELDS.get(collection, frozenset())
+    names = ["id"]
+    for name in fields.split(","):
+        name = name.strip()
+        if not name or name in names:
+            continue
+        if name not in allowed:
+            raise ValueError(f"Unknown field: {name}")
+        names.append(name)
+    return tuple(names)
+
+
+def build_projection(collection: str, fields: Optional[str]) -> Optional[Dict[str, int]]:
+    """Build a Mongo projection for ``fields``; None means return whole documents.
+
+    Raises ValueError for fields outside the collection's PROJECTION_FIELDS,
+    which routers should answer with a 400.
+
+    Usage in a router:
+        projection = build_projection("converts", fields)
+        cursor = db.converts.find(query, projection)
+    """
+    if not fields:
+        return None
+    projection = {"_id": 0}
+    for name in _parse_fields(collection, fields):
+        projection[name] = 1
+    return projection
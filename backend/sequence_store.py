@@ -0,0 +1,41 @@
+"""
+Mongo Storage for the Sequence Scheduler
+Loads sequence definitions and the active enrollments whose pending
+messages the scheduler requeues after a restart, and persists each batch
+of changed enrollments in one bulk write.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne
+
+
+async def load_sequence_state(
+    db: AsyncIOMotorDatabase,
+    client_id: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Active sequence definitions and their active enrollments.
+
+    Usage at startup:
+        definitions, enrollments = await load_sequence_state(db)
+        sequence_scheduler.load(definitions, enrollments)
+    """
+    criteria: Dict[str, Any] = {"is_active": True}
+    if client_id:
+        criteria["client_id"] = client_id
+    definitions = await db.sequence_definitions.find(criteria, {"_id": 0}).to_list(None)
+    enrollments = await db.sequence_executions.find(
+        {"status": "active", "sequence_id": {"$in": [d["id"] for d in definitions]}},
+        {"_id": 0},
+    ).to_list(None)
+    return definitions, enrollments
+
+
+async def save_sequence_batch(db: AsyncIOMotorDatabase, enrollments: List[Dict[str, Any]]):
+    """Upsert changed enrollments (SequenceScheduler.to_dict())."""
+    if enrollments:
+        await db.sequence_executions.bulk_write(
+            [ReplaceOne({"id": enrollment["id"]}, enrollment, upsert=True) for enrollment in enrollments],
+            ordered=False,
+        )
@@ -0,0 +1,26 @@
+"""
+Mongo Storage for the SMS Dispatcher
+Writes the dispatcher's batches of sms_logs records in one unordered bulk
+insert each, so a duplicate id from a replayed batch does not stop the rest.
+"""
+
+from typing import Any, Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import BulkWriteError
+
+
+async def save_sms_logs(db: AsyncIOMotorDatabase, records: List[Dict[str, Any]]):
+    """Insert a batch of sms_logs records (SmsDispatcher.persist).
+
+    Usage at startup:
+        sms_dispatcher.persist = lambda records: save_sms_logs(db, records)
+    """
+    if not records:
+        return
+    try:
+        await db.sms_logs.insert_many([dict(record) for record in records], ordered=False)
+    except BulkWriteError as e:
+        # Duplicate ids are records already written; anything else is a real failure
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
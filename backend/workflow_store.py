@@ -0,0 +1,47 @@
+"""
+Mongo Storage for the Workflow Runtime
+Loads workflow definitions and the executions still running (so a restarted
+runtime resumes them) and persists each batch of changed executions, plus
+the follow-up tasks their steps created, in one bulk write per collection.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne
+
+
+async def load_workflow_state(
+    db: AsyncIOMotorDatabase,
+    client_id: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Active workflow definitions and their running executions.
+
+    Usage at startup:
+        definitions, executions = await load_workflow_state(db)
+        workflow_runtime.load(definitions, executions)
+    """
+    criteria: Dict[str, Any] = {"is_active": True}
+    if client_id:
+        criteria["client_id"] = client_id
+    definitions = await db.workflow_definitions.find(criteria, {"_id": 0}).to_list(None)
+    executions = await db.workflow_executions.find(
+        {"status": "running", "workflow_id": {"$in": [d["id"] for d in definitions]}},
+        {"_id": 0},
+    ).to_list(None)
+    return definitions, executions
+
+
+async def save_workflow_batch(
+    db: AsyncIOMotorDatabase,
+    executions: List[Dict[str, Any]],
+    tasks: List[Dict[str, Any]] = (),
+):
+    """Upsert changed executions (WorkflowExecution.to_dict()) and insert new follow-up tasks."""
+    if executions:
+        await db.workflow_executions.bulk_write(
+            [ReplaceOne({"id": execution["id"]}, execution, upsert=True) for execution in executions],
+            ordered=False,
+        )
+    if tasks:
+        await db.followup_tasks.insert_many(list(tasks), ordered=False)
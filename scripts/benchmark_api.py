@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+API Payload Benchmark for the Standalone Demo Server
+Compares FastAPI's default JSON path with the fast encoder + gzip pipeline
+on the large list endpoints.
+"""
+
+import sys
+import time
+import gzip
+import json
+import uuid
+import random
+import hashlib
+import logging
+import argparse
+from pathlib import Path
+
+# Add the standalone backend to the path, as api/index.py does
+SCRIPT_DIR = Path(__file__).parent.resolve()
+DEMO_DIR = SCRIPT_DIR.parent
+STANDALONE_DIR = DEMO_DIR / "standalone-backend"
+
+sys.path.insert(0, str(STANDALONE_DIR))
+
+logging.disable(logging.INFO)
+
+from fastapi.encoders import jsonable_encoder
+
+import server
+from responses import dumps, JSON_ENCODER, GZIP_COMPRESS_LEVEL, GZIP_MINIMUM_SIZE
+
+
+def scale_demo_data(converts_count: int, calls_count: int):
+    """Grow the in-memory demo data by cloning seeded records under new ids."""
+    server.populate_demo_data()
+    db = server.db
+    random.seed(7)
+
+    templates = list(db.converts.values())
+    for i in range(len(db.converts), converts_count):
+        convert_id = str(uuid.UUID(hashlib.md5(f"bench_convert_{i}".encode()).hexdigest()[:32]))
+        convert = dict(random.choice(templates), id=convert_id)
+        db.converts[convert_id] = convert
+        health = dict(db.health_scores.get(random.choice(templates)["id"]) or {})
+        health.update({"id": str(uuid.uuid4()), "convert_id": convert_id})
+        db.health_scores[convert_id] = health
+
+    call_templates = list(db.voice_calls.values())
+    convert_ids = list(db.converts.keys())
+    for i in range(len(db.voice_calls), calls_count):
+        call_id = str(uuid.UUID(hashlib.md5(f"bench_call_{i}".encode()).hexdigest()[:32]))
+        call = dict(random.choice(call_templates), id=call_id, convert_id=random.choice(convert_ids))
+        db.voice_calls[call_id] = call
+
+
+def endpoint_payloads():
+    """Build the same payloads the list endpoints return."""
+    db = server.db
+
+    calls = []
+    for call in db.voice_calls.values():
+        convert = db.converts.get(call["convert_id"], {})
+        calls.append(dict(
+            call,
+            convert_name=f"{convert.get('first_name', '')} {convert.get('last_name', '')}",
+            convert_phone=convert.get("phone"),
+        ))
+
+    return {
+        "/converts": list(db.converts.values()),
+        "/health-scores": list(db.health_scores.values()),
+        "/voice-agent/calls": calls,
+    }
+
+
+def default_render(payload) -> bytes:
+    """What FastAPI does without a custom response: jsonable_encoder then JSONResponse.render."""
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def fast_render(payload) -> bytes:
+    """The new pipeline: fast encoder on the stored dicts, gzip above the threshold."""
+    body = dumps(payload)
+    if len(body) >= GZIP_MINIMUM_SIZE:
+        body = gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL)
+    return body
+
+
+def measure(render, payload, seconds: float):
+    """Return (renders/sec, bytes per response)."""
+    body = render(payload)
+    iterations = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        render(payload)
+        iterations += 1
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed, len(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON payloads of the list endpoints")
+    parser.add_argument("--converts", type=int, default=5000, help="Number of converts to serve")
+    parser.add_argument("--calls", type=int, default=2000, help="Number of voice calls to serve")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Time spent per measurement")
+    args = parser.parse_args()
+
+    scale_demo_data(args.converts, args.calls)
+
+    print("\n" + "="*78)
+    print(f"API PAYLOAD BENCHMARK  (encoder: {JSON_ENCODER}, gzip level {GZIP_COMPRESS_LEVEL})")
+    print("="*78)
+    print(f"{'endpoint':<20}{'records':>8}{'default req/s':>15}{'fast req/s':>12}"
+          f"{'default bytes':>15}{'wire bytes':>12}")
+
+    for endpoint, payload in endpoint_payloads().items():
+        default_rps, default_bytes = measure(default_render, payload, args.seconds)
+        fast_rps, fast_bytes = measure(fast_render, payload, args.seconds)
+        print(f"{endpoint:<20}{len(payload):>8}{default_rps:>15.1f}{fast_rps:>12.1f}"
+              f"{default_bytes:>15,}{fast_bytes:>12,}")
+
+    print("="*78 + "\n")
+
+
+if __name__ == "__main__":
+    main()
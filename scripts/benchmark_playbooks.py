@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Playbook Runtime Benchmark
+Starts many converts on the seeded playbooks, runs the automated steps in
+batches, then times users taking their next tasks off the priority queues
+against finding the same tasks by scanning every active execution.
+"""
+
+import sys
+import time
+import heapq
+import random
+import logging
+import argparse
+from pathlib import Path
+
+# Add the standalone backend to the path, as api/index.py does
+SCRIPT_DIR = Path(__file__).parent.resolve()
+DEMO_DIR = SCRIPT_DIR.parent
+STANDALONE_DIR = DEMO_DIR / "standalone-backend"
+
+sys.path.insert(0, str(STANDALONE_DIR))
+
+logging.disable(logging.INFO)
+
+from playbook_runtime import DEFAULT_PLAYBOOKS, AUTOMATION_BATCH_SIZE, PlaybookRuntime
+
+# Owners each simulated user takes tasks for, besides their own queue
+USER_OWNERS = [
+    ["followup_worker"],
+    ["welfare_officer"],
+    ["followup_leader", "followup_worker", "mentorship_coordinator"],
+    ["discipleship_team"],
+    ["pastor", "head_of_departments"],
+]
+
+
+def build(converts: int, workers: int, batch_size: int):
+    random.seed(7)
+    runtime = PlaybookRuntime(batch_size=batch_size)
+    runtime.load([dict(playbook, id=f"playbook_{i}") for i, playbook in enumerate(DEFAULT_PLAYBOOKS)])
+    assigned = {f"convert_{i}": f"worker_{random.randrange(workers)}" for i in range(converts)}
+    scores = {convert_id: random.randint(0, 100) for convert_id in assigned}
+    runtime.assign = lambda execution, step: assigned[execution.convert_id] if step["owner"] == "followup_worker" else None
+    runtime.priority = lambda execution: scores[execution.convert_id]
+
+    convert_ids = list(assigned)
+    start = time.perf_counter()
+    for playbook_id in runtime.definitions:
+        for offset in range(0, converts, 1000):
+            runtime.launch(playbook_id, convert_ids[offset:offset + 1000])
+    launched = time.perf_counter() - start
+
+    start = time.perf_counter()
+    while runtime.run_automation():
+        pass
+    automated = time.perf_counter() - start
+    return runtime, launched, automated
+
+
+def scan_next(runtime: PlaybookRuntime, user_id: str, owners, limit: int):
+    """Baseline: look at every active execution's current step to find a user's most urgent tasks."""
+    owners = set(owners)
+    candidates = []
+    for execution in runtime.active.values():
+        task = execution.task
+        if task is None or task.claimed_by:
+            continue
+        if task.assignee_id == user_id or (task.assignee_id is None and task.owner in owners):
+            candidates.append((task.priority, task.queued_at, task.id, task))
+    return [entry[3] for entry in heapq.nsmallest(limit, candidates)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the playbook runtime's work queues")
+    parser.add_argument("--converts", type=int, default=100000, help="Converts started on every playbook")
+    parser.add_argument("--workers", type=int, default=200, help="Follow-up workers converts are assigned to")
+    parser.add_argument("--requests", type=int, default=2000, help="'Next tasks' requests to time")
+    parser.add_argument("--limit", type=int, default=5, help="Tasks taken per request")
+    parser.add_argument("--batch-size", type=int, default=AUTOMATION_BATCH_SIZE, help="Automated steps run per batch")
+    args = parser.parse_args()
+
+    runtime, launched, automated = build(args.converts, args.workers, args.batch_size)
+    report = runtime.report()
+    print("\n" + "="*64)
+    print(f"PLAYBOOK RUNTIME  ({args.converts:,} converts x {len(DEFAULT_PLAYBOOKS)} playbooks)")
+    print("="*64)
+    print(f"  launch            {launched:>8.2f}s  ({report['active_executions']:,} executions)")
+    print(f"  automation        {automated:>8.2f}s  ({report['steps_automated']:,} steps in {report['batches']:,} batches)")
+    print(f"  queued tasks      {sum(report['role_queues'].values()) + sum(report['user_queues'].values()):>9,}")
+
+    random.seed(11)
+    users = [(f"worker_{random.randrange(args.workers)}", random.choice(USER_OWNERS)) for _ in range(args.requests)]
+
+    # The scan only reads, so time it first on the same queues the heap pops from
+    scan_requests = min(args.requests, 50)
+    start = time.perf_counter()
+    for user_id, owners in users[:scan_requests]:
+        scan_next(runtime, user_id, owners, args.limit)
+    scanned = (time.perf_counter() - start) / scan_requests
+
+    start = time.perf_counter()
+    taken = 0
+    for user_id, owners in users:
+        taken += len(runtime.next_tasks(user_id, owners, args.limit))
+    popped = (time.perf_counter() - start) / args.requests
+
+    print("\n" + "="*64)
+    print(f"NEXT TASKS  (limit {args.limit}, {taken:,} tasks claimed over {args.requests:,} requests)")
+    print("="*64)
+    print(f"  heap pop          {popped * 1e6:>8.1f}us per request")
+    print(f"  scan executions   {scanned * 1e6:>8.1f}us per request  ({scanned / popped:,.0f}x)")
+    print("="*64 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Sentiment Scoring Benchmark
+Scores a synthetic stream of call messages (English and Nigerian Pidgin,
+agent and convert lines) with the standalone server's lexicon scorer,
+one message at a time and in batches through the background stage with
+per-call and per-convert rollups, and reports messages per second.
+"""
+
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+
+# Add the standalone backend to the path, as api/index.py does
+SCRIPT_DIR = Path(__file__).parent.resolve()
+DEMO_DIR = SCRIPT_DIR.parent
+STANDALONE_DIR = DEMO_DIR / "standalone-backend"
+
+sys.path.insert(0, str(STANDALONE_DIR))
+
+logging.disable(logging.INFO)
+
+from sentiment import SENTIMENT_BATCH_SIZE, SentimentRollup, SentimentScorer, SentimentStage
+
+AGENT_LINES = [
+    "Hello, this is Dependify Gospel Centre. Am I speaking with {name}?",
+    "We wanted to check on you and invite you to our service this Sunday.",
+    "Is there anything we can pray with you about?",
+    "God bless you, {name}. See you on Sunday!",
+]
+
+CONVERT_LINES = [
+    "Yes, I'll definitely be there. Thank you for the reminder!",
+    "I'm fine, thank you for calling.",
+    "No wahala, I go come with my wife.",
+    "Things are hard, I lost my job last month and I dey suffer.",
+    "I no happy with how things dey go for house.",
+    "Please pray for my mother, she is sick.",
+    "E sweet me well well, the service was wonderful.",
+    "I'm not interested, please stop calling me.",
+    "Sapa don hold me, but God dey.",
+    "I've been so busy with work, maybe next week {day}.",
+    "Thank God, my exam result came out and I passed!",
+    "I am {age} years old and still looking for work in {city}.",
+]
+
+NAMES = ["Chinedu", "Aisha", "Tunde", "Ngozi", "Emeka", "Funmi", "Ibrahim", "Blessing"]
+CITIES = ["Lagos", "Abuja", "Ibadan", "Enugu", "Kano", "Port Harcourt"]
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+
+def make_messages(count: int, calls: int, seed: int = 7):
+    """count conversation records over calls calls; scripted lines repeat, as they do on real calls."""
+    rng = random.Random(seed)
+    records = []
+    for i in range(count):
+        call = i % calls
+        speaker = "agent" if rng.random() < 0.5 else "convert"
+        line = rng.choice(AGENT_LINES if speaker == "agent" else CONVERT_LINES)
+        records.append({
+            "id": f"msg_{i}",
+            "call_id": f"call_{call}",
+            "convert_id": f"convert_{call % (calls // 2 or 1)}",
+            "speaker": speaker,
+            "message": line.format(name=rng.choice(NAMES), day=rng.choice(DAYS),
+                                   age=rng.randint(18, 70), city=rng.choice(CITIES)),
+            "sentiment": None,
+        })
+    return records
+
+
+async def run_stage(records, batch_size: int):
+    stage = SentimentStage(batch_size=batch_size)
+    rollup = SentimentRollup()
+
+    def on_scored(batch, results):
+        for record, (_, score) in zip(batch, results):
+            if record["speaker"] == "convert":
+                rollup.add(record["call_id"], record["convert_id"], score)
+
+    stage.on_scored = on_scored
+    start = time.perf_counter()
+    stage.submit(records)
+    await stage.process()
+    return time.perf_counter() - start, stage.counters["batches"], len(rollup.calls), len(rollup.converts)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark lexicon sentiment scoring of call messages")
+    parser.add_argument("--messages", type=int, default=200000, help="Messages to score")
+    parser.add_argument("--calls", type=int, default=20000, help="Calls the messages belong to")
+    parser.add_argument("--batch-size", type=int, default=SENTIMENT_BATCH_SIZE, help="Messages per stage batch")
+    args = parser.parse_args()
+
+    records = make_messages(args.messages, args.calls)
+    scorer = SentimentScorer()
+    distinct = len({record["message"] for record in records})
+
+    print("\n" + "="*80)
+    print(f"SENTIMENT SCORING BENCHMARK  ({args.messages:,} messages, {distinct:,} distinct, "
+          f"{args.calls:,} calls)")
+    print("="*80)
+    print(f"{'mode':<28}{'messages':>12}{'total':>10}{'msg/s':>12}{'batches':>10}")
+
+    start = time.perf_counter()
+    for record in records:
+        scorer.score(record["message"])
+    elapsed = time.perf_counter() - start
+    print(f"{'one at a time':<28}{args.messages:>12,}{elapsed:>9.2f}s{args.messages / elapsed:>12,.0f}{'-':>10}")
+
+    start = time.perf_counter()
+    scorer.score_batch([record["message"] for record in records])
+    elapsed = time.perf_counter() - start
+    print(f"{'score_batch (one batch)':<28}{args.messages:>12,}{elapsed:>9.2f}s{args.messages / elapsed:>12,.0f}{1:>10}")
+
+    elapsed, batches, calls, converts = await run_stage(records, args.batch_size)
+    print(f"{'stage + rollups':<28}{args.messages:>12,}{elapsed:>9.2f}s{args.messages / elapsed:>12,.0f}{batches:>10,}")
+    print(f"\nRolled up {calls:,} calls and {converts:,} converts")
+    print("="*80 + "\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Sequence Scheduler Benchmark
+Times the hierarchical timing wheel against a binary heap for scheduling
+and firing hundreds of thousands of day-offset messages, then runs the
+sequence scheduler end to end on a simulated clock.
+"""
+
+import sys
+import time
+import heapq
+import random
+import logging
+import argparse
+from pathlib import Path
+
+# Add the standalone backend to the path, as api/index.py does
+SCRIPT_DIR = Path(__file__).parent.resolve()
+DEMO_DIR = SCRIPT_DIR.parent
+STANDALONE_DIR = DEMO_DIR / "standalone-backend"
+
+sys.path.insert(0, str(STANDALONE_DIR))
+
+logging.disable(logging.INFO)
+
+from timing_wheel import TimingWheel
+from sequence_scheduler import DEFAULT_SEQUENCES, DAY_SECONDS, SequenceScheduler
+
+START = 1_700_000_000.0
+
+
+def due_times(count: int, days: int):
+    random.seed(7)
+    return [START + random.uniform(0, days * DAY_SECONDS) for _ in range(count)]
+
+
+def bench_wheel(dues, step: float):
+    wheel = TimingWheel(1.0, START)
+    start = time.perf_counter()
+    for i, due in enumerate(dues):
+        wheel.schedule(due, i)
+    scheduled = time.perf_counter() - start
+
+    fired = 0
+    now = START
+    start = time.perf_counter()
+    while len(wheel):
+        now += step
+        fired += len(wheel.advance(now))
+    return scheduled, time.perf_counter() - start, fired
+
+
+def bench_heap(dues, step: float):
+    heap = []
+    start = time.perf_counter()
+    for i, due in enumerate(dues):
+        heapq.heappush(heap, (due, i))
+    scheduled = time.perf_counter() - start
+
+    fired = 0
+    now = START
+    start = time.perf_counter()
+    while heap:
+        now += step
+        while heap and heap[0][0] <= now:
+            heapq.heappop(heap)
+            fired += 1
+    return scheduled, time.perf_counter() - start, fired
+
+
+def bench_scheduler(converts: int, step: float):
+    """Enroll converts in every seeded sequence and run the clock forward until all is sent."""
+    clock = [START]
+    scheduler = SequenceScheduler(clock=lambda: clock[0])
+    scheduler.load([dict(sequence, id=f"sequence_{i}") for i, sequence in enumerate(DEFAULT_SEQUENCES)])
+    batches = []
+    for channel in ("sms", "email"):
+        scheduler.register(channel, lambda deliveries: batches.append(len(deliveries)) or [None] * len(deliveries))
+
+    # Converts enroll over the first day
+    convert_ids = [f"convert_{i}" for i in range(converts)]
+    start = time.perf_counter()
+    for offset in range(0, converts, 1000):
+        clock[0] = START + offset / converts * DAY_SECONDS
+        for sequence_id in scheduler.definitions:
+            scheduler.enroll(sequence_id, convert_ids[offset:offset + 1000])
+    enrolled = time.perf_counter() - start
+    pending = len(scheduler.wheel)
+
+    start = time.perf_counter()
+    while len(scheduler.wheel):
+        clock[0] += step
+        scheduler.run_due()
+    return enrolled, time.perf_counter() - start, pending, batches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sequence scheduler's timing wheel")
+    parser.add_argument("--messages", type=int, default=500000, help="Timers for the wheel/heap comparison")
+    parser.add_argument("--converts", type=int, default=100000, help="Converts enrolled in every sequence")
+    parser.add_argument("--days", type=int, default=7, help="Days the timers are spread over")
+    parser.add_argument("--step", type=float, default=1.0, help="Simulated seconds between advances")
+    args = parser.parse_args()
+
+    dues = due_times(args.messages, args.days)
+
+    print("\n" + "="*64)
+    print(f"TIMER STRUCTURES  ({args.messages:,} timers over {args.days} days, {args.step:g}s ticks)")
+    print("="*64)
+    print(f"{'structure':<16}{'schedule':>12}{'per timer':>12}{'fire all':>12}{'fired':>12}")
+    for name, bench in (("timing wheel", bench_wheel), ("binary heap", bench_heap)):
+        scheduled, fired_seconds, fired = bench(dues, args.step)
+        print(f"{name:<16}{scheduled:>11.2f}s{scheduled / args.messages * 1e9:>10.0f}ns"
+              f"{fired_seconds:>11.2f}s{fired:>12,}")
+
+    enrolled, ran, pending, batches = bench_scheduler(args.converts, args.step)
+    print("\n" + "="*64)
+    print(f"SEQUENCE SCHEDULER  ({args.converts:,} converts in {len(DEFAULT_SEQUENCES)} sequences)")
+    print("="*64)
+    print(f"  enroll            {enrolled:>8.2f}s  ({pending:,} messages queued)")
+    print(f"  send all          {ran:>8.2f}s  ({sum(batches):,} messages in {len(batches):,} channel batches,"
+          f" largest {max(batches, default=0)})")
+    print("="*64 + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+SMS Dispatcher Benchmark
+Pushes a burst of messages through the standalone server's SMS dispatcher
+against local fake gateways with per-call latency, rate limits and
+injected failures, and reports the sustained send rate, retries and
+queue-to-log latency.
+"""
+
+import sys
+import time
+import asyncio
+import logging
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+# Add the standalone backend to the path, as api/index.py does
+SCRIPT_DIR = Path(__file__).parent.resolve()
+DEMO_DIR = SCRIPT_DIR.parent
+STANDALONE_DIR = DEMO_DIR / "standalone-backend"
+
+sys.path.insert(0, str(STANDALONE_DIR))
+
+logging.disable(logging.INFO)
+
+from sms_dispatcher import FakeSmsGateway, SmsDispatcher, SmsMessage, SMS_QUEUE_SIZE
+
+
+def percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+async def run(args, max_batch: int, messages: int):
+    dispatcher = SmsDispatcher(queue_size=args.queue_size, backoff_base=args.backoff)
+    gateways = [
+        FakeSmsGateway(
+            name=f"provider_{i}", rate_per_second=args.rate, max_batch=max_batch, concurrency=args.concurrency,
+            latency=args.latency, failure_rate=args.failure_rate, batch_failure_rate=args.batch_failure_rate, seed=i,
+        )
+        for i in range(args.providers)
+    ]
+    for gateway in gateways:
+        dispatcher.register(gateway)
+    store = {}
+    dispatcher.persist = lambda records: store.update((record["id"], record) for record in records)
+    dispatcher.start()
+
+    start = time.perf_counter()
+    for i in range(messages):
+        # Every 500th number is malformed and fails without a retry
+        to = "0803123" if i % 500 == 0 else f"080{i % 100000000:08d}"
+        await dispatcher.submit(SmsMessage(to, "Service is Sunday 9am", f"convert_{i}", provider=gateways[i % len(gateways)].name))
+    submitted = time.perf_counter() - start
+    await dispatcher.drain()
+    elapsed = time.perf_counter() - start
+    await dispatcher.stop()
+
+    latencies = [
+        (datetime.fromisoformat(record["created_at"]) - datetime.fromisoformat(record["queued_at"])).total_seconds()
+        for record in store.values()
+    ]
+    return dispatcher.counters, sum(gateway.calls for gateway in gateways), submitted, elapsed, latencies, len(store)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the SMS dispatcher against fake gateways")
+    parser.add_argument("--messages", type=int, default=100000, help="Messages to send")
+    parser.add_argument("--providers", type=int, default=2, help="Fake gateways messages are spread over")
+    parser.add_argument("--rate", type=float, default=5000.0, help="Messages per second each gateway allows")
+    parser.add_argument("--max-batch", type=int, default=100, help="Messages per gateway call")
+    parser.add_argument("--concurrency", type=int, default=4, help="Calls in flight per gateway")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per gateway call")
+    parser.add_argument("--failure-rate", type=float, default=0.02, help="Messages failing transiently")
+    parser.add_argument("--batch-failure-rate", type=float, default=0.01, help="Gateway calls failing outright")
+    parser.add_argument("--backoff", type=float, default=0.05, help="Base retry backoff in seconds")
+    parser.add_argument("--queue-size", type=int, default=SMS_QUEUE_SIZE, help="Queued messages per provider")
+    parser.add_argument("--compare-unbatched", type=int, default=0, metavar="N",
+                        help="Also send N messages one per gateway call")
+    args = parser.parse_args()
+
+    print("\n" + "="*88)
+    print(f"SMS DISPATCHER BENCHMARK  ({args.providers} gateways at {args.rate:,.0f} msg/s, "
+          f"{args.latency * 1000:.0f}ms per call, {args.concurrency} in flight)")
+    print("="*88)
+    print(f"{'mode':<12}{'messages':>10}{'total':>9}{'msg/s':>10}{'calls':>9}{'retried':>9}{'failed':>8}"
+          f"{'p50':>9}{'p99':>9}{'logged':>10}")
+    runs = [("batched", args.max_batch, args.messages)]
+    if args.compare_unbatched:
+        runs.append(("unbatched", 1, args.compare_unbatched))
+    for name, max_batch, messages in runs:
+        counters, calls, submitted, elapsed, latencies, logged = await run(args, max_batch, messages)
+        print(f"{name:<12}{messages:>10,}{elapsed:>8.2f}s{counters['sent'] / elapsed:>10,.0f}{calls:>9,}"
+              f"{counters['retried']:>9,}{counters['failed']:>8,}{percentile(latencies, 0.5) * 1000:>7.0f}ms"
+              f"{percentile(latencies, 0.99) * 1000:>7.0f}ms{logged:>10,}")
+    print("="*88 + "\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Workflow Runtime Benchmark
+Drives many concurrent workflow executions through the standalone server's
+timer-heap runtime, with delays compressed so the longest workflow finishes
+in --duration seconds, and compares it with one sleeping task per execution.
+"""
+
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+import tracemalloc
+from pathlib import Path
+
+# Add the standalone backend to the path, as api/index.py does
+SCRIPT_DIR = Path(__file__).parent.resolve()
+DEMO_DIR = SCRIPT_DIR.parent
+STANDALONE_DIR = DEMO_DIR / "standalone-backend"
+
+sys.path.insert(0, str(STANDALONE_DIR))
+
+logging.disable(logging.INFO)
+
+from workflow_runtime import DEFAULT_WORKFLOWS, WorkflowRuntime, WORKFLOW_BATCH_SIZE
+
+# Converts per trigger call, like one bulk write
+TRIGGER_BATCH = 500
+
+# Executions traced to measure memory per execution
+MEMORY_SAMPLE = 20000
+
+# Longest delay among the seeded workflows, in hours
+MAX_DELAY_HOURS = max(step["delay_hours"] for workflow in DEFAULT_WORKFLOWS for step in workflow["steps"])
+
+
+def definitions():
+    return [dict(workflow, id=f"workflow_{i}") for i, workflow in enumerate(DEFAULT_WORKFLOWS)]
+
+
+def percentile(values, fraction: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+async def loop_probe(stop: asyncio.Event, interval: float, stalls: list):
+    """Measure how late the event loop wakes a 10ms sleeper, i.e. how long it stalls."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        stalls.append(time.perf_counter() - start - interval)
+
+
+async def run_heap(executions: int, hour_seconds: float, batch_size: int, persist: bool):
+    """Timer-heap runtime; returns the measurements."""
+    runtime = WorkflowRuntime(hour_seconds=hour_seconds, batch_size=batch_size)
+    runtime.load(definitions())
+    lags = []
+
+    def step(execution, step):
+        lags.append(time.time() - execution.due)
+
+    for action in {step["action"] for workflow in DEFAULT_WORKFLOWS for step in workflow["steps"]}:
+        runtime.register(action, step)
+    store = {}
+    if persist:
+        def save(batch):
+            for execution in batch:
+                store[execution.id] = execution.to_dict()
+        runtime.persist = save
+
+    stop, stalls = asyncio.Event(), []
+    probe = asyncio.create_task(loop_probe(stop, 0.01, stalls))
+    runtime.start()
+
+    # Converts arrive in write-sized batches, each to one randomly chosen trigger
+    triggers = [workflow["trigger"] for workflow in DEFAULT_WORKFLOWS]
+    start = time.perf_counter()
+    for offset in range(0, executions, TRIGGER_BATCH):
+        convert_ids = [f"convert_{i}" for i in range(offset, min(offset + TRIGGER_BATCH, executions))]
+        runtime.trigger(random.choice(triggers), convert_ids)
+        await asyncio.sleep(0)
+    trigger_seconds = time.perf_counter() - start
+
+    while runtime.running:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    await runtime.stop()
+    return trigger_seconds, elapsed, lags, stalls
+
+
+async def run_tasks(executions: int, hour_seconds: float):
+    """Baseline: one asyncio task sleeping through each execution's steps."""
+    workflows = definitions()
+    lags = []
+
+    async def execution(workflow, started):
+        for step in workflow["steps"]:
+            due = started + step["delay_hours"] * hour_seconds
+            delay = due - time.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            lags.append(time.time() - due)
+
+    stop, stalls = asyncio.Event(), []
+    probe = asyncio.create_task(loop_probe(stop, 0.01, stalls))
+
+    start = time.perf_counter()
+    tasks = []
+    for offset in range(0, executions, TRIGGER_BATCH):
+        workflow = random.choice(workflows)
+        for _ in range(min(TRIGGER_BATCH, executions - offset)):
+            tasks.append(asyncio.create_task(execution(workflow, time.time())))
+        await asyncio.sleep(0)
+    trigger_seconds = time.perf_counter() - start
+
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    return trigger_seconds, elapsed, lags, stalls
+
+
+async def memory_per_execution(runtime_name: str, executions: int) -> float:
+    """Bytes held per pending execution, measured on its own since tracing slows everything down."""
+    tracemalloc.start()
+    if runtime_name == "timer heap":
+        runtime = WorkflowRuntime()
+        runtime.load(definitions())
+        runtime.trigger(DEFAULT_WORKFLOWS[0]["trigger"], [f"convert_{i}" for i in range(executions)])
+        held = tracemalloc.get_traced_memory()[0]
+    else:
+        tasks = [asyncio.create_task(asyncio.sleep(3600)) for _ in range(executions)]
+        # Let every task reach its sleep so its frame and timer handle exist
+        await asyncio.sleep(0)
+        held = tracemalloc.get_traced_memory()[0]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    tracemalloc.stop()
+    return held / executions
+
+
+def report(name, memory, trigger_seconds, elapsed, lags, stalls):
+    print(f"{name:<14}{trigger_seconds:>10.2f}s{elapsed:>10.2f}s{len(lags) / elapsed:>12,.0f}"
+          f"{memory:>10,.0f}B{percentile(lags, 0.5) * 1000:>9.1f}ms{percentile(lags, 0.99) * 1000:>9.1f}ms"
+          f"{max(stalls, default=0.0) * 1000:>11.1f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the workflow runtime at scale")
+    parser.add_argument("--executions", type=int, default=100000, help="Concurrent executions to drive")
+    parser.add_argument("--duration", type=float, default=30.0,
+                        help="Seconds the longest workflow's delays are compressed into")
+    parser.add_argument("--batch-size", type=int, default=WORKFLOW_BATCH_SIZE, help="Due steps run per batch")
+    parser.add_argument("--no-persist", action="store_true", help="Skip serializing executions after each batch")
+    parser.add_argument("--compare-tasks", action="store_true", help="Also run the task-per-execution baseline")
+    args = parser.parse_args()
+
+    random.seed(7)
+    hour_seconds = args.duration / MAX_DELAY_HOURS
+
+    print("\n" + "="*86)
+    print(f"WORKFLOW RUNTIME BENCHMARK  ({args.executions:,} executions, "
+          f"{MAX_DELAY_HOURS}h of delays in {args.duration:g}s)")
+    print("="*86)
+    print(f"{'runtime':<14}{'trigger':>11}{'total':>11}{'steps/s':>12}{'mem/exec':>11}"
+          f"{'p50 lag':>11}{'p99 lag':>11}{'max stall':>13}")
+
+    sample = min(args.executions, MEMORY_SAMPLE)
+    results = await run_heap(args.executions, hour_seconds, args.batch_size, not args.no_persist)
+    report("timer heap", await memory_per_execution("timer heap", sample), *results)
+    if args.compare_tasks:
+        results = await run_tasks(args.executions, hour_seconds)
+        report("task/exec", await memory_per_execution("task/exec", sample), *results)
+
+    print("="*86 + "\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
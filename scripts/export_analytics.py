@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Columnar Analytics Export for Evangelism CRM
+Writes converts, health-score factors, voice calls, alerts and follow-up
+records as Parquet or Arrow IPC files for the data team's notebooks, from
+either the standalone in-memory store or the Mongo demo database.
+"""
+
+import sys
+import time
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+
+# Add the standalone backend and demo root to the path
+SCRIPT_DIR = Path(__file__).parent.resolve()
+DEMO_DIR = SCRIPT_DIR.parent
+STANDALONE_DIR = DEMO_DIR / "standalone-backend"
+
+sys.path.insert(0, str(STANDALONE_DIR))
+sys.path.insert(0, str(DEMO_DIR))
+
+logging.disable(logging.INFO)
+
+import server
+from columnar import ColumnarWriter, pa
+
+# Documents fetched per Mongo round trip
+MONGO_BATCH_SIZE = 5000
+
+
+def export_standalone(table: str, path: Path, file_format: str) -> int:
+    """Export a table from a freshly populated standalone store."""
+    writer = ColumnarWriter(server.ANALYTICS_TABLES[table], str(path), file_format)
+    writer.write(getattr(server.db, table).values())
+    writer.close()
+    return writer.rows
+
+
+async def export_mongo(db, table: str, path: Path, file_format: str) -> int:
+    """Export a table from the Mongo demo database, one cursor batch at a time."""
+    columns = server.ANALYTICS_TABLES[table]
+    projection = {"_id": 0}
+    for column in columns:
+        projection[column.path[0]] = 1
+
+    writer = ColumnarWriter(columns, str(path), file_format)
+    cursor = db[table].find({}, projection).batch_size(MONGO_BATCH_SIZE)
+    batch = []
+    async for document in cursor:
+        batch.append(document)
+        if len(batch) >= MONGO_BATCH_SIZE:
+            writer.write(batch)
+            batch = []
+    writer.write(batch)
+    writer.close()
+    return writer.rows
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Export CRM collections as Parquet or Arrow IPC files")
+    parser.add_argument("--source", choices=["standalone", "mongo"], default="standalone",
+                        help="Read from the standalone demo store or the Mongo demo database")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet", help="Output file format")
+    parser.add_argument("--output", type=Path, default=Path("analytics_export"), help="Output directory")
+    parser.add_argument("--tables", nargs="+", choices=list(server.ANALYTICS_TABLES),
+                        default=list(server.ANALYTICS_TABLES), help="Tables to export")
+    args = parser.parse_args()
+
+    if pa is None:
+        print("❌ pyarrow is required: pip install pyarrow")
+        sys.exit(1)
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    extension = "parquet" if args.format == "parquet" else "arrow"
+
+    if args.source == "mongo":
+        from backend.demo_database import get_demo_database, close_demo_database
+        db = get_demo_database()
+    else:
+        server.populate_demo_data()
+
+    print("\n" + "="*60)
+    print(f"ANALYTICS EXPORT  ({args.source} → {args.format})")
+    print("="*60)
+    try:
+        for table in args.tables:
+            path = args.output / f"{table}.{extension}"
+            start = time.perf_counter()
+            if args.source == "mongo":
+                rows = await export_mongo(db, table, path, args.format)
+            else:
+                rows = export_standalone(table, path, args.format)
+            elapsed = time.perf_counter() - start
+            print(f"✓ {table:<18}{rows:>9,} rows{path.stat().st_size:>12,} bytes{elapsed:>8.2f}s  {path}")
+    finally:
+        if args.source == "mongo":
+            await close_demo_database()
+    print("="*60 + "\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -10,6 +10,7 @@ import os
 from pathlib import Path
 from datetime import datetime, timedelta, date, timezone
 from typing import List, Dict, Any, Optional
+import copy
 import uuid
 import random
 import bcrypt
@@ -20,9 +21,11 @@ SCRIPT_DIR = Path(__file__).parent.resolve()
 DEMO_DIR = SCRIPT_DIR.parent
 PROJECT_ROOT = DEMO_DIR.parent
 BACKEND_DIR = PROJECT_ROOT / "backend"
+STANDALONE_DIR = DEMO_DIR / "standalone-backend"
 
 sys.path.insert(0, str(BACKEND_DIR))
 sys.path.insert(0, str(DEMO_DIR))
+sys.path.insert(0, str(STANDALONE_DIR))
 
 # Import from demo data generators
 from data.nigerian_data import (
@@ -40,6 +43,13 @@ from models.convert import Convert, ConvertStage, ConvertSource, ConvertList
 # Import database utilities
 from backend.demo_database import get_demo_database, create_demo_indexes, DEMO_COLLECTIONS
 
+# Health scores and alerts come from the same engines the demo server uses
+from health_engine import score_population
+from alert_rules import DEFAULT_ALERT_RULES, AlertRuleEngine
+from workflow_runtime import DEFAULT_WORKFLOWS
+from sequence_scheduler import DEFAULT_SEQUENCES
+from playbook_runtime import DEFAULT_PLAYBOOKS
+
 
 class DemoDataPopulator:
     """Populates the demo database with realistic Nigerian church data."""
@@ -51,6 +61,9 @@ class DemoDataPopulator:
         self.users: List[Dict] = []
         self.converts: List[Dict] = []
         self.services: List[Dict] = []
+        self.followup_records: List[Dict] = []
+        self.health_scores: List[Dict] = []
+        self.alert_rules: List[Dict] = []
         self.converts_count = DEMO_CONFIG["default_converts_count"]
         self.workers_count = DEMO_CONFIG["default_workers_count"]
         self.services_count = DEMO_CONFIG["default_services_count"]
@@ -523,6 +536,7 @@ class DemoDataPopulator:
         if records_data:
             await self.db.followup_records.insert_many(records_data)
         
+        self.followup_records = records_data
         print(f"✓ Created {len(records_data)} follow-up records")
         return records_data
         
@@ -532,34 +546,16 @@ class DemoDataPopulator:
         
         scores_data = []
         
-        # Create health scores for converts
-        for convert in self.converts:
-            # Calculate score based on stage and activity
-            base_scores = {
-                ConvertStage.NEW.value: random.randint(20, 40),
-                ConvertStage.IN_FOLLOWUP.value: random.randint(35, 60),
-                ConvertStage.IN_CLASSES.value: random.randint(50, 75),
-                ConvertStage.IN_HOUSE_FELLOWSHIP.value: random.randint(65, 85),
-                ConvertStage.ESTABLISHED.value: random.randint(80, 100),
-                ConvertStage.HANDED_OVER.value: random.randint(40, 70),
-                ConvertStage.INACTIVE.value: random.randint(5, 25),
-            }
-            
-            score = base_scores.get(convert["stage"], 50)
-            
+        # Score every convert at once from its follow-up history and stage
+        now = datetime.now(timezone.utc)
+        for result in score_population(self.converts, self.followup_records, now=now):
             score_data = {
                 "id": str(uuid.uuid4()),
                 "client_id": self.client_id,
-                "convert_id": convert["id"],
-                "score": score,
-                "factors": {
-                    "attendance_rate": random.randint(0, 100),
-                    "engagement_level": random.randint(0, 100),
-                    "response_time": random.randint(0, 100),
-                    "spiritual_growth": random.randint(0, 100),
-                    "social_connection": random.randint(0, 100)
-                },
-                "calculated_at": datetime.now(timezone.utc).isoformat(),
+                "convert_id": result["convert_id"],
+                "score": result["score"],
+                "factors": result["factors"],
+                "calculated_at": now.isoformat(),
                 "is_demo": True
             }
             
@@ -571,48 +567,36 @@ class DemoDataPopulator:
             batch = scores_data[i:i+batch_size]
             await self.db.health_scores.insert_many(batch)
         
+        self.health_scores = scores_data
         print(f"✓ Created {len(scores_data)} health scores")
         return scores_data
         
-    async def create_alerts(self):
-        """Create demo alerts."""
-        print("\n🚨 Creating alerts...")
+    async def create_alert_rules(self):
+        """Create the default alert rules."""
+        print("\n📏 Creating alert rules...")
         
-        # Get converts with low health scores
-        low_score_converts = await self.db.health_scores.find({
-            "client_id": self.client_id,
-            "score": {"$lt": 40}
-        }).to_list(None)
-        
-        alerts_data = []
+        rules_data = [dict(rule, client_id=self.client_id, is_demo=True) for rule in DEFAULT_ALERT_RULES]
+        await self.db.alert_rules.insert_many([dict(rule) for rule in rules_data])
         
-        alert_types = [
-            ("low_engagement", "Low Engagement Alert", "Convert has not attended services for 3 weeks"),
-            ("at_risk", "At Risk Alert", "Convert showing signs of disengagement"),
-            ("follow_up_overdue", "Follow-up Overdue", "Scheduled follow-up is overdue"),
-            ("no_response", "No Response Alert", "Convert not responding to communication"),
-        ]
+        self.alert_rules = rules_data
+        print(f"✓ Created {len(rules_data)} alert rules")
+        return rules_data
         
-        for score in low_score_converts[:20]:  # Create alerts for first 20 low scores
-            alert_type, title, description = random.choice(alert_types)
-            
-            alert_data = {
-                "id": str(uuid.uuid4()),
-                "client_id": self.client_id,
-                "convert_id": score["convert_id"],
-                "type": alert_type,
-                "title": title,
-                "description": description,
-                "severity": random.choice(["low", "medium", "high"]),
-                "status": random.choice(["open", "open", "acknowledged", "in_progress"]),
-                "assigned_to": random.choice([u["id"] for u in self.users if u["role"] == UserRole.FOLLOWUP_LEADER.value]),
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat(),
-                "is_demo": True
-            }
-            
-            alerts_data.append(alert_data)
+    async def create_alerts(self):
+        """Create demo alerts by running the alert rules over the generated data."""
+        print("\n🚨 Creating alerts...")
         
+        # Evaluate in memory rather than re-querying what was just inserted
+        alerts: Dict[str, Dict] = {}
+        engine = AlertRuleEngine()
+        converts = {convert["id"]: convert for convert in self.converts}
+        engine.load(self.alert_rules, alerts, {
+            "converts": converts,
+            "health_scores": {score["convert_id"]: score for score in self.health_scores},
+            "followup_records": {record["id"]: record for record in self.followup_records},
+        }, converts)
+        
+        alerts_data = [dict(alert, client_id=self.client_id, is_demo=True) for alert in alerts.values()]
         if alerts_data:
             await self.db.alerts.insert_many(alerts_data)
         
@@ -623,56 +607,16 @@ class DemoDataPopulator:
         """Create demo workflow definitions."""
         print("\n⚙️  Creating workflows...")
         
+        # The same definitions the standalone server's workflow runtime executes
         workflows_data = [
-            {
-                "id": str(uuid.uuid4()),
-                "client_id": self.client_id,
-                "name": "New Convert Onboarding",
-                "description": "Automated workflow for welcoming and onboarding new converts",
-                "trigger": "convert_created",
-                "steps": [
-                    {"step": 1, "action": "send_welcome_sms", "delay_hours": 0},
-                    {"step": 2, "action": "assign_followup_worker", "delay_hours": 2},
-                    {"step": 3, "action": "send_followup_email", "delay_hours": 24},
-                    {"step": 4, "action": "create_followup_task", "delay_hours": 48},
-                    {"step": 5, "action": "schedule_call", "delay_hours": 72},
-                ],
-                "is_active": True,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "is_demo": True
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "client_id": self.client_id,
-                "name": "Absent Member Recovery",
-                "description": "Workflow for re-engaging absent members",
-                "trigger": "no_attendance_14_days",
-                "steps": [
-                    {"step": 1, "action": "send_care_sms", "delay_hours": 0},
-                    {"step": 2, "action": "create_welfare_task", "delay_hours": 24},
-                    {"step": 3, "action": "pastor_call", "delay_hours": 72},
-                    {"step": 4, "action": "home_visit", "delay_hours": 168},
-                ],
-                "is_active": True,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "is_demo": True
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "client_id": self.client_id,
-                "name": "Baptism Preparation",
-                "description": "Workflow to prepare converts for water baptism",
-                "trigger": "baptism_interest",
-                "steps": [
-                    {"step": 1, "action": "enroll_baptism_class", "delay_hours": 0},
-                    {"step": 2, "action": "send_class_reminder", "delay_hours": 48},
-                    {"step": 3, "action": "schedule_baptism", "delay_hours": 168},
-                    {"step": 4, "action": "send_confirmation", "delay_hours": 336},
-                ],
-                "is_active": True,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "is_demo": True
-            }
+            dict(
+                copy.deepcopy(workflow),
+                id=str(uuid.uuid4()),
+                client_id=self.client_id,
+                created_at=datetime.now(timezone.utc).isoformat(),
+                is_demo=True,
+            )
+            for workflow in DEFAULT_WORKFLOWS
         ]
         
         await self.db.workflow_definitions.insert_many(workflows_data)
@@ -683,38 +627,16 @@ class DemoDataPopulator:
         """Create demo sequences (automation)."""
         print("\n📬 Creating sequences...")
         
+        # The same definitions the standalone server's sequence scheduler runs
         sequences_data = [
-            {
-                "id": str(uuid.uuid4()),
-                "client_id": self.client_id,
-                "name": "New Convert Welcome Series",
-                "description": "7-day email/SMS series for new converts",
-                "type": "onboarding",
-                "messages": [
-                    {"day": 1, "channel": "sms", "content": "Welcome to Dependify Gospel! We're excited to have you. Service is Sunday 9am."},
-                    {"day": 2, "channel": "email", "content": "Here's a guide to help you get started..."},
-                    {"day": 3, "channel": "sms", "content": "Join us for midweek service tomorrow at 6pm!"},
-                    {"day": 7, "channel": "email", "content": "How was your first week? We'd love to hear from you."},
-                ],
-                "is_active": True,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "is_demo": True
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "client_id": self.client_id,
-                "name": "Follow-up Reminder Sequence",
-                "description": "Reminders for follow-up workers",
-                "type": "internal",
-                "messages": [
-                    {"day": 0, "channel": "sms", "content": "New convert assigned to you. Please contact within 24 hours."},
-                    {"day": 3, "channel": "sms", "content": "Reminder: Follow up on your assigned converts."},
-                    {"day": 7, "channel": "email", "content": "Weekly follow-up summary..."},
-                ],
-                "is_active": True,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "is_demo": True
-            }
+            dict(
+                copy.deepcopy(sequence),
+                id=str(uuid.uuid4()),
+                client_id=self.client_id,
+                created_at=datetime.now(timezone.utc).isoformat(),
+                is_demo=True,
+            )
+            for sequence in DEFAULT_SEQUENCES
         ]
         
         await self.db.sequence_definitions.insert_many(sequences_data)
@@ -725,64 +647,16 @@ class DemoDataPopulator:
         """Create demo playbooks (retention strategies)."""
         print("\n📖 Creating playbooks...")
         
+        # The same playbooks the standalone server's playbook runtime walks converts through
         playbooks_data = [
-            {
-                "id": str(uuid.uuid4()),
-                "client_id": self.client_id,
-                "name": "First Time Visitor Engagement",
-                "description": "Strategy for engaging first-time church visitors",
-                "category": "retention",
-                "steps": [
-                    {"order": 1, "title": "Immediate Welcome", "description": "Send welcome SMS within 2 hours", "owner": "automation"},
-                    {"order": 2, "title": "Personal Call", "description": "Follow-up worker calls within 24 hours", "owner": "followup_worker"},
-                    {"order": 3, "title": "Invite to Fellowship", "description": "Invite to house fellowship meeting", "owner": "followup_worker"},
-                    {"order": 4, "title": "Sunday Service Reminder", "description": "Send reminder for next Sunday", "owner": "automation"},
-                    {"order": 5, "title": "Personal Greeting", "description": "Greet personally on next visit", "owner": "usher_team"},
-                ],
-                "target_audience": "first_time_visitors",
-                "expected_outcome": "70% return for second visit",
-                "is_active": True,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "is_demo": True
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "client_id": self.client_id,
-                "name": "At-Risk Member Recovery",
-                "description": "Strategy for re-engaging members showing signs of disengagement",
-                "category": "recovery",
-                "steps": [
-                    {"order": 1, "title": "Identify At-Risk", "description": "System identifies members absent for 2+ weeks", "owner": "system"},
-                    {"order": 2, "title": "Welfare Check", "description": "Welfare officer makes welfare check call", "owner": "welfare_officer"},
-                    {"order": 3, "title": "Personal Visit", "description": "If no response, schedule home visit", "owner": "followup_leader"},
-                    {"order": 4, "title": "Pastoral Care", "description": "Pastor reaches out if still no response", "owner": "pastor"},
-                    {"order": 5, "title": "Re-engagement Program", "description": "Enroll in special re-engagement program", "owner": "discipleship_team"},
-                ],
-                "target_audience": "at_risk_members",
-                "expected_outcome": "40% re-engagement rate",
-                "is_active": True,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "is_demo": True
-            },
-            {
-                "id": str(uuid.uuid4()),
-                "client_id": self.client_id,
-                "name": "New Member Integration",
-                "description": "Strategy for integrating new members into the church community",
-                "category": "integration",
-                "steps": [
-                    {"order": 1, "title": "Foundation Class", "description": "Enroll in foundation class", "owner": "discipleship_team"},
-                    {"order": 2, "title": "Department Placement", "description": "Assess and place in appropriate department", "owner": "head_of_departments"},
-                    {"order": 3, "title": "House Fellowship", "description": "Connect to nearest house fellowship", "owner": "followup_worker"},
-                    {"order": 4, "title": "Mentor Assignment", "description": "Assign a mature member as mentor", "owner": "mentorship_coordinator"},
-                    {"order": 5, "title": "Follow-up", "description": "Check-in after 3 months", "owner": "followup_worker"},
-                ],
-                "target_audience": "new_members",
-                "expected_outcome": "80% complete integration within 6 months",
-                "is_active": True,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "is_demo": True
-            }
+            dict(
+                copy.deepcopy(playbook),
+                id=str(uuid.uuid4()),
+                client_id=self.client_id,
+                created_at=datetime.now(timezone.utc).isoformat(),
+                is_demo=True,
+            )
+            for playbook in DEFAULT_PLAYBOOKS
         ]
         
         await self.db.playbooks.insert_many(playbooks_data)
@@ -834,6 +708,7 @@ class DemoDataPopulator:
         
         # Create intelligence data
         await self.create_health_scores()
+        await self.create_alert_rules()
         await self.create_alerts()
         
         # Create automation
@@ -0,0 +1,405 @@
+"""
+Incremental Alert Rule Engine
+Evaluates the rules in the alert_rules collection against one changed
+record at a time (a convert, health score or follow-up record) instead of
+rescanning everything. Open alerts are tracked per (convert, rule) so a
+rule never raises duplicates, and evaluation cost is recorded per rule.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Record kinds rules can watch, by the collection that stores them
+RULE_SOURCES = {
+    "converts": "convert",
+    "health_scores": "health_score",
+    "followup_records": "followup",
+}
+
+# Conditions that can start (or stop) matching as time passes, with no write to re-evaluate on
+TIME_BASED_OPS = {"older_than_days"}
+
+# Rules seeded into alert_rules. Conditions are ANDed and tested against
+# the changed record; a "convert." field reads the convert it belongs to.
+# A rule's alert is open while at least min_count (default 1) of the
+# convert's records match.
+DEFAULT_ALERT_RULES = [
+    {
+        "id": "rule_low_engagement",
+        "name": "Low engagement",
+        "type": "low_engagement",
+        "source": "health_score",
+        "title": "Low Engagement Alert",
+        "description": "{name} has a low health score of {score}",
+        "conditions": [
+            {"field": "score", "op": "lt", "value": 40},
+            {"field": "convert.stage", "op": "not_in", "value": ["new"]},
+        ],
+        "severity": "medium",
+        "escalate": {"field": "score", "op": "lt", "value": 25, "severity": "high"},
+        "auto_resolve": True,
+        "enabled": True,
+    },
+    {
+        "id": "rule_at_risk",
+        "name": "Convert gone inactive",
+        "type": "at_risk",
+        "source": "convert",
+        "title": "At Risk Alert",
+        "description": "{name} has been marked inactive",
+        "conditions": [{"field": "stage", "op": "eq", "value": "inactive"}],
+        "severity": "high",
+        "auto_resolve": True,
+        "enabled": True,
+    },
+    {
+        "id": "rule_follow_up_overdue",
+        "name": "Follow-up overdue",
+        "type": "follow_up_overdue",
+        "source": "followup",
+        "title": "Follow-up Overdue",
+        "description": "A follow-up with {name} is overdue",
+        "conditions": [
+            {"field": "status", "op": "eq", "value": "scheduled"},
+            {"field": "scheduled_date", "op": "older_than_days", "value": 3},
+        ],
+        "severity": "medium",
+        "auto_resolve": True,
+        "enabled": True,
+    },
+    {
+        "id": "rule_no_response",
+        "name": "Not responding",
+        "type": "no_response",
+        "source": "followup",
+        "title": "No Response Alert",
+        "description": "{name} has not responded to {count} follow-ups",
+        "conditions": [{"field": "status", "op": "eq", "value": "no_response"}],
+        "min_count": 3,
+        "severity": "medium",
+        "auto_resolve": True,
+        "enabled": True,
+    },
+]
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _compare(op: str, actual: Any, expected: Any, now: datetime) -> bool:
+    actual = getattr(actual, "value", actual)
+    if op == "eq":
+        return actual == expected
+    if op == "ne":
+        return actual != expected
+    if op == "in":
+        return actual in expected
+    if op == "not_in":
+        return actual not in expected
+    if op == "older_than_days":
+        moment = _timestamp(actual)
+        return moment is not None and moment < now - timedelta(days=expected)
+    if actual is None:
+        return False
+    if op == "lt":
+        return actual < expected
+    if op == "lte":
+        return actual <= expected
+    if op == "gt":
+        return actual > expected
+    if op == "gte":
+        return actual >= expected
+    raise ValueError(f"Unknown rule operator: {op}")
+
+
+class RuleStats:
+    """Evaluation cost and outcomes of one rule."""
+
+    def __init__(self):
+        self.evaluations = 0
+        self.matches = 0
+        self.opened = 0
+        self.resolved = 0
+        self.total_ns = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "evaluations": self.evaluations,
+            "matches": self.matches,
+            "opened": self.opened,
+            "resolved": self.resolved,
+            "total_ms": round(self.total_ns / 1e6, 3),
+            "mean_us": round(self.total_ns / self.evaluations / 1e3, 3) if self.evaluations else 0.0,
+        }
+
+
+class AlertRuleEngine:
+    """Keeps alerts in step with the rules as records change.
+
+    alerts is the alert store (id -> alert dict) the engine opens, updates
+    and resolves alerts in; rule state is rebuilt from it (and the stored
+    records passed in) on load().
+    """
+
+    def __init__(self):
+        self.rules: Dict[str, Dict[str, Any]] = {}
+        self.by_source: Dict[str, List[Dict[str, Any]]] = {source: [] for source in RULE_SOURCES.values()}
+        self.stats: Dict[str, RuleStats] = {}
+        self.alerts: Dict[str, Dict[str, Any]] = {}
+        # (convert id, rule id) -> id of the alert that rule has open for that convert
+        self.active: Dict[Tuple[str, str], str] = {}
+        # Rule id -> convert id -> ids of that convert's records the rule matches
+        self.matching: Dict[str, Dict[str, set]] = {}
+        # Source -> record id -> convert id, to find the convert when a record is deleted
+        self.owners: Dict[str, Dict[str, str]] = {source: {} for source in RULE_SOURCES.values()}
+        # Alerts ever opened per (convert, rule), so reopened alerts get fresh ids
+        self.opened: Dict[Tuple[str, str], int] = {}
+
+    def load(
+        self,
+        rules: Iterable[Dict[str, Any]],
+        alerts: Dict[str, Dict[str, Any]],
+        records: Optional[Mapping[str, Mapping[str, Dict[str, Any]]]] = None,
+        converts: Optional[Mapping[str, Dict[str, Any]]] = None,
+        now: Optional[datetime] = None,
+    ) -> List[str]:
+        """Replace the rules and pick up the open alerts in alerts.
+
+        Which records each rule matches isn't stored, so pass every stored
+        record the rules watch (collection -> record id -> record, health
+        scores keyed by convert id) to rebuild it; min_count rules then keep
+        their counts and deleted records still resolve their alerts. Returns
+        the ids of alerts that re-evaluation opened, updated or resolved.
+        """
+        self.rules = {rule["id"]: rule for rule in rules}
+        self.by_source = {source: [] for source in RULE_SOURCES.values()}
+        for rule in self.rules.values():
+            if rule.get("enabled", True):
+                self.by_source[rule["source"]].append(rule)
+        self.stats = {rule_id: RuleStats() for rule_id in self.rules}
+        self.alerts = alerts
+        self.active = {}
+        self.matching = {rule_id: {} for rule_id in self.rules}
+        self.owners = {source: {} for source in RULE_SOURCES.values()}
+        self.opened = {}
+        for alert in alerts.values():
+            rule_id = alert.get("rule_id")
+            if rule_id in self.rules:
+                key = (alert["convert_id"], rule_id)
+                self.opened[key] = self.opened.get(key, 0) + 1
+                if alert["status"] != "resolved":
+                    self.active[key] = alert["id"]
+        
+        touched = []
+        now = now or datetime.now(timezone.utc)
+        converts = converts or {}
+        for collection, store in (records or {}).items():
+            for record_id, record in store.items():
+                convert_id = record_id if collection == "converts" else record.get("convert_id")
+                touched += self.evaluate(collection, record_id, record, converts.get(convert_id), now)
+        return list(dict.fromkeys(touched))
+
+    def timed_collections(self) -> List[str]:
+        """Collections with enabled rules whose conditions depend on the current time.
+
+        Their records can start matching without being written, so they need
+        re-evaluating periodically (see AlertSweeper).
+        """
+        collections = []
+        for collection, source in RULE_SOURCES.items():
+            for rule in self.by_source[source]:
+                conditions = [*rule.get("conditions", ()), rule.get("escalate") or {}]
+                if any(condition.get("op") in TIME_BASED_OPS for condition in conditions):
+                    collections.append(collection)
+                    break
+        return collections
+
+    def has_open(self, source: str, convert_id: str) -> bool:
+        """Whether a rule watching source has an alert open for the convert."""
+        return any((convert_id, rule["id"]) in self.active for rule in self.by_source.get(source, ()))
+
+    def thresholds(self, source: str, field: str) -> List[Any]:
+        """Values rules compare field against, so callers can skip changes that cross none of them."""
+        values = set()
+        for rule in self.by_source.get(source, ()):
+            for condition in [*rule.get("conditions", ()), rule.get("escalate") or {}]:
+                if condition.get("field") == field and condition.get("op") in ("lt", "lte", "gt", "gte"):
+                    values.add(condition["value"])
+        return sorted(values)
+
+    def evaluate(
+        self,
+        collection: str,
+        record_id: str,
+        record: Optional[Dict[str, Any]],
+        convert: Optional[Dict[str, Any]],
+        now: Optional[datetime] = None,
+    ) -> List[str]:
+        """Apply every rule watching collection to one changed (or deleted: record=None) record.
+
+        Returns the ids of alerts opened, updated or resolved.
+        """
+        source = RULE_SOURCES.get(collection)
+        if source is None:
+            return []
+        if record is not None:
+            convert_id = record_id if source == "convert" else record.get("convert_id")
+            self.owners[source][record_id] = convert_id
+        else:
+            convert_id = self.owners[source].pop(record_id, None)
+        if convert_id is None:
+            return []
+        
+        now = now or datetime.now(timezone.utc)
+        name = f"{convert.get('first_name', '')} {convert.get('last_name', '')}".strip() if convert else ""
+        touched = []
+        for rule in self.by_source[source]:
+            started = time.perf_counter_ns()
+            stats = self.stats[rule["id"]]
+            stats.evaluations += 1
+            
+            matching = self.matching[rule["id"]]
+            records = matching.setdefault(convert_id, set())
+            hit = record is not None and convert is not None and self._all(rule["conditions"], record, convert, now)
+            if hit:
+                records.add(record_id)
+                stats.matches += 1
+            else:
+                records.discard(record_id)
+            
+            context = dict(record or {}, name=name, count=len(records))
+            active = convert is not None and len(records) >= rule.get("min_count", 1)
+            if not records:
+                del matching[convert_id]
+            alert_id = self._apply(rule, convert_id, convert, active, context, now)
+            if alert_id is not None:
+                touched.append(alert_id)
+            stats.total_ns += time.perf_counter_ns() - started
+        return touched
+
+    @staticmethod
+    def _all(conditions, record, convert, now) -> bool:
+        for condition in conditions:
+            field = condition["field"]
+            if field.startswith("convert."):
+                actual = convert.get(field[len("convert."):])
+            else:
+                actual = record.get(field)
+            if not _compare(condition["op"], actual, condition["value"], now):
+                return False
+        return True
+
+    def _apply(self, rule, convert_id, convert, matched, context, now) -> Optional[str]:
+        key = (convert_id, rule["id"])
+        alert = self.alerts.get(self.active.get(key))
+        stamp = now.isoformat()
+
+        if not matched:
+            if alert is None or not rule.get("auto_resolve", True):
+                return None
+            alert.update(status="resolved", updated_at=stamp)
+            del self.active[key]
+            self.stats[rule["id"]].resolved += 1
+            return alert["id"]
+
+        severity = rule["severity"]
+        escalate = rule.get("escalate")
+        if escalate and self._all([escalate], context, convert, now):
+            severity = escalate["severity"]
+        description = rule["description"].format_map(_Missing(context))
+
+        if alert is not None:
+            if alert["severity"] == severity and alert["description"] == description:
+                return None
+            alert.update(severity=severity, description=description, updated_at=stamp)
+            return alert["id"]
+
+        # Ids are derived from (convert, rule, occurrence) so seeding is deterministic
+        occurrence = self.opened.get(key, 0)
+        self.opened[key] = occurrence + 1
+        alert_id = str(uuid.UUID(hashlib.md5(f"alert_{rule['id']}_{convert_id}_{occurrence}".encode()).hexdigest()))
+        self.alerts[alert_id] = {
+            "id": alert_id,
+            "convert_id": convert_id,
+            "rule_id": rule["id"],
+            "type": rule["type"],
+            "title": rule["title"],
+            "description": description,
+            "severity": severity,
+            "status": "open",
+            "assigned_to": convert.get("assigned_worker_id"),
+            "created_at": stamp,
+            "updated_at": stamp,
+        }
+        self.active[key] = alert_id
+        self.stats[rule["id"]].opened += 1
+        return alert_id
+
+    def report(self) -> List[Dict[str, Any]]:
+        """Rules with their evaluation cost, most expensive first."""
+        rules = [dict(rule, stats=self.stats[rule_id].to_dict()) for rule_id, rule in self.rules.items()]
+        rules.sort(key=lambda rule: rule["stats"]["total_ms"], reverse=True)
+        return rules
+
+
+class _Missing(dict):
+    """format_map mapping that leaves unknown placeholders blank."""
+
+    def __missing__(self, key):
+        return ""
+
+
+class AlertSweeper:
+    """Background task that periodically re-runs time-based rules.
+
+    sweep is set by the owner of the stores (the server) and re-evaluates the
+    records of alert_engine.timed_collections().
+    """
+
+    def __init__(self, interval_seconds: float = 300.0):
+        self.interval_seconds = interval_seconds
+        self.sweep: Optional[Callable[[], None]] = None
+        self.sweeps = 0
+        self._task: Optional[asyncio.Task] = None
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            if self.sweep is None:
+                continue
+            try:
+                self.sweep()
+                self.sweeps += 1
+            except Exception as e:
+                logger.error(f"Alert rule sweep failed: {e}")
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+alert_engine = AlertRuleEngine()
+alert_sweeper = AlertSweeper()
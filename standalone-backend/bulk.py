@@ -0,0 +1,74 @@
+"""
+Bulk Request Helpers for the Standalone Demo
+Parses bulk bodies (a JSON array, or NDJSON with one item per line) and
+collects per-item results, so one bad row doesn't fail a whole import.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+import json
+
+# Largest batch accepted by one bulk request
+BULK_MAX_ITEMS = 5000
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def is_ndjson(content_type: Optional[str]) -> bool:
+    media_type = (content_type or "").split(";", 1)[0].strip().lower()
+    return media_type in NDJSON_MEDIA_TYPES
+
+
+def parse_bulk_body(body: bytes, content_type: Optional[str]) -> List[Tuple[Any, Optional[str]]]:
+    """Split a bulk body into (item, parse error) pairs, one per item.
+
+    NDJSON lines that aren't valid JSON become per-item errors; a JSON
+    body that isn't an array raises ValueError.
+    """
+    if is_ndjson(content_type):
+        items = []
+        for line in body.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            try:
+                items.append((json.loads(line), None))
+            except json.JSONDecodeError as e:
+                items.append((None, f"Invalid JSON: {e.msg}"))
+        return items
+
+    try:
+        payload = json.loads(body or b"null")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON: {e.msg}")
+    if not isinstance(payload, list):
+        raise ValueError("Expected a JSON array or NDJSON body")
+    return [(item, None) for item in payload]
+
+
+def validation_errors(exc: ValidationError) -> List[Dict[str, str]]:
+    """Compact, JSON-safe form of a pydantic ValidationError."""
+    return [
+        {"field": ".".join(str(part) for part in error["loc"]), "message": error["msg"]}
+        for error in exc.errors()
+    ]
+
+
+class BulkResults:
+    """Per-item outcome of a bulk request, in request order."""
+
+    def __init__(self):
+        self.results: List[Dict[str, Any]] = []
+        self.succeeded = 0
+        self.failed = 0
+
+    def ok(self, index: int, record_id: str, status: str):
+        self.results.append({"index": index, "id": record_id, "status": status})
+        self.succeeded += 1
+
+    def error(self, index: int, error: Any, record_id: Optional[str] = None):
+        self.results.append({"index": index, "id": record_id, "status": "error", "error": error})
+        self.failed += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        self.results.sort(key=lambda result: result["index"])
+        return {"succeeded": self.succeeded, "failed": self.failed, "results": self.results}
@@ -0,0 +1,275 @@
+"""
+Streaming Voice Call Analytics
+Call totals, status and outcome counts and duration quantiles, overall and
+per day, agent and script, updated as each call changes rather than by
+scanning every call per request. Durations go into log-bucketed quantile
+sketches, which merge exactly across worker processes and let a call's
+old duration be taken back out when it changes.
+"""
+
+from typing import Any, Dict, Iterable, Optional, Tuple
+import math
+
+# Relative error of sketch quantiles: p90 of 300s is reported within 300s +/- 1%
+SKETCH_RELATIVE_ACCURACY = 0.01
+
+# Quantiles reported for call duration
+DURATION_QUANTILES = (0.5, 0.9, 0.99)
+
+# Breakdown key for calls without an agent or script
+UNASSIGNED = "none"
+
+
+class QuantileSketch:
+    """Relative-error quantile sketch over positive values (DDSketch-style).
+
+    Values are counted in buckets whose bounds grow geometrically, so any
+    quantile is within relative_accuracy of the true value. Counts are
+    plain integers per bucket: sketches merge by adding them, and a value
+    can be removed again.
+    """
+
+    __slots__ = ("relative_accuracy", "gamma", "_log_gamma", "bins", "zeros", "count")
+
+    def __init__(self, relative_accuracy: float = SKETCH_RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        # Values at or below zero
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, value: float, count: int = 1):
+        """Count value count times; a negative count removes it."""
+        self.count += count
+        if value <= 0:
+            self.zeros += count
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        total = self.bins.get(key, 0) + count
+        if total:
+            self.bins[key] = total
+        else:
+            del self.bins[key]
+
+    def remove(self, value: float):
+        self.add(value, -1)
+
+    def merge(self, other: "QuantileSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("Sketches with different accuracy cannot be merged")
+        self.count += other.count
+        self.zeros += other.zeros
+        for key, count in other.bins.items():
+            total = self.bins.get(key, 0) + count
+            if total:
+                self.bins[key] = total
+            else:
+                self.bins.pop(key, None)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value at quantile q (0..1), or None for an empty sketch."""
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if rank < seen:
+                # Midpoint of the bucket (gamma^(key-1), gamma^key] in relative terms
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zeros": self.zeros,
+            "count": self.count,
+            "bins": {str(key): count for key, count in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(data.get("relative_accuracy", SKETCH_RELATIVE_ACCURACY))
+        sketch.zeros = data.get("zeros", 0)
+        sketch.count = data.get("count", 0)
+        sketch.bins = {int(key): count for key, count in data.get("bins", {}).items()}
+        return sketch
+
+
+class CallRollup:
+    """Counts and duration sketch of one group of calls."""
+
+    __slots__ = ("total", "statuses", "outcomes", "duration_sum", "durations")
+
+    def __init__(self):
+        self.total = 0
+        self.statuses: Dict[str, int] = {}
+        self.outcomes: Dict[Any, int] = {}
+        self.duration_sum = 0.0
+        self.durations = QuantileSketch()
+
+    def add(self, status: str, outcome: Any, duration: Optional[float], sign: int = 1):
+        self.total += sign
+        self.statuses[status] = self.statuses.get(status, 0) + sign
+        if not self.statuses[status]:
+            del self.statuses[status]
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + sign
+        if not self.outcomes[outcome]:
+            del self.outcomes[outcome]
+        if duration:
+            self.duration_sum += sign * duration
+            self.durations.add(duration, sign)
+
+    def merge(self, other: "CallRollup"):
+        self.total += other.total
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        for outcome, count in other.outcomes.items():
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + count
+        self.duration_sum += other.duration_sum
+        self.durations.merge(other.durations)
+
+    def report(self) -> Dict[str, Any]:
+        completed = self.statuses.get("completed", 0)
+        timed = self.durations.count
+        report = {
+            "total_calls": self.total,
+            "completed": completed,
+            "failed": self.statuses.get("failed", 0),
+            "no_answer": self.statuses.get("no_answer", 0),
+            "statuses": dict(self.statuses),
+            "average_duration_seconds": round(self.duration_sum / timed, 1) if timed else 0,
+            "outcomes": dict(self.outcomes),
+            "success_rate": round(completed / self.total * 100, 1) if self.total > 0 else 0,
+        }
+        for q in DURATION_QUANTILES:
+            value = self.durations.quantile(q)
+            report[f"p{round(q * 100)}_duration_seconds"] = round(value, 1) if value is not None else None
+        return report
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "statuses": self.statuses,
+            # Pairs, since an outcome may be None and JSON object keys must be strings
+            "outcomes": [[outcome, count] for outcome, count in self.outcomes.items()],
+            "duration_sum": self.duration_sum,
+            "durations": self.durations.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CallRollup":
+        rollup = cls()
+        rollup.total = data["total"]
+        rollup.statuses = dict(data["statuses"])
+        rollup.outcomes = {outcome: count for outcome, count in data["outcomes"]}
+        rollup.duration_sum = data["duration_sum"]
+        rollup.durations = QuantileSketch.from_dict(data["durations"])
+        return rollup
+
+
+# What a call contributes to the rollups: (status, outcome, duration, day, agent, script)
+CallKey = Tuple[str, Any, Optional[float], str, str, str]
+
+
+def call_key(call: Dict[str, Any]) -> CallKey:
+    when = call.get("started_at") or call.get("scheduled_time") or call.get("created_at") or ""
+    return (
+        call["status"],
+        call.get("outcome", "unknown"),
+        call.get("duration_seconds") or None,
+        when[:10],
+        call.get("agent_id") or UNASSIGNED,
+        call.get("script_id") or UNASSIGNED,
+    )
+
+
+class CallAnalytics:
+    """Voice call rollups kept current from per-call changes.
+
+    Each call's contribution is remembered, so a change subtracts the old
+    contribution and adds the new one; a report never looks at the calls.
+    """
+
+    BREAKDOWNS = ("by_day", "by_agent", "by_script")
+
+    def __init__(self):
+        self.overall = CallRollup()
+        self.by_day: Dict[str, CallRollup] = {}
+        self.by_agent: Dict[str, CallRollup] = {}
+        self.by_script: Dict[str, CallRollup] = {}
+        self.keys: Dict[str, CallKey] = {}
+
+    def rebuild(self, calls: Iterable[Dict[str, Any]]):
+        self.__init__()
+        for call in calls:
+            self._update(call["id"], call)
+
+    def refresh(self, collection: str, record_ids: Iterable[Optional[str]], store: Dict[str, Dict[str, Any]]):
+        """Apply changed or deleted calls; collections other than voice_calls are ignored."""
+        if collection != "voice_calls":
+            return
+        for call_id in record_ids:
+            self._update(call_id, store.get(call_id))
+
+    def _update(self, call_id: str, call: Optional[Dict[str, Any]]):
+        old = self.keys.get(call_id)
+        new = call_key(call) if call is not None else None
+        if old == new:
+            return
+        if old is not None:
+            self._apply(old, -1)
+        if new is None:
+            del self.keys[call_id]
+        else:
+            self.keys[call_id] = new
+            self._apply(new, 1)
+
+    def _apply(self, key: CallKey, sign: int):
+        status, outcome, duration, day, agent, script = key
+        self.overall.add(status, outcome, duration, sign)
+        for groups, group in ((self.by_day, day), (self.by_agent, agent), (self.by_script, script)):
+            rollup = groups.get(group)
+            if rollup is None:
+                rollup = groups[group] = CallRollup()
+            rollup.add(status, outcome, duration, sign)
+            if not rollup.total:
+                del groups[group]
+
+    def report(self, days: Optional[int] = None) -> Dict[str, Any]:
+        """Overall figures plus the per-day (latest days only, if given), per-agent and per-script breakdowns."""
+        report = self.overall.report()
+        day_keys = sorted(self.by_day, reverse=True)
+        if days is not None:
+            day_keys = day_keys[:days]
+        report["by_day"] = {day: self.by_day[day].report() for day in sorted(day_keys)}
+        report["by_agent"] = {agent: rollup.report() for agent, rollup in self.by_agent.items()}
+        report["by_script"] = {script: rollup.report() for script, rollup in self.by_script.items()}
+        return report
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Rollups without the per-call contributions, for merging with other processes' state."""
+        return {
+            "overall": self.overall.to_dict(),
+            **{name: {group: rollup.to_dict() for group, rollup in getattr(self, name).items()}
+               for name in self.BREAKDOWNS},
+        }
+
+    @classmethod
+    def merged(cls, states: Iterable[Dict[str, Any]]) -> "CallAnalytics":
+        """Combine to_dict() states of several processes into one report-only CallAnalytics."""
+        combined = cls()
+        for state in states:
+            combined.overall.merge(CallRollup.from_dict(state["overall"]))
+            for name in cls.BREAKDOWNS:
+                groups = getattr(combined, name)
+                for group, data in state.get(name, {}).items():
+                    groups.setdefault(group, CallRollup()).merge(CallRollup.from_dict(data))
+        return combined
+
+
+call_analytics = CallAnalytics()
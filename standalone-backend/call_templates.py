@@ -0,0 +1,120 @@
+"""
+Call Script Templates
+Greeting and call script templates use {placeholder} fields filled in per
+convert. Each template is parsed once into a compiled form, cached by
+script id and version, and rendered for a whole batch of converts at once;
+unknown placeholders are rejected when the template is saved.
+"""
+
+from operator import itemgetter
+from string import Formatter
+from typing import Any, Dict, Iterable, List, Mapping, Tuple
+
+# Placeholders a template may use
+TEMPLATE_FIELDS = frozenset({"convert_name", "name", "caller_name", "church_name"})
+
+
+class TemplateError(ValueError):
+    """A template that cannot be compiled: bad syntax or unknown placeholders."""
+
+
+class CompiledTemplate:
+    """A template reduced to a positional format string and the fields that fill it.
+
+    Rendering is a single str.format call over the fields picked out of each
+    context, so no parsing happens per call.
+    """
+
+    __slots__ = ("source", "fields", "_format", "_getter")
+
+    def __init__(self, source: str, fields: Tuple[str, ...], format_string: str):
+        self.source = source
+        self.fields = fields
+        self._format = format_string
+        self._getter = itemgetter(*fields) if fields else None
+
+    def render(self, context: Mapping[str, Any]) -> str:
+        if self._getter is None:
+            return self._format
+        values = self._getter(context)
+        return self._format.format(*values) if len(self.fields) > 1 else self._format.format(values)
+
+    def render_many(self, contexts: Iterable[Mapping[str, Any]]) -> List[str]:
+        """Render once per context, in order."""
+        if self._getter is None:
+            return [self._format for _ in contexts]
+        fmt, getter = self._format.format, self._getter
+        if len(self.fields) > 1:
+            return [fmt(*getter(context)) for context in contexts]
+        return [fmt(getter(context)) for context in contexts]
+
+
+def compile_template(source: str, allowed: Iterable[str] = TEMPLATE_FIELDS) -> CompiledTemplate:
+    """Parse a template; raises TemplateError for malformed or unknown placeholders."""
+    if not isinstance(source, str):
+        raise TemplateError("Template must be a string")
+    allowed = frozenset(allowed)
+    parts: List[str] = []
+    fields: List[str] = []
+    unknown: List[str] = []
+    try:
+        parsed = list(Formatter().parse(source))
+    except ValueError as e:
+        raise TemplateError(f"Invalid template: {e}")
+    for literal, field, spec, conversion in parsed:
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field is None:
+            continue
+        if spec or conversion:
+            raise TemplateError(f"Placeholder {{{field}}} cannot have a format spec or conversion")
+        if field not in allowed:
+            if field not in unknown:
+                unknown.append(field)
+            continue
+        if field not in fields:
+            fields.append(field)
+        parts.append(f"{{{fields.index(field)}}}")
+    if unknown:
+        names = ", ".join(f"{{{name}}}" if name else "{}" for name in unknown)
+        raise TemplateError(f"Unknown placeholders: {names}. Allowed: {', '.join(sorted(allowed))}")
+    return CompiledTemplate(source, tuple(fields), "".join(parts))
+
+
+def template_context(convert: Mapping[str, Any], caller_name: str = "", church_name: str = "") -> Dict[str, str]:
+    """Placeholder values for one convert."""
+    first_name = convert.get("first_name") or ""
+    return {
+        "convert_name": f"{first_name} {convert.get('last_name') or ''}".strip(),
+        "name": first_name,
+        "caller_name": caller_name,
+        "church_name": church_name,
+    }
+
+
+class TemplateCache:
+    """Compiled templates by key (a script id), each tagged with the version it was compiled from."""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Any, CompiledTemplate]] = {}
+        self.hits = 0
+        self.compiles = 0
+
+    def get(self, key: str, version: Any, source: str) -> CompiledTemplate:
+        """The compiled template for key at version, compiling source if it is not cached."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self.hits += 1
+            return entry[1]
+        compiled = compile_template(source)
+        self.compiles += 1
+        self._entries[key] = (version, compiled)
+        return compiled
+
+    def invalidate(self, key: str):
+        self._entries.pop(key, None)
+
+    def report(self) -> Dict[str, int]:
+        return {"cached": len(self._entries), "hits": self.hits, "compiles": self.compiles}
+
+
+template_cache = TemplateCache()
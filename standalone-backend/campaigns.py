@@ -0,0 +1,253 @@
+"""
+Voice Call Campaigns
+Resolves convert segments (stage, health score range, assigned worker,
+last call outcome) from secondary indexes kept up to date on every write,
+plans a campaign's calls with spacing inside calling-hours windows, and
+rolls call progress and outcomes up per campaign as each call changes.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import math
+
+# Campaign calls are planned in church-local time (WAT)
+CAMPAIGN_TIMEZONE = timezone(timedelta(hours=1))
+
+# Default calling hours (local, [start, end)) and days (Monday=0 ... Saturday=5, Sunday=6)
+CALLING_HOURS = (9, 18)
+CALLING_DAYS = (0, 1, 2, 3, 4, 5)
+
+# Seconds between consecutive call start times of a campaign, and the most allowed
+CAMPAIGN_SPACING = 30.0
+MAX_CAMPAIGN_SPACING = 86400.0
+
+WEEKDAYS = frozenset(range(7))
+
+# Segment value matching converts without an assigned worker, or never reached by a call
+UNASSIGNED = "unassigned"
+NEVER_CALLED = "none"
+
+# Call statuses a call has ended in
+ENDED_STATUSES = frozenset({"completed", "voicemail", "no_answer", "failed"})
+
+
+def _as_list(value) -> Optional[List[Any]]:
+    if value is None:
+        return None
+    return list(value) if isinstance(value, (list, tuple, set)) else [value]
+
+
+class SegmentIndex:
+    """Secondary indexes over converts for segment queries, refreshed per changed record.
+
+    Each index maps a value to the set of convert ids having it; health
+    scores are whole numbers, so a score range is a union of a few buckets.
+    """
+
+    def __init__(self):
+        self.by_stage: Dict[Any, Set[str]] = {}
+        self.by_score: Dict[Any, Set[str]] = {}
+        self.by_worker: Dict[Any, Set[str]] = {}
+        self.by_outcome: Dict[Any, Set[str]] = {}
+        # Convert id -> (stage, score, worker, last outcome) it is indexed under
+        self.keys: Dict[str, Tuple[Any, Any, Any, Any]] = {}
+        # Convert id -> (ended at, outcome) of its latest ended call
+        self.last_call: Dict[str, Tuple[str, str]] = {}
+
+    def rebuild(self, converts: Iterable[Dict[str, Any]], calls: Iterable[Dict[str, Any]]):
+        self.__init__()
+        for call in calls:
+            self._note_call(call)
+        for convert in converts:
+            self._index(convert["id"], convert)
+
+    def refresh(self, collection: str, record_ids: Iterable[Optional[str]], store: Dict[str, Dict[str, Any]]):
+        """Re-index changed or deleted records; collections other than converts and voice_calls are ignored."""
+        if collection == "converts":
+            for convert_id in record_ids:
+                self._index(convert_id, store.get(convert_id))
+        elif collection == "voice_calls":
+            for call_id in record_ids:
+                call = store.get(call_id)
+                if call is not None and self._note_call(call):
+                    convert_id = call["convert_id"]
+                    if convert_id in self.keys:
+                        stage, score, worker, _ = self.keys[convert_id]
+                        self._move(convert_id, (stage, score, worker, self.last_call[convert_id][1]))
+
+    def _note_call(self, call: Dict[str, Any]) -> bool:
+        """Record an ended call if it is the convert's latest; returns whether it was."""
+        if call.get("status") not in ENDED_STATUSES or not call.get("ended_at"):
+            return False
+        previous = self.last_call.get(call["convert_id"])
+        if previous is not None and previous[0] > call["ended_at"]:
+            return False
+        self.last_call[call["convert_id"]] = (call["ended_at"], call.get("outcome") or call["status"])
+        return True
+
+    def _index(self, convert_id: str, convert: Optional[Dict[str, Any]]):
+        if convert is None:
+            self._move(convert_id, None)
+            return
+        last = self.last_call.get(convert_id)
+        score = convert.get("health_score")
+        self._move(convert_id, (
+            convert.get("stage"),
+            int(score) if score is not None else None,
+            convert.get("assigned_worker_id") or None,
+            last[1] if last else None,
+        ))
+
+    def _move(self, convert_id: str, keys: Optional[Tuple[Any, Any, Any, Any]]):
+        old = self.keys.get(convert_id)
+        if old == keys:
+            return
+        indexes = (self.by_stage, self.by_score, self.by_worker, self.by_outcome)
+        if old is not None:
+            for index, key in zip(indexes, old):
+                members = index[key]
+                members.discard(convert_id)
+                if not members:
+                    del index[key]
+        if keys is None:
+            self.keys.pop(convert_id, None)
+            return
+        self.keys[convert_id] = keys
+        for index, key in zip(indexes, keys):
+            index.setdefault(key, set()).add(convert_id)
+
+    def resolve(self, segment: Dict[str, Any]) -> Set[str]:
+        """Ids of converts matching a segment filter; an empty filter matches every convert."""
+        candidates: List[Set[str]] = []
+        stages = _as_list(segment.get("stage"))
+        if stages is not None:
+            candidates.append(self._union(self.by_stage, stages))
+        low, high = segment.get("min_health_score"), segment.get("max_health_score")
+        if low is not None or high is not None:
+            low = 0 if low is None else low
+            high = 100 if high is None else high
+            candidates.append(self._union(self.by_score, [s for s in self.by_score if s is not None and low <= s <= high]))
+        workers = _as_list(segment.get("assigned_worker_id"))
+        if workers is not None:
+            candidates.append(self._union(self.by_worker, [None if w == UNASSIGNED else w for w in workers]))
+        outcomes = _as_list(segment.get("last_call_outcome"))
+        if outcomes is not None:
+            candidates.append(self._union(self.by_outcome, [None if o == NEVER_CALLED else o for o in outcomes]))
+
+        if not candidates:
+            return set(self.keys)
+        candidates.sort(key=len)
+        return candidates[0].intersection(*candidates[1:])
+
+    @staticmethod
+    def _union(index: Dict[Any, Set[str]], keys: Iterable[Any]) -> Set[str]:
+        sets = [index[key] for key in keys if key in index]
+        return set().union(*sets) if sets else set()
+
+    def score_of(self, convert_id: str) -> Optional[int]:
+        keys = self.keys.get(convert_id)
+        return keys[1] if keys else None
+
+
+def plan_call_times(
+    count: int,
+    start: datetime,
+    spacing: float = CAMPAIGN_SPACING,
+    hours: Tuple[int, int] = CALLING_HOURS,
+    days: Iterable[int] = CALLING_DAYS,
+    deadline: Optional[datetime] = None,
+) -> List[datetime]:
+    """Start times for count calls from start, spacing seconds apart, inside the calling-hours windows.
+
+    Calls that would start at or after deadline are left out, so the result
+    may be shorter than count.
+    """
+    days = frozenset(days)
+    if not days or not days <= WEEKDAYS:
+        raise ValueError("Calling days must be weekdays from 0 (Monday) to 6 (Sunday)")
+    if not 0 <= hours[0] < hours[1] <= 24:
+        raise ValueError("Calling hours must leave a window to call in")
+    if not 0 < spacing <= MAX_CAMPAIGN_SPACING:
+        raise ValueError(f"Spacing must be more than 0 and at most {MAX_CAMPAIGN_SPACING:.0f} seconds")
+    step = timedelta(seconds=spacing)
+    when = start.astimezone(CAMPAIGN_TIMEZONE)
+    times: List[datetime] = []
+    # Each pass places at least one call or skips a closed day, and a week always has an open day
+    passes = 8 * (count + 1)
+    while len(times) < count:
+        passes -= 1
+        if passes < 0:
+            raise ValueError("Calling window never opens")
+        # Move into the next open window
+        if when.weekday() not in days or when.hour >= hours[1]:
+            when = (when + timedelta(days=1)).replace(hour=hours[0], minute=0, second=0, microsecond=0)
+            continue
+        if when.hour < hours[0]:
+            when = when.replace(hour=hours[0], minute=0, second=0, microsecond=0)
+        if deadline is not None and when >= deadline:
+            break
+        close = when.replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(hours=hours[1])
+        # Every call that fits before the window closes
+        fit = min(count - len(times), math.ceil((close - when) / step))
+        times.extend(when + step * i for i in range(fit))
+        when = times[-1] + step
+    if deadline is not None:
+        times = [t for t in times if t < deadline]
+    return [t.astimezone(timezone.utc) for t in times]
+
+
+# Campaign progress counters, one per call status
+PROGRESS_STATUSES = ("scheduled", "in_progress", "completed", "voicemail", "no_answer", "failed")
+
+
+class CampaignTracker:
+    """Rolls call status changes up into their campaign's progress and outcome counts.
+
+    transition is O(1) per call change, so campaign records stay current
+    without rescanning their calls.
+    """
+
+    def __init__(self):
+        # Call id -> campaign id
+        self.calls: Dict[str, str] = {}
+
+    def load(self, campaigns: Iterable[Dict[str, Any]]):
+        self.calls = {call_id: campaign["id"] for campaign in campaigns for call_id in campaign.get("call_ids", ())}
+
+    def add(self, campaign: Dict[str, Any], call_ids: Iterable[str]):
+        for call_id in call_ids:
+            self.calls[call_id] = campaign["id"]
+
+    def campaign_of(self, call_id: str) -> Optional[str]:
+        return self.calls.get(call_id)
+
+    def transition(self, campaign: Dict[str, Any], previous: str, call: Dict[str, Any], now: str) -> Dict[str, Any]:
+        """Apply a call's move from status previous to its current status; returns the changed fields."""
+        progress, outcomes = campaign["progress"], campaign["outcomes"]
+        status = call["status"]
+        if previous == status:
+            return {}
+        if previous in progress:
+            progress[previous] -= 1
+        if status in progress:
+            progress[status] += 1
+        if status in ENDED_STATUSES and call.get("outcome"):
+            outcomes[call["outcome"]] = outcomes.get(call["outcome"], 0) + 1
+
+        changes: Dict[str, Any] = {"progress": progress, "outcomes": outcomes, "updated_at": now}
+        if campaign["status"] == "scheduled" and status == "in_progress":
+            changes.update(status="running", started_at=now)
+        open_calls = progress["scheduled"] + progress["in_progress"]
+        if open_calls == 0 and campaign["status"] != "completed":
+            changes.update(status="completed", completed_at=now)
+            changes.setdefault("started_at", campaign.get("started_at") or now)
+        total = campaign["total_calls"]
+        reached = progress["completed"]
+        changes["completion_rate"] = round((total - open_calls) / total * 100, 1) if total else 100.0
+        changes["answer_rate"] = round(reached / (total - open_calls) * 100, 1) if total - open_calls else 0.0
+        campaign.update(changes)
+        return changes
+
+
+segment_index = SegmentIndex()
+campaign_tracker = CampaignTracker()
@@ -0,0 +1,100 @@
+"""
+In-Process Change Feed for the Standalone Demo
+Every write publishes a small delta; each connected dashboard gets its own
+bounded queue, drained by the /api/stream Server-Sent Events endpoint.
+"""
+
+from typing import Any, AsyncIterator, Dict, Optional, Set
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per client before it is considered too slow and resynced
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# Idle streams send an SSE comment this often so proxies keep them open
+KEEPALIVE_SECONDS = 15.0
+
+# Sentinel queued for a subscriber whose buffered events were dropped
+RESYNC = object()
+
+
+class Subscription:
+    """One connected client: a bounded queue of pending events."""
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+
+    def offer(self, event: Dict[str, Any]):
+        """Queue an event; on overflow drop the backlog and ask the client to resync."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+                self.dropped += 1
+            self.queue.put_nowait(RESYNC)
+
+
+class ChangeFeed:
+    """Fans published deltas out to every subscriber without ever blocking the writer."""
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self.subscribers: Set[Subscription] = set()
+        self.seq = 0
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self.queue_size)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self.subscribers.discard(subscription)
+
+    def publish(self, collection: str, op: str, record_id: Optional[str], changes: Optional[Dict[str, Any]] = None):
+        """Publish a delta: which record of which collection changed, and how."""
+        self.seq += 1
+        event = {
+            "seq": self.seq,
+            "collection": collection,
+            "op": op,
+            "id": record_id,
+            "changes": changes,
+        }
+        for subscription in self.subscribers:
+            subscription.offer(event)
+
+    async def stream(self, subscription: Subscription, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Yield a subscription's events as SSE messages until the client disconnects."""
+        try:
+            # Deltas aren't retained, so a reconnecting client that missed some must refetch
+            if last_event_id is not None and last_event_id != str(self.seq):
+                yield format_sse("resync", {"seq": self.seq}, self.seq)
+            else:
+                yield format_sse("ready", {"seq": self.seq}, self.seq)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if event is RESYNC:
+                    logger.info(f"Change feed subscriber fell behind; dropped {subscription.dropped} events")
+                    yield format_sse("resync", {"seq": self.seq}, self.seq)
+                else:
+                    yield format_sse("change", event, event["seq"])
+        finally:
+            self.unsubscribe(subscription)
+
+
+def format_sse(event: str, data: Dict[str, Any], event_id: int) -> str:
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str, separators=(',', ':'))}\n\n"
+
+
+change_feed = ChangeFeed()
@@ -0,0 +1,155 @@
+"""
+Columnar Analytics Export for the Standalone Demo
+Writes records as Parquet or Arrow IPC files with typed columns and
+dictionary-encoded enum fields, so notebooks can load whole collections
+without paging through the JSON API. Requires pyarrow (optional).
+"""
+
+from datetime import date, datetime, timezone
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Type
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; only the columnar export needs it
+    pa = None
+    pq = None
+
+# Rows buffered per record batch (and Parquet row group)
+ROW_GROUP_SIZE = 65536
+
+COLUMNAR_FORMATS = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+
+def _plain(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    """Stored timestamps are ISO strings or datetimes; naive ones are UTC."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    elif isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class Column:
+    """One typed column of an analytics table.
+
+    kind is "string", "int", "float", "timestamp" or "enum". Enum columns
+    are dictionary-encoded against the enum's full value list, so codes
+    are identical across files and batches; values outside it become null.
+    path reaches into nested records, e.g. ("factors", "attendance_rate").
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str = "string",
+        enum: Optional[Type[Enum]] = None,
+        path: Optional[Tuple[str, ...]] = None,
+    ):
+        self.name = name
+        self.kind = "enum" if enum is not None else kind
+        self.path = path or (name,)
+        self.values = tuple(member.value for member in enum) if enum is not None else ()
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def extract(self, record: Dict[str, Any]) -> Any:
+        value = record
+        for key in self.path:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+
+    def arrow_type(self):
+        if self.kind == "enum":
+            return pa.dictionary(pa.int8(), pa.string())
+        if self.kind == "int":
+            return pa.int32()
+        if self.kind == "float":
+            return pa.float64()
+        if self.kind == "timestamp":
+            return pa.timestamp("us", tz="UTC")
+        return pa.string()
+
+    def to_array(self, values: List[Any]):
+        if self.kind == "enum":
+            codes = pa.array([self.codes.get(_plain(value)) for value in values], pa.int8())
+            return pa.DictionaryArray.from_arrays(codes, pa.array(self.values, pa.string()))
+        if self.kind == "timestamp":
+            return pa.array([_timestamp(value) for value in values], self.arrow_type())
+        if self.kind == "int":
+            return pa.array([None if value is None else int(value) for value in values], pa.int32())
+        if self.kind == "float":
+            return pa.array([None if value is None else float(value) for value in values], pa.float64())
+        return pa.array([None if value is None else str(_plain(value)) for value in values], pa.string())
+
+
+class ColumnarWriter:
+    """Accumulates records column by column and writes them as record batches."""
+
+    def __init__(self, columns: Sequence[Column], sink: Any, file_format: str = "parquet"):
+        if pa is None:
+            raise RuntimeError("Columnar export needs pyarrow (pip install pyarrow)")
+        self.columns = list(columns)
+        self.schema = pa.schema([pa.field(column.name, column.arrow_type()) for column in self.columns])
+        self.file_format = file_format
+        if file_format == "parquet":
+            self._writer = pq.ParquetWriter(sink, self.schema, compression="zstd")
+        else:
+            self._writer = pa.ipc.new_file(sink, self.schema)
+        self._buffers: List[List[Any]] = [[] for _ in self.columns]
+        self.rows = 0
+
+    def write(self, records: Iterable[Dict[str, Any]]):
+        buffers = self._buffers
+        for record in records:
+            for column, buffer in zip(self.columns, buffers):
+                buffer.append(column.extract(record))
+            if len(buffers[0]) >= ROW_GROUP_SIZE:
+                self.flush()
+
+    def flush(self):
+        if not self._buffers or not self._buffers[0]:
+            return
+        batch = pa.RecordBatch.from_arrays(
+            [column.to_array(buffer) for column, buffer in zip(self.columns, self._buffers)],
+            schema=self.schema,
+        )
+        if self.file_format == "parquet":
+            self._writer.write_table(pa.Table.from_batches([batch]))
+        else:
+            self._writer.write_batch(batch)
+        self.rows += batch.num_rows
+        for buffer in self._buffers:
+            buffer.clear()
+
+    def close(self):
+        self.flush()
+        self._writer.close()
+
+
+def export_columnar(
+    columns: Sequence[Column],
+    records: Iterable[Dict[str, Any]],
+    file_format: str = "parquet",
+) -> bytes:
+    """Encode records to an in-memory Parquet or Arrow IPC file."""
+    if pa is None:
+        raise RuntimeError("Columnar export needs pyarrow (pip install pyarrow)")
+    sink = pa.BufferOutputStream()
+    writer = ColumnarWriter(columns, sink, file_format)
+    writer.write(records)
+    writer.close()
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,291 @@
+"""
+Health Score Engine
+Derives the five health factors from what actually happened to a convert:
+follow-up contacts, voice-call outcomes and sentiment, and stage history
+(class enrollment is implied by the stage).
+The factors are combined with configurable weights. Whole populations are
+scored at once on NumPy arrays; single converts go through the same
+formulas on plain floats.
+"""
+
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import math
+
+try:
+    import numpy as np
+except ImportError:  # numpy is in requirements.txt; without it populations are scored one convert at a time
+    np = None
+
+FACTORS = ("attendance_rate", "engagement_level", "response_time", "spiritual_growth", "social_connection")
+
+DEFAULT_WEIGHTS = {
+    "attendance_rate": 0.25,
+    "engagement_level": 0.25,
+    "response_time": 0.15,
+    "spiritual_growth": 0.25,
+    "social_connection": 0.10,
+}
+
+# Spiritual growth implied by each stage of the discipleship pipeline
+STAGE_GROWTH = {
+    "new": 30.0,
+    "in_followup": 45.0,
+    "in_classes": 55.0,
+    "in_house_fellowship": 75.0,
+    "established": 95.0,
+    "handed_over": 70.0,
+    "inactive": 5.0,
+}
+
+# Stages that imply class enrollment or house fellowship membership
+CLASS_STAGES = frozenset({"in_classes", "in_house_fellowship", "established", "handed_over"})
+FELLOWSHIP_STAGES = frozenset({"in_house_fellowship", "established", "handed_over"})
+
+# Call outcomes counted as a positive response
+POSITIVE_OUTCOMES = frozenset({"interested", "callback_requested"})
+
+# Contacts that were attempted and can no longer be attended (scheduled ones don't count yet)
+FOLLOWUP_ATTEMPTED = frozenset({"completed", "no_response", "missed", "failed"})
+CALL_ATTEMPTED = frozenset({"completed", "failed", "no_answer"})
+
+# response_time halves for every this many days without a contact
+CONTACT_HALF_LIFE_DAYS = 14.0
+
+# Days at one stage after which the full stagnation penalty applies
+STAGNATION_DAYS = 180.0
+STAGNATION_PENALTY = 15.0
+
+# Positive responses a convert is credited with before any contact: coming forward is one.
+# Together with the stage growth above it keeps a new or just-contacted convert out of the
+# at-risk band (below 40) until weeks pass without a contact.
+ENGAGEMENT_PRIOR = 1.5
+
+# Share of engagement_level that the convert's call sentiment (-1..1) can add or take away
+SENTIMENT_ENGAGEMENT = 0.2
+
+DAY_SECONDS = 86400.0
+
+# Convert fields the score depends on; writes touching them call for a rescore
+SCORED_FIELDS = frozenset({"stage", "stage_updated_at", "assigned_worker_id", "sentiment_score"})
+
+
+def _epoch(value: Any) -> float:
+    """Seconds since the epoch for a stored timestamp (ISO string, datetime or date); NaN if missing."""
+    if not value:
+        return math.nan
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return math.nan
+    elif isinstance(value, date) and not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _plain(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+
+def _followup_event(record: Dict[str, Any]):
+    """(attempted, attended, positive, contact time) of a follow-up record."""
+    status = _plain(record.get("status"))
+    attended = status == "completed"
+    contact = _epoch(record.get("completed_date") or record.get("scheduled_date")) if attended else math.nan
+    return status in FOLLOWUP_ATTEMPTED, attended, False, contact
+
+
+def _call_event(record: Dict[str, Any]):
+    """(attempted, attended, positive, contact time) of a voice call."""
+    status = _plain(record.get("status"))
+    attended = status == "completed"
+    positive = attended and record.get("outcome") in POSITIVE_OUTCOMES
+    contact = _epoch(record.get("ended_at") or record.get("started_at")) if attended else math.nan
+    return status in CALL_ATTEMPTED, attended, positive, contact
+
+
+class _ScalarMath:
+    """The few NumPy functions the formulas use, for plain floats."""
+
+    exp = staticmethod(math.exp)
+
+    @staticmethod
+    def minimum(a, b):
+        return min(a, b)
+
+    @staticmethod
+    def maximum(a, b):
+        return max(a, b)
+
+
+def _factor_values(f: Dict[str, Any], now: float, xp) -> Dict[str, Any]:
+    """The factor formulas; f holds floats (xp=_ScalarMath) or arrays (xp=numpy)."""
+    days_since_contact = xp.maximum(now - f["last_contact"], 0.0) / DAY_SECONDS
+    days_in_stage = xp.maximum(now - f["stage_since"], 0.0) / DAY_SECONDS
+
+    return {
+        # Share of attempted contacts that happened, smoothed toward 50% when there are few
+        "attendance_rate": 100.0 * (f["attended"] + 1.0) / (f["attempted"] + 2.0),
+        # Saturates as positive responses, completed follow-ups and class enrollment accumulate,
+        # lifted or lowered by how the convert sounds on calls
+        "engagement_level": xp.minimum(
+            100.0 * (1.0 - xp.exp(-(ENGAGEMENT_PRIOR + f["positive"] + 0.5 * f["followups_done"]
+                                    + 2.0 * f["enrolled"]) / 3.0))
+            * (1.0 + SENTIMENT_ENGAGEMENT * f["sentiment"]),
+            100.0,
+        ),
+        "response_time": 100.0 * 0.5 ** (days_since_contact / CONTACT_HALF_LIFE_DAYS),
+        # Stage progress, less a penalty for sitting at one stage for months
+        "spiritual_growth": xp.maximum(
+            f["stage_growth"]
+            - STAGNATION_PENALTY * xp.minimum(days_in_stage / STAGNATION_DAYS, 1.0),
+            0.0,
+        ),
+        "social_connection": xp.minimum(
+            35.0 * f["has_worker"] + 45.0 * f["in_fellowship"] + 5.0 * f["attended"],
+            100.0,
+        ),
+    }
+
+
+def _weighted_score(factors: Dict[str, Any], weights: Dict[str, float]) -> Any:
+    total = sum(weights[name] for name in FACTORS)
+    return sum(weights[name] * factors[name] for name in FACTORS) / total
+
+
+def _convert_features(convert: Dict[str, Any]) -> Dict[str, float]:
+    stage = _plain(convert.get("stage"))
+    created = _epoch(convert.get("created_at"))
+    stage_since = _epoch(convert.get("stage_updated_at"))
+    return {
+        "created": created,
+        "stage_since": created if math.isnan(stage_since) else stage_since,
+        "stage_growth": STAGE_GROWTH.get(stage, 30.0),
+        "enrolled": float(stage in CLASS_STAGES),
+        "has_worker": float(bool(convert.get("assigned_worker_id"))),
+        # Rolled-up sentiment of the convert's call lines; neutral until they have any
+        "sentiment": float(convert.get("sentiment_score") or 0.0),
+        "in_fellowship": float(stage in FELLOWSHIP_STAGES),
+    }
+
+
+def score_convert(
+    convert: Dict[str, Any],
+    followup_records: Iterable[Dict[str, Any]] = (),
+    voice_calls: Iterable[Dict[str, Any]] = (),
+    now: Optional[datetime] = None,
+    weights: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    """Score one convert from its own follow-up records and voice calls."""
+    now_ts = (now or datetime.now(timezone.utc)).timestamp()
+    f = _convert_features(convert)
+    attempted = attended = positive = 0.0
+    last_contact = f["created"]
+
+    events = [_followup_event(r) for r in followup_records]
+    followups_done = float(sum(1 for event in events if event[1]))
+    events += [_call_event(r) for r in voice_calls]
+    for was_attempted, was_attended, was_positive, contact in events:
+        attempted += was_attempted
+        attended += was_attended
+        positive += was_positive
+        if not math.isnan(contact) and (math.isnan(last_contact) or contact > last_contact):
+            last_contact = contact
+
+    f.update(attempted=attempted, attended=attended, positive=positive, followups_done=followups_done)
+    f["last_contact"] = now_ts if math.isnan(last_contact) else last_contact
+    if math.isnan(f["stage_since"]):
+        f["stage_since"] = now_ts
+
+    factors = _factor_values(f, now_ts, _ScalarMath)
+    score = _weighted_score(factors, weights or DEFAULT_WEIGHTS)
+    return {
+        "convert_id": convert.get("id"),
+        "score": int(round(score)),
+        "factors": {name: int(round(value)) for name, value in factors.items()},
+    }
+
+
+def score_population(
+    converts: Sequence[Dict[str, Any]],
+    followup_records: Iterable[Dict[str, Any]] = (),
+    voice_calls: Iterable[Dict[str, Any]] = (),
+    now: Optional[datetime] = None,
+    weights: Optional[Dict[str, float]] = None,
+) -> List[Dict[str, Any]]:
+    """Score every convert at once; results are in the order of converts."""
+    if np is None:
+        by_convert: Dict[Any, Dict[str, list]] = {c.get("id"): {"followups": [], "calls": []} for c in converts}
+        for record in followup_records:
+            if record.get("convert_id") in by_convert:
+                by_convert[record["convert_id"]]["followups"].append(record)
+        for record in voice_calls:
+            if record.get("convert_id") in by_convert:
+                by_convert[record["convert_id"]]["calls"].append(record)
+        return [
+            score_convert(c, by_convert[c.get("id")]["followups"], by_convert[c.get("id")]["calls"], now, weights)
+            for c in converts
+        ]
+
+    n = len(converts)
+    if not n:
+        return []
+    now_ts = (now or datetime.now(timezone.utc)).timestamp()
+    index = {c.get("id"): i for i, c in enumerate(converts)}
+
+    # Per-convert features, one column per feature
+    rows = [_convert_features(c) for c in converts]
+    f = {name: np.fromiter((row[name] for row in rows), dtype=np.float64, count=n) for name in rows[0]}
+
+    # Per-event columns, aggregated onto converts with bincount / maximum.at
+    def aggregate(records, classify):
+        positions, attempted, attended, positive, contact = [], [], [], [], []
+        for record in records:
+            position = index.get(record.get("convert_id"))
+            if position is None:
+                continue
+            event = classify(record)
+            positions.append(position)
+            attempted.append(event[0])
+            attended.append(event[1])
+            positive.append(event[2])
+            contact.append(event[3])
+        positions = np.asarray(positions, dtype=np.int64)
+        return (
+            positions,
+            np.bincount(positions, weights=np.asarray(attempted, dtype=np.float64), minlength=n),
+            np.bincount(positions, weights=np.asarray(attended, dtype=np.float64), minlength=n),
+            np.bincount(positions, weights=np.asarray(positive, dtype=np.float64), minlength=n),
+            np.asarray(contact, dtype=np.float64),
+        )
+
+    followup_positions, f_attempted, f_attended, f_positive, f_contact = aggregate(followup_records, _followup_event)
+    call_positions, c_attempted, c_attended, c_positive, c_contact = aggregate(voice_calls, _call_event)
+
+    f["attempted"] = f_attempted + c_attempted
+    f["attended"] = f_attended + c_attended
+    f["positive"] = f_positive + c_positive
+    f["followups_done"] = f_attended
+
+    last_contact = f["created"].copy()
+    for positions, contact in ((followup_positions, f_contact), (call_positions, c_contact)):
+        known = ~np.isnan(contact)
+        np.fmax.at(last_contact, positions[known], contact[known])
+    f["last_contact"] = np.where(np.isnan(last_contact), now_ts, last_contact)
+    f["stage_since"] = np.where(np.isnan(f["stage_since"]), now_ts, f["stage_since"])
+
+    factors = _factor_values(f, now_ts, np)
+    scores = np.rint(_weighted_score(factors, weights or DEFAULT_WEIGHTS)).astype(np.int64).tolist()
+    factor_lists = {name: np.rint(values).astype(np.int64).tolist() for name, values in factors.items()}
+
+    return [
+        {
+            "convert_id": converts[i].get("id"),
+            "score": scores[i],
+            "factors": {name: factor_lists[name][i] for name in FACTORS},
+        }
+        for i in range(n)
+    ]
@@ -0,0 +1,281 @@
+"""
+Convert Import Pipeline for the Standalone Demo
+Reads CSV or XLSX uploads of convert cards row by row, normalizes Nigerian
+phone numbers, validates rows in chunks on a worker pool and hands valid
+rows to a writer in batches, tracking progress on an ImportJob.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Tuple, Type
+from collections import OrderedDict
+from pydantic import BaseModel, ValidationError
+import asyncio
+import csv
+import io
+import logging
+import os
+import re
+import uuid
+
+from bulk import validation_errors
+
+try:
+    import openpyxl
+except ImportError:  # XLSX uploads need openpyxl; CSV always works
+    openpyxl = None
+
+logger = logging.getLogger(__name__)
+
+# Rows validated per worker task, and rows written per batch
+IMPORT_CHUNK_SIZE = 500
+
+# Validation workers; also the number of chunks in flight at once
+IMPORT_WORKERS = min(4, os.cpu_count() or 1)
+
+# Uploads up to this size stay in memory while spooling; larger ones go to disk
+IMPORT_SPOOL_SIZE = 1024 * 1024
+
+# Largest upload accepted
+IMPORT_MAX_BYTES = 50 * 1024 * 1024
+
+# Row errors kept on a job; later errors are only counted
+MAX_REPORTED_ERRORS = 1000
+
+# Finished jobs kept for the status endpoint
+MAX_IMPORT_JOBS = 50
+
+CSV_MEDIA_TYPES = ("text/csv", "application/csv", "text/plain")
+XLSX_MEDIA_TYPES = ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",)
+
+# Spreadsheet headers people actually use, mapped to ConvertCreate fields
+HEADER_ALIASES = {
+    "firstname": "first_name",
+    "first": "first_name",
+    "given_name": "first_name",
+    "lastname": "last_name",
+    "last": "last_name",
+    "surname": "last_name",
+    "phone_number": "phone",
+    "mobile": "phone",
+    "mobile_number": "phone",
+    "telephone": "phone",
+    "email_address": "email",
+    "sex": "gender",
+    "dob": "date_of_birth",
+    "birthday": "date_of_birth",
+    "birth_date": "date_of_birth",
+    "town": "city",
+    "job": "occupation",
+    "profession": "occupation",
+    "comments": "notes",
+}
+
+# Mobile prefixes after the leading 0, as generate_nigerian_phone issues them (0803..., 0705..., 0913...)
+NIGERIAN_MOBILE_PREFIXES = ("70", "80", "81", "90", "91")
+
+_PHONE_PUNCTUATION = re.compile(r"[\s\-().]")
+
+
+def normalize_phone(raw: Any) -> Optional[str]:
+    """Normalize a Nigerian mobile number to 11-digit local form (08031234567).
+
+    Accepts +234/234 prefixes, missing leading zeros (spreadsheets drop
+    them from numeric cells) and common punctuation. Returns None if the
+    value isn't a Nigerian mobile number.
+    """
+    if isinstance(raw, float) and raw.is_integer():
+        raw = int(raw)
+    digits = _PHONE_PUNCTUATION.sub("", str(raw))
+    if digits.startswith("+"):
+        digits = digits[1:]
+    if not digits.isdigit():
+        return None
+
+    if digits.startswith("234") and len(digits) == 13:
+        digits = digits[3:]
+    elif digits.startswith("0") and len(digits) == 11:
+        digits = digits[1:]
+    if len(digits) != 10 or not digits.startswith(NIGERIAN_MOBILE_PREFIXES):
+        return None
+    return "0" + digits
+
+
+def normalize_header(name: Any) -> str:
+    key = re.sub(r"[^a-z0-9]+", "_", str(name or "").strip().lower()).strip("_")
+    return HEADER_ALIASES.get(key, key)
+
+
+def iter_csv_rows(file: IO[bytes]) -> Iterator[Dict[str, Any]]:
+    """Yield each CSV data row as a dict keyed by normalized header."""
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    header = [normalize_header(name) for name in next(reader, [])]
+    for values in reader:
+        yield dict(zip(header, values))
+
+
+def iter_xlsx_rows(file: IO[bytes]) -> Iterator[Dict[str, Any]]:
+    """Yield each row of the first worksheet as a dict keyed by normalized header."""
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [normalize_header(name) for name in next(rows, ())]
+        for values in rows:
+            yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def clean_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop unnamed columns and blank cells, so optional fields fall back to defaults."""
+    cleaned = {}
+    for key, value in row.items():
+        if isinstance(value, str):
+            value = value.strip()
+        if key and value not in (None, ""):
+            cleaned[key] = value
+    return cleaned
+
+
+def validate_rows(
+    model: Type[BaseModel],
+    first_row: int,
+    rows: List[Dict[str, Any]],
+) -> Tuple[List[BaseModel], List[Dict[str, Any]]]:
+    """Validate a chunk of rows; returns (valid models, row errors). Runs on a worker."""
+    valid, errors = [], []
+    for row_number, row in enumerate(rows, start=first_row):
+        row = clean_row(row)
+        if not row:
+            continue
+        if "phone" in row:
+            phone = normalize_phone(row["phone"])
+            if phone is None:
+                errors.append({"row": row_number, "errors": [
+                    {"field": "phone", "message": f"Not a Nigerian mobile number: {row['phone']}"}
+                ]})
+                continue
+            row["phone"] = phone
+        try:
+            valid.append(model.model_validate(row))
+        except ValidationError as e:
+            errors.append({"row": row_number, "errors": validation_errors(e)})
+    return valid, errors
+
+
+class ImportJob:
+    """Progress and row-level error report of one import."""
+
+    def __init__(self, filename: Optional[str], created_by: str):
+        self.id = str(uuid.uuid4())
+        self.filename = filename
+        self.created_by = created_by
+        self.status = "pending"
+        self.rows_processed = 0
+        self.rows_imported = 0
+        self.rows_failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.message: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc).isoformat()
+        self.finished_at: Optional[str] = None
+
+    def record_errors(self, errors: List[Dict[str, Any]]):
+        self.rows_failed += len(errors)
+        room = MAX_REPORTED_ERRORS - len(self.errors)
+        if room > 0:
+            self.errors.extend(errors[:room])
+
+    def finish(self, status: str, message: Optional[str] = None):
+        self.status = status
+        self.message = message
+        self.finished_at = datetime.now(timezone.utc).isoformat()
+
+    def to_dict(self, include_errors: bool = True) -> Dict[str, Any]:
+        job = {
+            "id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "rows_processed": self.rows_processed,
+            "rows_imported": self.rows_imported,
+            "rows_failed": self.rows_failed,
+            "message": self.message,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+        if include_errors:
+            job["errors"] = self.errors
+            job["errors_truncated"] = self.rows_failed > len(self.errors)
+        return job
+
+
+class ConvertImporter:
+    """Runs import jobs: spool the upload, then parse, validate and write in chunks."""
+
+    def __init__(self, workers: int = IMPORT_WORKERS, chunk_size: int = IMPORT_CHUNK_SIZE):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.jobs: "OrderedDict[str, ImportJob]" = OrderedDict()
+        self._pool: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def pool(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="convert-import")
+        return self._pool
+
+    def create_job(self, filename: Optional[str], created_by: str) -> ImportJob:
+        job = ImportJob(filename, created_by)
+        self.jobs[job.id] = job
+        while len(self.jobs) > MAX_IMPORT_JOBS:
+            self.jobs.popitem(last=False)
+        return job
+
+    async def run(
+        self,
+        job: ImportJob,
+        file: IO[bytes],
+        file_format: str,
+        model: Type[BaseModel],
+        write_batch: Callable[[List[BaseModel]], int],
+    ):
+        """Import every row of a spooled upload; write_batch stores valid models, returning the count written."""
+        loop = asyncio.get_running_loop()
+        job.status = "running"
+        try:
+            rows = iter_xlsx_rows(file) if file_format == "xlsx" else iter_csv_rows(file)
+            next_row = 2  # row 1 is the header
+            while True:
+                # Read the next few chunks off the event loop, then validate them in parallel
+                chunks = await loop.run_in_executor(self.pool, self._read_chunks, rows)
+                if not chunks:
+                    break
+                tasks = []
+                for chunk in chunks:
+                    tasks.append(loop.run_in_executor(self.pool, validate_rows, model, next_row, chunk))
+                    next_row += len(chunk)
+
+                for chunk, (valid, errors) in zip(chunks, await asyncio.gather(*tasks)):
+                    if valid:
+                        job.rows_imported += write_batch(valid)
+                    job.record_errors(errors)
+                    job.rows_processed += len(chunk)
+            job.finish("completed")
+        except Exception as e:
+            logger.error(f"Import {job.id} failed: {e}")
+            job.finish("failed", f"Could not read the upload: {e}")
+        finally:
+            file.close()
+
+    def _read_chunks(self, rows: Iterator[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        chunks = []
+        for _ in range(self.workers):
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            chunks.append(chunk)
+        return chunks
+
+
+convert_importer = ConvertImporter()
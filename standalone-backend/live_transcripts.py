@@ -0,0 +1,225 @@
+"""
+Live Call Transcripts
+Messages of calls in progress are buffered and written to the conversation
+store in coalesced batches, and each write is fanned out to the WebSockets
+watching that call. A watcher reads the call's message log at its own pace,
+so a slow socket only falls behind; it never holds up the call, the writer
+or the other watchers.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+import asyncio
+import inspect
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Longest a message waits before it is written, and the backlog that writes early
+TRANSCRIPT_FLUSH_INTERVAL = 0.25
+TRANSCRIPT_BATCH_SIZE = 200
+
+# Messages sent per WebSocket frame to a watcher that is behind
+WATCHER_BATCH_SIZE = 50
+
+# Idle watchers get a ping this often, which also notices closed sockets
+WATCHER_PING_SECONDS = 15.0
+
+
+class LiveCall:
+    """A call's written messages, the ones being written, its unwritten ones, and who is watching."""
+
+    __slots__ = ("call_id", "messages", "writing", "pending", "ended", "status", "watchers", "opened_at")
+
+    def __init__(self, call_id: str):
+        self.call_id = call_id
+        self.messages: List[Dict[str, Any]] = []
+        self.writing: List[Dict[str, Any]] = []
+        self.pending: List[Dict[str, Any]] = []
+        self.ended = False
+        self.status: Optional[str] = None
+        # One event per watcher, set after each write
+        self.watchers: Set[asyncio.Event] = set()
+        self.opened_at = time.time()
+
+
+class TranscriptHub:
+    """Coalesces conversation writes for live calls and streams them to watchers.
+
+    persist receives lists of conversation records, oldest first; it may
+    return an awaitable (e.g. a Mongo bulk insert), which the hub waits on.
+    """
+
+    def __init__(self, flush_interval: float = TRANSCRIPT_FLUSH_INTERVAL, batch_size: int = TRANSCRIPT_BATCH_SIZE):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.live: Dict[str, LiveCall] = {}
+        # Calls with messages waiting to be written
+        self.dirty: Dict[str, LiveCall] = {}
+        self.unwritten = 0
+        self.persist: Optional[Callable[[List[Dict[str, Any]]], Any]] = None
+        self.counters = {"messages": 0, "writes": 0, "write_errors": 0, "frames": 0}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def open(self, call_id: str) -> LiveCall:
+        live = self.live.get(call_id)
+        if live is None or live.ended:
+            live = self.live[call_id] = LiveCall(call_id)
+        return live
+
+    def append(
+        self,
+        call_id: str,
+        speaker: str,
+        message: str,
+        timestamp: Optional[str] = None,
+        sentiment: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Buffer one message of a live call; it is written and streamed with the next flush."""
+        live = self.open(call_id)
+        record = {
+            "id": str(uuid.uuid4()),
+            "call_id": call_id,
+            "speaker": speaker,
+            "message": message,
+            "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
+            "sentiment": sentiment,
+        }
+        live.pending.append(record)
+        self.dirty[call_id] = live
+        self.unwritten += 1
+        self.counters["messages"] += 1
+        if self.unwritten >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+        return record
+
+    def end(self, call_id: str, status: Optional[str] = None):
+        """Mark a call over; watchers are told once its remaining messages are written."""
+        live = self.live.get(call_id)
+        if live is None:
+            return
+        live.ended = True
+        live.status = status
+        self.dirty[call_id] = live
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def flush(self):
+        """Write every buffered message in one batch, then wake the watchers of the calls written."""
+        if not self.dirty:
+            return
+        calls, self.dirty = list(self.dirty.values()), {}
+        # Messages appended while the write is awaited stay pending for the next flush
+        for live in calls:
+            live.writing, live.pending = live.pending, []
+        batch = [record for live in calls for record in live.writing]
+        if batch and self.persist is not None:
+            try:
+                result = self.persist(batch)
+                if inspect.isawaitable(result):
+                    await result
+                self.counters["writes"] += 1
+            except Exception as e:
+                self.counters["write_errors"] += 1
+                logger.error(f"Writing {len(batch)} conversation messages failed: {e}")
+        self.unwritten -= len(batch)
+        for live in calls:
+            live.messages.extend(live.writing)
+            live.writing = []
+            for event in live.watchers:
+                event.set()
+            self._forget(live)
+
+    def _forget(self, live: LiveCall):
+        if (live.ended and not live.watchers and not live.pending and not live.writing
+                and self.live.get(live.call_id) is live):
+            del self.live[live.call_id]
+
+    async def watch(self, call_id: str, history: Callable[[], List[Dict[str, Any]]]) -> AsyncIterator[Dict[str, Any]]:
+        """Frames for one watcher: "ready", batches of "messages", "ping" while idle and a final "ended".
+
+        A call that is not live is replayed from history(), its stored messages.
+        """
+        live = self.live.get(call_id)
+        if live is None:
+            messages = history()
+            yield {"event": "ready", "call_id": call_id, "live": False}
+            for start in range(0, len(messages), WATCHER_BATCH_SIZE):
+                yield {"event": "messages", "messages": messages[start:start + WATCHER_BATCH_SIZE]}
+            yield {"event": "ended", "call_id": call_id, "status": None}
+            return
+
+        event = asyncio.Event()
+        live.watchers.add(event)
+        cursor = 0
+        try:
+            yield {"event": "ready", "call_id": call_id, "live": True}
+            while True:
+                event.clear()
+                while cursor < len(live.messages):
+                    frame = live.messages[cursor:cursor + WATCHER_BATCH_SIZE]
+                    cursor += len(frame)
+                    self.counters["frames"] += 1
+                    yield {"event": "messages", "messages": frame}
+                if live.ended and not live.pending and not live.writing:
+                    yield {"event": "ended", "call_id": call_id, "status": live.status}
+                    return
+                try:
+                    await asyncio.wait_for(event.wait(), WATCHER_PING_SECONDS)
+                except asyncio.TimeoutError:
+                    yield {"event": "ping"}
+        finally:
+            live.watchers.discard(event)
+            self._forget(live)
+
+    async def _write(self):
+        """Writer task: flush when the backlog is full, a call ends, or flush_interval has passed."""
+        while True:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._write())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._wakeup = None
+        await self.flush()
+
+    def clear(self):
+        """Drop every live call, e.g. on a data reset; watchers are told their call ended."""
+        for live in self.live.values():
+            live.ended = True
+            live.pending = []
+            for event in live.watchers:
+                event.set()
+        self.live = {}
+        self.dirty = {}
+        self.unwritten = 0
+
+    def report(self) -> Dict[str, Any]:
+        now = time.time()
+        return {
+            **self.counters,
+            "unwritten": self.unwritten,
+            "live_calls": [
+                {"call_id": live.call_id, "messages": len(live.messages) + len(live.writing) + len(live.pending),
+                 "watchers": len(live.watchers), "seconds": round(now - live.opened_at, 1)}
+                for live in self.live.values() if not live.ended
+            ],
+        }
+
+
+transcript_hub = TranscriptHub()
@@ -0,0 +1,495 @@
+"""
+Playbook Execution Runtime
+Walks converts through playbook steps in order. A step owned by a person
+becomes a task on a priority work queue: the queue of the user it is
+assigned to, or of its owner role for anyone in that role to take. Taking
+the next tasks pops those heaps rather than scanning executions.
+Automation and system steps are run in batches off the request path.
+"""
+
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Playbooks seeded into playbooks; converts are started on the trigger event
+# (or through the start endpoint)
+DEFAULT_PLAYBOOKS = [
+    {
+        "name": "First Time Visitor Engagement",
+        "description": "Strategy for engaging first-time church visitors",
+        "category": "retention",
+        "trigger": "convert_created",
+        "steps": [
+            {"order": 1, "title": "Immediate Welcome", "description": "Send welcome SMS within 2 hours", "owner": "automation"},
+            {"order": 2, "title": "Personal Call", "description": "Follow-up worker calls within 24 hours", "owner": "followup_worker"},
+            {"order": 3, "title": "Invite to Fellowship", "description": "Invite to house fellowship meeting", "owner": "followup_worker"},
+            {"order": 4, "title": "Sunday Service Reminder", "description": "Send reminder for next Sunday", "owner": "automation"},
+            {"order": 5, "title": "Personal Greeting", "description": "Greet personally on next visit", "owner": "usher_team"},
+        ],
+        "target_audience": "first_time_visitors",
+        "expected_outcome": "70% return for second visit",
+        "is_active": True,
+    },
+    {
+        "name": "At-Risk Member Recovery",
+        "description": "Strategy for re-engaging members showing signs of disengagement",
+        "category": "recovery",
+        "trigger": "no_attendance_14_days",
+        "steps": [
+            {"order": 1, "title": "Identify At-Risk", "description": "System identifies members absent for 2+ weeks", "owner": "system"},
+            {"order": 2, "title": "Welfare Check", "description": "Welfare officer makes welfare check call", "owner": "welfare_officer"},
+            {"order": 3, "title": "Personal Visit", "description": "If no response, schedule home visit", "owner": "followup_leader"},
+            {"order": 4, "title": "Pastoral Care", "description": "Pastor reaches out if still no response", "owner": "pastor"},
+            {"order": 5, "title": "Re-engagement Program", "description": "Enroll in special re-engagement program", "owner": "discipleship_team"},
+        ],
+        "target_audience": "at_risk_members",
+        "expected_outcome": "40% re-engagement rate",
+        "is_active": True,
+    },
+    {
+        "name": "New Member Integration",
+        "description": "Strategy for integrating new members into the church community",
+        "category": "integration",
+        "trigger": "joined_classes",
+        "steps": [
+            {"order": 1, "title": "Foundation Class", "description": "Enroll in foundation class", "owner": "discipleship_team"},
+            {"order": 2, "title": "Department Placement", "description": "Assess and place in appropriate department", "owner": "head_of_departments"},
+            {"order": 3, "title": "House Fellowship", "description": "Connect to nearest house fellowship", "owner": "followup_worker"},
+            {"order": 4, "title": "Mentor Assignment", "description": "Assign a mature member as mentor", "owner": "mentorship_coordinator"},
+            {"order": 5, "title": "Follow-up", "description": "Check-in after 3 months", "owner": "followup_worker"},
+        ],
+        "target_audience": "new_members",
+        "expected_outcome": "80% complete integration within 6 months",
+        "is_active": True,
+    },
+]
+
+# Step owners run by the runtime itself rather than queued for a person
+AUTOMATED_OWNERS = frozenset({"automation", "system"})
+
+# Automated steps run per batch
+AUTOMATION_BATCH_SIZE = 500
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class PlaybookTask:
+    """The current step of an execution, as it sits on a work queue."""
+
+    __slots__ = ("id", "execution", "index", "owner", "assignee_id", "claimed_by", "priority", "queued_at", "queued")
+
+    def __init__(self, execution: "PlaybookExecution", index: int, owner: str):
+        self.id = f"{execution.id}:{index}"
+        self.execution = execution
+        self.index = index
+        self.owner = owner
+        self.assignee_id: Optional[str] = None
+        self.claimed_by: Optional[str] = None
+        self.priority = 0.0
+        self.queued_at = time.time()
+        # Whether the task is waiting on a work queue (counted in its live count)
+        self.queued = False
+
+    @property
+    def live(self) -> bool:
+        """Whether this is still the execution's current, unfinished step."""
+        return self.execution.status == "active" and self.execution.task is self
+
+
+class PlaybookExecution:
+    """One convert's run through one playbook."""
+
+    __slots__ = ("id", "playbook_id", "convert_id", "status", "step", "started_at", "finished_at", "steps", "task")
+
+    def __init__(self, playbook_id: str, convert_id: str, steps: int, started_at: str, execution_id: Optional[str] = None):
+        self.id = execution_id or str(uuid.uuid4())
+        self.playbook_id = playbook_id
+        self.convert_id = convert_id
+        self.status = "active"
+        self.step = 0
+        self.started_at = started_at
+        self.finished_at: Optional[str] = None
+        # Per step: {"status", "assignee_id", "completed_by", "completed_at", "outcome"}
+        self.steps: List[Dict[str, Any]] = [{"status": "pending"} for _ in range(steps)]
+        self.task: Optional[PlaybookTask] = None
+
+    def to_dict(self, definition: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "playbook_id": self.playbook_id,
+            "convert_id": self.convert_id,
+            "status": self.status,
+            "current_step": self.step,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "steps": [
+                dict(state, order=step["order"], title=step["title"], owner=step["owner"])
+                for step, state in zip(definition["steps"], self.steps)
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "PlaybookExecution":
+        execution = cls(record["playbook_id"], record["convert_id"], len(record["steps"]), record["started_at"], record["id"])
+        execution.status = record["status"]
+        execution.step = record["current_step"]
+        execution.finished_at = record.get("finished_at")
+        execution.steps = [
+            {key: value for key, value in step.items() if key not in ("order", "title", "owner")}
+            for step in record["steps"]
+        ]
+        return execution
+
+
+class PlaybookRuntime:
+    """Per-role and per-user priority queues over the current steps of playbook executions.
+
+    assign(execution, step) picks the user a person-owned step goes to (or
+    None for the owner role's queue); priority(execution) orders queues,
+    lowest first; automate(tasks) runs a batch of automated steps and
+    returns an error string or None per task. Changed executions are
+    handed to persist.
+    """
+
+    def __init__(self, batch_size: int = AUTOMATION_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.definitions: Dict[str, Dict[str, Any]] = {}
+        self.by_trigger: Dict[str, List[Dict[str, Any]]] = {}
+        # (playbook id, convert id) -> active execution
+        self.active: Dict[Tuple[str, str], PlaybookExecution] = {}
+        # Queue heaps of (priority, queued at, tiebreak, task); finished or
+        # re-queued tasks are left in place and skipped when popped
+        self.role_queues: Dict[str, List[Tuple[float, float, int, PlaybookTask]]] = {}
+        self.user_queues: Dict[str, List[Tuple[float, float, int, PlaybookTask]]] = {}
+        # Live (unclaimed, unfinished) tasks per queue, since the heaps also hold skipped entries
+        self.role_counts: Dict[str, int] = {}
+        self.user_counts: Dict[str, int] = {}
+        # Tasks taken by each user and not yet completed
+        self.claimed: Dict[str, Dict[str, PlaybookTask]] = {}
+        self.tasks: Dict[str, PlaybookTask] = {}
+        self.automation: Deque[PlaybookTask] = deque()
+        self.assign: Callable[[PlaybookExecution, Dict[str, Any]], Optional[str]] = lambda execution, step: None
+        self.priority: Callable[[PlaybookExecution], float] = lambda execution: 0.0
+        self.automate: Callable[[List[PlaybookTask]], List[Optional[str]]] = lambda tasks: [None] * len(tasks)
+        self.persist: Optional[Callable[[List[PlaybookExecution]], None]] = None
+        self.counters = {"started": 0, "completed": 0, "cancelled": 0, "steps_automated": 0,
+                         "steps_failed": 0, "tasks_claimed": 0, "tasks_completed": 0, "batches": 0}
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def load(self, definitions: Iterable[Dict[str, Any]], executions: Iterable[Dict[str, Any]] = ()):
+        """Replace the definitions and requeue the current steps of stored active executions."""
+        self.definitions = {definition["id"]: definition for definition in definitions}
+        self.by_trigger = {}
+        for definition in self.definitions.values():
+            if definition.get("is_active", True) and definition.get("trigger"):
+                self.by_trigger.setdefault(definition["trigger"], []).append(definition)
+        self.active, self.role_queues, self.user_queues, self.claimed, self.tasks = {}, {}, {}, {}, {}
+        self.role_counts, self.user_counts = {}, {}
+        self.automation = deque()
+        for record in executions:
+            if record.get("status") == "active" and record["playbook_id"] in self.definitions:
+                execution = PlaybookExecution.from_dict(record)
+                self.active[(execution.playbook_id, execution.convert_id)] = execution
+                self._queue(execution, resume=True)
+        self._wake()
+
+    def launch(self, playbook_id: str, convert_ids: Iterable[str]) -> List[PlaybookExecution]:
+        """Start a playbook for converts, skipping ones already active in it."""
+        steps = self.definitions[playbook_id]["steps"]
+        now = _now_iso()
+        started = []
+        for convert_id in convert_ids:
+            key = (playbook_id, convert_id)
+            if key in self.active:
+                continue
+            execution = PlaybookExecution(playbook_id, convert_id, len(steps), now)
+            self.active[key] = execution
+            self._queue(execution)
+            started.append(execution)
+
+        if started:
+            self.counters["started"] += len(started)
+            self._flush(started)
+            self._wake()
+        return started
+
+    def trigger(self, event: str, convert_ids: List[str]) -> List[PlaybookExecution]:
+        """Start converts on every active playbook whose trigger is event."""
+        started = []
+        for definition in self.by_trigger.get(event, ()):
+            started += self.launch(definition["id"], convert_ids)
+        return started
+
+    def cancel(self, convert_id: str) -> List[PlaybookExecution]:
+        """Stop a convert's active executions; their queued tasks are dropped when popped."""
+        cancelled = []
+        for playbook_id in self.definitions:
+            execution = self.active.pop((playbook_id, convert_id), None)
+            if execution is not None:
+                self._drop_task(execution)
+                execution.status = "cancelled"
+                execution.finished_at = _now_iso()
+                cancelled.append(execution)
+        if cancelled:
+            self.counters["cancelled"] += len(cancelled)
+            self._flush(cancelled)
+        return cancelled
+
+    def _queue(self, execution: PlaybookExecution, resume: bool = False):
+        """Put the execution's current step on the automation queue or a work queue."""
+        step = self.definitions[execution.playbook_id]["steps"][execution.step]
+        state = execution.steps[execution.step]
+        task = PlaybookTask(execution, execution.step, step["owner"])
+        execution.task = task
+        self.tasks[task.id] = task
+        if task.owner in AUTOMATED_OWNERS:
+            self.automation.append(task)
+            return
+
+        if resume and state.get("claimed_by"):
+            task.claimed_by = state["claimed_by"]
+            task.assignee_id = state.get("assignee_id")
+            self.claimed.setdefault(task.claimed_by, {})[task.id] = task
+            return
+        task.assignee_id = state.get("assignee_id") if resume else self.assign(execution, step)
+        task.priority = self.priority(execution)
+        state.update(status="queued", assignee_id=task.assignee_id)
+        self._push(task)
+
+    def _push(self, task: PlaybookTask):
+        if task.assignee_id:
+            queue = self.user_queues.setdefault(task.assignee_id, [])
+        else:
+            queue = self.role_queues.setdefault(task.owner, [])
+        heapq.heappush(queue, (task.priority, task.queued_at, next(self._sequence), task))
+        counts, key = self._counts(task)
+        counts[key] = counts.get(key, 0) + 1
+        task.queued = True
+
+    def _counts(self, task: PlaybookTask) -> Tuple[Dict[str, int], str]:
+        """The live-count table and key of the work queue the task goes on."""
+        if task.assignee_id:
+            return self.user_counts, task.assignee_id
+        return self.role_counts, task.owner
+
+    def _unqueue(self, task: PlaybookTask):
+        """Take a task off its queue's live count; its heap entry is popped now or skipped later."""
+        if task.queued:
+            task.queued = False
+            counts, key = self._counts(task)
+            counts[key] -= 1
+
+    @staticmethod
+    def _pop_best(queues: List[List[Tuple[float, float, int, PlaybookTask]]]):
+        """Pop the most urgent live entry across queues, dropping dead entries off their tops; None when empty."""
+        best = None
+        for queue in queues:
+            while queue and (not queue[0][3].live or queue[0][3].claimed_by):
+                heapq.heappop(queue)
+            if queue and (best is None or queue[0] < best[0]):
+                best = queue
+        return heapq.heappop(best) if best is not None else None
+
+    def _drop_task(self, execution: PlaybookExecution):
+        task = execution.task
+        if task is not None:
+            self._unqueue(task)
+            self.tasks.pop(task.id, None)
+            if task.claimed_by:
+                self.claimed.get(task.claimed_by, {}).pop(task.id, None)
+        execution.task = None
+
+    def next_tasks(self, user_id: str, roles: Iterable[str], limit: int = 1) -> List[PlaybookTask]:
+        """Take the most urgent tasks for a user from their own queue and their roles' queues."""
+        queues = [queue for queue in [self.user_queues.get(user_id)] + [self.role_queues.get(r) for r in roles] if queue]
+        taken: List[PlaybookTask] = []
+        changed = []
+        while len(taken) < limit:
+            entry = self._pop_best(queues)
+            if entry is None:
+                break
+            task = entry[3]
+            self._unqueue(task)
+            task.claimed_by = user_id
+            task.execution.steps[task.index].update(status="claimed", claimed_by=user_id, claimed_at=_now_iso())
+            self.claimed.setdefault(user_id, {})[task.id] = task
+            taken.append(task)
+            changed.append(task.execution)
+
+        if taken:
+            self.counters["tasks_claimed"] += len(taken)
+            self._flush(changed)
+        return taken
+
+    def peek(self, user_id: str, roles: Iterable[str], limit: int = 10) -> List[PlaybookTask]:
+        """The tasks next_tasks would hand out, without taking them."""
+        queues = [queue for queue in [self.user_queues.get(user_id)] + [self.role_queues.get(r) for r in roles] if queue]
+        # Pop the top limit entries, then put them back
+        entries = []
+        while len(entries) < limit:
+            entry = self._pop_best(queues)
+            if entry is None:
+                break
+            entries.append(entry)
+        for entry in entries:
+            task = entry[3]
+            heapq.heappush(self.user_queues[task.assignee_id] if task.assignee_id else self.role_queues[task.owner], entry)
+        return [entry[3] for entry in entries]
+
+    def release(self, task_id: str, user_id: str) -> PlaybookTask:
+        """Hand a claimed task back to its queue."""
+        task = self._claimed_task(task_id, user_id)
+        del self.claimed[user_id][task_id]
+        task.claimed_by = None
+        state = task.execution.steps[task.index]
+        state.update(status="queued")
+        state.pop("claimed_by", None)
+        state.pop("claimed_at", None)
+        self._push(task)
+        self._flush([task.execution])
+        return task
+
+    def complete(self, task_id: str, user_id: str, outcome: Optional[str] = None) -> PlaybookExecution:
+        """Finish a claimed task and move its execution on to the next step."""
+        task = self._claimed_task(task_id, user_id)
+        del self.claimed[user_id][task_id]
+        self.counters["tasks_completed"] += 1
+        self._finish_step(task, "completed", user_id, outcome, _now_iso())
+        self._flush([task.execution])
+        self._wake()
+        return task.execution
+
+    def _claimed_task(self, task_id: str, user_id: str) -> PlaybookTask:
+        task = self.claimed.get(user_id, {}).get(task_id)
+        if task is None or not task.live:
+            raise KeyError(task_id)
+        return task
+
+    def _finish_step(self, task: PlaybookTask, status: str, completed_by: Optional[str], outcome: Optional[str], now: str):
+        execution = task.execution
+        self.tasks.pop(task.id, None)
+        execution.task = None
+        execution.steps[task.index].update(
+            status=status, completed_by=completed_by, completed_at=now, outcome=outcome,
+        )
+        if status == "failed":
+            execution.status = "failed"
+            execution.finished_at = now
+            self.active.pop((execution.playbook_id, execution.convert_id), None)
+            return
+        execution.step += 1
+        if execution.step < len(execution.steps):
+            self._queue(execution)
+        else:
+            execution.status = "completed"
+            execution.finished_at = now
+            self.active.pop((execution.playbook_id, execution.convert_id), None)
+            self.counters["completed"] += 1
+
+    def run_automation(self) -> int:
+        """Run one batch of queued automated steps; returns how many ran."""
+        batch = []
+        while self.automation and len(batch) < self.batch_size:
+            task = self.automation.popleft()
+            if task.live:
+                batch.append(task)
+        if not batch:
+            return 0
+
+        try:
+            errors = self.automate(batch)
+        except Exception as e:
+            logger.error(f"Playbook automation batch of {len(batch)} failed: {e}")
+            errors = [str(e)] * len(batch)
+        self.counters["batches"] += 1
+        now = _now_iso()
+        for task, error in zip(batch, errors):
+            if error is None:
+                self.counters["steps_automated"] += 1
+                self._finish_step(task, "completed", task.owner, None, now)
+            else:
+                self.counters["steps_failed"] += 1
+                self._finish_step(task, "failed", task.owner, error, now)
+        self._flush(list({task.execution.id: task.execution for task in batch}.values()))
+        return len(batch)
+
+    def _flush(self, executions: List[PlaybookExecution]):
+        if self.persist is not None:
+            self.persist(executions)
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def to_dict(self, execution: PlaybookExecution) -> Dict[str, Any]:
+        return execution.to_dict(self.definitions[execution.playbook_id])
+
+    def task_dict(self, task: PlaybookTask) -> Dict[str, Any]:
+        step = self.definitions[task.execution.playbook_id]["steps"][task.index]
+        return {
+            "id": task.id,
+            "execution_id": task.execution.id,
+            "playbook_id": task.execution.playbook_id,
+            "convert_id": task.execution.convert_id,
+            "order": step["order"],
+            "title": step["title"],
+            "description": step["description"],
+            "owner": task.owner,
+            "assignee_id": task.assignee_id,
+            "claimed_by": task.claimed_by,
+            "priority": task.priority,
+        }
+
+    async def run(self):
+        """Automation task: run batches while there is work, then wait to be woken."""
+        self._wakeup = asyncio.Event()
+        while True:
+            self._wakeup.clear()
+            try:
+                ran = self.run_automation()
+            except Exception as e:
+                logger.error(f"Playbook automation failed: {e}")
+                ran = 0
+            if ran:
+                await asyncio.sleep(0)
+            elif not self.automation:
+                await self._wakeup.wait()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wakeup = None
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "active_executions": len(self.active),
+            "automation_queue": len(self.automation),
+            "role_queues": {role: self.role_counts.get(role, 0) for role in self.role_queues},
+            "user_queues": {user: count for user, count in self.user_counts.items() if count},
+            "claimed": {user: len(tasks) for user, tasks in self.claimed.items() if tasks},
+        }
+
+
+playbook_runtime = PlaybookRuntime()
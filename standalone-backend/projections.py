@@ -0,0 +1,65 @@
+"""
+Field Projection for List Endpoints
+Lets clients ask for a subset of record fields with ?fields=a,b,c or a
+named shape such as ?fields=card, so list payloads only carry what the
+view renders.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class FieldProjector:
+    """Parses and applies ``fields=`` projections for one collection.
+
+    ``fields`` may be a predefined shape name ("summary", "card") or a
+    comma-separated list of field names. Parsed projections are cached,
+    so the predefined shapes and repeated field lists cost one dict
+    lookup per request.
+    """
+
+    def __init__(self, allowed: Iterable[str], shapes: Dict[str, Iterable[str]]):
+        self.allowed = frozenset(allowed)
+        self.shapes = {name: tuple(fields) for name, fields in shapes.items()}
+        self._cache: Dict[str, Tuple[str, ...]] = dict(self.shapes)
+
+    def parse(self, fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+        """Resolve a ``fields`` parameter to a tuple of field names (None = all fields).
+
+        Raises ValueError for unknown field names.
+        """
+        if not fields:
+            return None
+        cached = self._cache.get(fields)
+        if cached is not None:
+            return cached
+
+        names = ["id"]
+        for name in fields.split(","):
+            name = name.strip()
+            if not name or name in names:
+                continue
+            if name not in self.allowed:
+                raise ValueError(f"Unknown field: {name}")
+            names.append(name)
+
+        projection = tuple(names)
+        # Arbitrary field lists come from clients; keep the cache bounded
+        if len(self._cache) < 256:
+            self._cache[fields] = projection
+        return projection
+
+    @staticmethod
+    def project(record: Dict[str, Any], projection: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+        """Copy only the projected fields of a record (the record itself if no projection)."""
+        if projection is None:
+            return record
+        return {name: record[name] for name in projection if name in record}
+
+    def project_all(
+        self,
+        records: Iterable[Dict[str, Any]],
+        projection: Optional[Tuple[str, ...]],
+    ) -> List[Dict[str, Any]]:
+        if projection is None:
+            return list(records)
+        return [{name: record[name] for name in projection if name in record} for record in records]
@@ -0,0 +1,129 @@
+"""
+Bulk Health Score Recalculation for the Standalone Demo
+Rescores a filtered set of converts in chunks off the request path,
+yielding to the event loop between chunks, and hands each chunk's results
+to the server to apply in one batch.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+import asyncio
+import logging
+import uuid
+
+from health_engine import score_population
+
+logger = logging.getLogger(__name__)
+
+# Converts scored per chunk; one vectorized pass each
+RECALCULATION_CHUNK_SIZE = 2000
+
+# Finished jobs kept for the status endpoint
+MAX_RECALCULATION_JOBS = 50
+
+
+def threshold_band(score: Optional[int], thresholds: Sequence[int]) -> int:
+    """Index of the alert band a score falls in; alerts only need re-evaluating when it changes."""
+    if score is None:
+        return -1
+    return sum(1 for threshold in thresholds if score >= threshold)
+
+
+def crossed_threshold(old_score: Optional[int], new_score: int, thresholds: Sequence[int]) -> bool:
+    """Whether a score change crosses any of the alert rules' score thresholds."""
+    return threshold_band(old_score, thresholds) != threshold_band(new_score, thresholds)
+
+
+class RecalculationJob:
+    """Progress of one bulk recalculation."""
+
+    def __init__(self, filters: Dict[str, Any], created_by: str):
+        self.id = str(uuid.uuid4())
+        self.filters = filters
+        self.created_by = created_by
+        self.status = "pending"
+        self.total = 0
+        self.processed = 0
+        self.changed = 0
+        self.alerts_evaluated = 0
+        self.message: Optional[str] = None
+        self.created_at = datetime.now(timezone.utc).isoformat()
+        self.finished_at: Optional[str] = None
+
+    def finish(self, status: str, message: Optional[str] = None):
+        self.status = status
+        self.message = message
+        self.finished_at = datetime.now(timezone.utc).isoformat()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "filters": self.filters,
+            "status": self.status,
+            "total": self.total,
+            "processed": self.processed,
+            "changed": self.changed,
+            "alerts_evaluated": self.alerts_evaluated,
+            "progress": round(self.processed / self.total, 4) if self.total else 1.0,
+            "message": self.message,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class HealthRecalculator:
+    """Runs recalculation jobs chunk by chunk on the event loop."""
+
+    def __init__(self, chunk_size: int = RECALCULATION_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self.jobs: "OrderedDict[str, RecalculationJob]" = OrderedDict()
+
+    def create_job(self, filters: Dict[str, Any], created_by: str) -> RecalculationJob:
+        job = RecalculationJob(filters, created_by)
+        self.jobs[job.id] = job
+        while len(self.jobs) > MAX_RECALCULATION_JOBS:
+            self.jobs.popitem(last=False)
+        return job
+
+    async def run(
+        self,
+        job: RecalculationJob,
+        converts: Sequence[Dict[str, Any]],
+        followup_records: Sequence[Dict[str, Any]],
+        voice_calls: Sequence[Dict[str, Any]],
+        apply_batch: Callable[[List[Dict[str, Any]]], Tuple[int, int]],
+    ):
+        """Score converts chunk by chunk; apply_batch stores a chunk's results, returning (changed, alerts evaluated)."""
+        job.status = "running"
+        job.total = len(converts)
+        try:
+            # Group events once so each chunk only sees its own converts' history
+            followups_by_convert: Dict[str, List[Dict[str, Any]]] = {}
+            for record in followup_records:
+                followups_by_convert.setdefault(record.get("convert_id"), []).append(record)
+            calls_by_convert: Dict[str, List[Dict[str, Any]]] = {}
+            for call in voice_calls:
+                calls_by_convert.setdefault(call.get("convert_id"), []).append(call)
+
+            for start in range(0, len(converts), self.chunk_size):
+                chunk = converts[start:start + self.chunk_size]
+                ids = [convert["id"] for convert in chunk]
+                results = score_population(
+                    chunk,
+                    [record for convert_id in ids for record in followups_by_convert.get(convert_id, ())],
+                    [call for convert_id in ids for call in calls_by_convert.get(convert_id, ())],
+                )
+                changed, alerts = apply_batch(results)
+                job.changed += changed
+                job.alerts_evaluated += alerts
+                job.processed += len(chunk)
+                # Let requests in between chunks
+                await asyncio.sleep(0)
+            job.finish("completed")
+        except Exception as e:
+            logger.error(f"Health score recalculation {job.id} failed: {e}")
+            job.finish("failed", str(e))
+
+
+health_recalculator = HealthRecalculator()
@@ -0,0 +1,164 @@
+"""
+JSON Response Pipeline for the Standalone Demo
+Encodes API payloads with orjson when it is installed (stdlib json otherwise)
+and gzips large responses for clients that accept it.
+"""
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Optional, Tuple
+from collections import OrderedDict
+from pydantic import BaseModel
+import hashlib
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; stdlib json is the fallback
+    orjson = None
+
+# Responses smaller than this are sent uncompressed; gzip overhead isn't worth it
+GZIP_MINIMUM_SIZE = 1024
+
+# zlib level 6 gives nearly all of level 9's ratio at a fraction of the CPU
+GZIP_COMPRESS_LEVEL = 6
+
+# Streamed responses sent uncompressed: Starlette's gzip responder never flushes
+# mid-stream, so it would hold live events and export chunks back
+STREAMING_MEDIA_TYPES = {"text/event-stream", "application/x-ndjson", "text/csv"}
+
+JSON_ENCODER = "orjson" if orjson is not None else "json"
+
+
+def _default(obj: Any) -> Any:
+    """Encode the non-JSON types that show up in stored demo records."""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def dumps(content: Any) -> bytes:
+        """Serialize content to compact UTF-8 JSON."""
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+else:
+    def dumps(content: Any) -> bytes:
+        """Serialize content to compact UTF-8 JSON."""
+        return json.dumps(
+            content,
+            default=_default,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+
+class _StreamingGZipResponder(GZipResponder):
+    """GZipResponder that passes STREAMING_MEDIA_TYPES responses through as they're sent."""
+
+    passthrough = False
+
+    async def send_with_gzip(self, message):
+        if message["type"] == "http.response.start":
+            media_type = Headers(raw=message["headers"]).get("content-type", "").split(";", 1)[0].strip().lower()
+            self.passthrough = media_type in STREAMING_MEDIA_TYPES
+        if self.passthrough:
+            await self.send(message)
+        else:
+            await super().send_with_gzip(message)
+
+
+class APIGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves streamed responses alone.
+
+    Whether to compress is decided from the response's Content-Type, so
+    Server-Sent Events and the CSV/NDJSON exports flow chunk by chunk
+    whatever the client sent in Accept.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("accept-encoding", ""):
+            responder = _StreamingGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse that renders with the fastest available encoder.
+
+    Returning one of these from an endpoint also bypasses FastAPI's
+    jsonable_encoder pass, so use it directly for trusted stored dicts.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches etag (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """LRU of rendered JSON bodies keyed by route, query params and data generation.
+
+    Callers pass the generation of every collection the response reads
+    (see DemoDatabase.generation), so any write to those collections
+    yields a new key and a new ETag; unchanged data is served without
+    recomputing, and clients holding the current ETag get a 304.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Tuple[str, bytes]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def respond(self, request: Request, generation: tuple, compute: Callable[[], Any]) -> Response:
+        key = (request.url.path, tuple(sorted(request.query_params.multi_items())), generation)
+        entry = self._entries.get(key)
+        if entry is None:
+            etag = f'"g{hashlib.sha1(repr(key).encode()).hexdigest()[:20]}"'
+        else:
+            etag = entry[0]
+
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        if entry is None:
+            self.misses += 1
+            entry = (etag, dumps(compute()))
+            self._entries[key] = entry
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+
+        return Response(content=entry[1], media_type="application/json", headers=headers)
+
+    def clear(self):
+        self._entries.clear()
@@ -0,0 +1,220 @@
+"""
+Full-Text Search Index
+An inverted index from terms to the documents containing them, kept up to
+date one changed source at a time. A document (a voice call) is made of
+named sources (its transcript, its notes, each conversation message), so
+editing one source only touches the postings of the terms it gained or
+lost. Queries are ranked with BM25; a trailing * searches by prefix.
+"""
+
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import heapq
+import math
+import re
+
+# Common English words not worth indexing
+STOP_WORDS = frozenset("""
+a about after all also am an and any are as at be been before being but by can could did do does
+doing for from had has have having he her here hers him his how i if in into is it its just me more
+most my no nor not now of off on once only or other our ours out over own same she should so some
+such than that the their theirs them then there these they this those through to too under until up
+very was we were what when where which while who whom why will with would you your yours yourself
+""".split())
+
+# Terms a prefix may expand to; longer expansions keep the most frequent terms
+PREFIX_EXPANSION_LIMIT = 50
+
+# BM25 term frequency saturation and length normalization
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_WORD = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased words of text without stop words; a possessive "'s" is dropped ("pastor's" -> "pastor")."""
+    if not text:
+        return []
+    terms = []
+    for word in _WORD.findall(text.lower()):
+        if word.endswith("'s"):
+            word = word[:-2]
+        if word not in STOP_WORDS:
+            terms.append(word)
+    return terms
+
+
+def parse_query(query: str) -> List[Tuple[str, bool]]:
+    """Query terms as (term, is_prefix); "bapt*" is a prefix term, stop words are dropped."""
+    terms = []
+    for raw in query.split():
+        prefix = raw.endswith("*")
+        for term in tokenize(raw.rstrip("*")):
+            terms.append((term, False))
+        if prefix and terms:
+            terms[-1] = (terms[-1][0], True)
+    return list(dict.fromkeys(terms))
+
+
+class TextIndex:
+    """Inverted index over documents made of named text sources."""
+
+    def __init__(self):
+        # Term -> {document id: occurrences}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        # Every indexed term, sorted, for prefix lookups
+        self.terms: List[str] = []
+        # Document id -> {source: term counts of that source}
+        self.sources: Dict[str, Dict[str, Counter]] = {}
+        # Document id -> total terms, and the sum over all documents
+        self.lengths: Dict[str, int] = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def clear(self):
+        self.__init__()
+
+    def set_source(self, doc_id: str, source: str, text: Optional[str]):
+        """Index (or re-index) one source of a document; empty text removes it."""
+        sources = self.sources.get(doc_id)
+        old = sources.get(source) if sources else None
+        new = Counter(tokenize(text))
+        if old == new or (old is None and not new):
+            return
+        if sources is None:
+            sources = self.sources[doc_id] = {}
+        delta = Counter(new)
+        delta.subtract(old or ())
+        if new:
+            sources[source] = new
+        else:
+            del sources[source]
+        self._apply(doc_id, delta)
+        if not sources:
+            del self.sources[doc_id]
+
+    def remove(self, doc_id: str):
+        """Drop a document and all of its sources."""
+        sources = self.sources.pop(doc_id, None)
+        if not sources:
+            return
+        delta: Counter = Counter()
+        for counts in sources.values():
+            delta.subtract(counts)
+        self._apply(doc_id, delta)
+
+    def _apply(self, doc_id: str, delta: Counter):
+        """Add a document's per-term count changes to the postings."""
+        length = self.lengths.get(doc_id, 0)
+        for term, change in delta.items():
+            if not change:
+                continue
+            length += change
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+                insort(self.terms, term)
+            count = posting.get(doc_id, 0) + change
+            if count > 0:
+                posting[doc_id] = count
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self.postings[term]
+                del self.terms[bisect_left(self.terms, term)]
+        self.total_length += length - self.lengths.get(doc_id, 0)
+        if length > 0:
+            self.lengths[doc_id] = length
+        else:
+            self.lengths.pop(doc_id, None)
+
+    def expand(self, prefix: str) -> List[str]:
+        """Indexed terms starting with prefix, most frequent first when there are too many."""
+        start = bisect_left(self.terms, prefix)
+        matches = []
+        for term in self.terms[start:]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        if len(matches) > PREFIX_EXPANSION_LIMIT:
+            matches = heapq.nlargest(PREFIX_EXPANSION_LIMIT, matches, key=lambda term: len(self.postings[term]))
+        return matches
+
+    def search(
+        self,
+        query: str,
+        match_all: bool = True,
+        candidates: Optional[Set[str]] = None,
+    ) -> Tuple[Dict[str, float], Dict[str, Set[str]]]:
+        """BM25 scores of the documents matching query, and the indexed terms each matched.
+
+        With match_all every query term (or, for a prefix, one of its
+        expansions) must occur in a document. candidates, if given, limits
+        the documents considered.
+        """
+        count = len(self.lengths)
+        if not count:
+            return {}, {}
+        average = self.total_length / count
+        scores: Dict[str, float] = {}
+        matched: Dict[str, Set[str]] = {}
+        required: Optional[Set[str]] = None
+        # Rarest query terms first, so "all" narrows the candidates early
+        groups = []
+        for term, prefix in parse_query(query):
+            expansions = self.expand(term) if prefix else ([term] if term in self.postings else [])
+            groups.append((sum(len(self.postings[t]) for t in expansions), expansions))
+        if not groups:
+            return {}, {}
+        groups.sort(key=lambda group: group[0])
+
+        for _, expansions in groups:
+            docs: Dict[str, float] = {}
+            for term in expansions:
+                posting = self.postings[term]
+                idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id, tf in posting.items():
+                    if required is not None and doc_id not in required:
+                        continue
+                    if candidates is not None and doc_id not in candidates:
+                        continue
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[doc_id] / average)
+                    score = idf * tf * (BM25_K1 + 1) / (tf + norm)
+                    # A prefix counts once per document: its best-scoring expansion
+                    if score > docs.get(doc_id, 0.0):
+                        docs[doc_id] = score
+                    matched.setdefault(doc_id, set()).add(term)
+            if match_all:
+                required = set(docs)
+                if not required:
+                    return {}, {}
+            for doc_id, score in docs.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+
+        if required is not None:
+            scores = {doc_id: score for doc_id, score in scores.items() if doc_id in required}
+        return scores, {doc_id: matched[doc_id] for doc_id in scores}
+
+    def sources_with(self, doc_id: str, terms: Iterable[str]) -> List[str]:
+        """A document's sources that contain any of terms."""
+        terms = set(terms)
+        return [source for source, counts in self.sources.get(doc_id, {}).items() if terms & counts.keys()]
+
+
+def snippet(text: str, terms: Iterable[str], width: int = 160) -> str:
+    """About width characters of text around the first occurrence of any of terms."""
+    lowered = text.lower()
+    positions = [lowered.find(term) for term in terms]
+    positions = [p for p in positions if p >= 0]
+    if len(text) <= width or not positions:
+        return text if len(text) <= width else text[:width].rstrip() + "…"
+    start = max(0, min(positions) - width // 3)
+    end = min(len(text), start + width)
+    return ("…" if start else "") + text[start:end].strip() + ("…" if end < len(text) else "")
+
+
+call_search_index = TextIndex()
@@ -0,0 +1,300 @@
+"""
+Conversation Sentiment
+Scores conversation messages offline with a word and phrase lexicon
+(English plus common Nigerian Pidgin), handling negation ("not happy",
+"I no happy") and intensifiers ("very", "well well"). Messages are scored
+in batches by a background stage as they are stored, and the convert's
+lines are rolled up into a sentiment per call and per convert.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+import asyncio
+import inspect
+import logging
+import math
+import re
+
+logger = logging.getLogger(__name__)
+
+# Valence of single words, -4 (very negative) to 4 (very positive)
+WORD_VALENCE = {
+    # English
+    "amazing": 3.0, "amen": 1.5, "appreciate": 2.0, "awesome": 3.0, "beautiful": 2.5, "best": 3.0,
+    "better": 1.5, "bless": 2.0, "blessed": 2.5, "blessing": 2.5, "blessings": 2.5, "calm": 1.0,
+    "definitely": 1.0, "enjoy": 2.0, "enjoyed": 2.0, "excellent": 3.0, "excited": 2.5, "faithful": 2.0,
+    "fine": 1.0, "glad": 2.0, "good": 2.0, "grateful": 2.5, "great": 3.0, "happy": 2.5, "healed": 2.5,
+    "helpful": 2.0, "hope": 1.5, "hopeful": 2.0, "interested": 1.5, "joy": 2.5, "kind": 2.0,
+    "love": 3.0, "loved": 3.0, "lovely": 2.5, "nice": 2.0, "peace": 2.0, "pleased": 2.0, "praise": 2.0,
+    "sure": 1.0, "thank": 2.0, "thankful": 2.5, "thanks": 2.0, "welcome": 1.5, "welcomed": 2.0,
+    "wonderful": 3.0, "yes": 1.0,
+    "afraid": -2.0, "alone": -1.5, "angry": -2.5, "annoyed": -2.0, "bad": -2.5, "bored": -1.5,
+    "broke": -2.0, "busy": -0.5, "confused": -1.5, "depressed": -3.0, "difficult": -1.5,
+    "disappointed": -2.5, "hard": -1.0, "hate": -3.0, "hurt": -2.5, "ill": -2.0, "lonely": -2.5,
+    "lost": -1.5, "pain": -2.5, "poor": -2.0, "problem": -2.0, "problems": -2.0, "sad": -2.5,
+    "scared": -2.0, "sick": -2.0, "sorry": -1.0, "stop": -1.5, "stressed": -2.0, "struggling": -2.5,
+    "suffering": -3.0, "terrible": -3.0, "tired": -1.5, "trouble": -2.0, "unhappy": -2.5,
+    "upset": -2.0, "worried": -2.0, "worse": -2.5, "worst": -3.0,
+    # Nigerian Pidgin
+    "correct": 1.5, "kampe": 2.0, "gbam": 1.5, "sweet": 2.0, "tanks": 2.0, "sharp": 1.5,
+    "wahala": -2.5, "gbege": -2.5, "katakata": -2.5, "vex": -2.5, "suffer": -2.5, "hungry": -1.5,
+    "sapa": -2.0, "shishi": -1.0, "yawa": -2.5, "kasala": -2.5,
+}
+
+# Multi-word expressions, matched before single words
+PHRASE_VALENCE = {
+    ("thank", "you"): 2.0, ("thank", "god"): 2.5, ("god", "bless"): 2.5, ("god", "don", "do", "am"): 3.0,
+    ("no", "wahala"): 1.5, ("no", "problem"): 1.5, ("no", "shaking"): 1.5, ("e", "go", "better"): 1.5,
+    ("i", "dey", "kampe"): 2.0, ("e", "sweet", "me"): 2.5, ("no", "be", "small", "thing"): 2.0,
+    ("bad", "belle"): -2.5, ("k", "leg"): -2.0, ("not", "interested"): -2.0, ("no", "interest"): -2.0,
+    ("call", "back"): 0.5, ("leave", "me", "alone"): -3.0, ("e", "don", "do"): -1.5,
+}
+
+# Words that flip the valence of what follows within their clause
+NEGATORS = frozenset({
+    "not", "no", "never", "nor", "neither", "nothing", "nobody", "without", "hardly",
+    "don't", "dont", "doesn't", "didn't", "isn't", "wasn't", "aren't", "can't", "cannot", "won't",
+    "couldn't", "shouldn't", "wouldn't", "ain't",
+    # Pidgin: "I no happy", "e no good", "I neva see am"
+    "neva",
+})
+
+# Words that scale the valence of the next sentiment word
+INTENSIFIERS = {
+    "very": 1.3, "really": 1.3, "so": 1.2, "extremely": 1.5, "too": 1.2, "truly": 1.3, "totally": 1.3,
+    "quite": 1.1, "slightly": 0.7, "somewhat": 0.8, "barely": 0.6,
+}
+
+# Pidgin intensifiers that follow the word: "e sweet pass", "I happy die", "I happy well well"
+TRAILING_INTENSIFIERS = {("pass",): 1.3, ("die",): 1.4, ("well", "well"): 1.3}
+
+# Negated valence is flipped and damped, as "not good" is milder than "bad"
+NEGATION_SCALE = -0.74
+
+# Words back from a sentiment word that a negator still applies to
+NEGATION_WINDOW = 3
+
+# Squashes a summed valence into -1..1; larger means more evidence is needed for a strong score
+NORMALIZATION_ALPHA = 15.0
+
+# Compound scores at or beyond these are positive / negative
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+# Scores of the labels callers may already have set on a message
+LABEL_SCORES = {"positive": 0.5, "neutral": 0.0, "negative": -0.5}
+
+# Messages scored per batch, and the longest one waits to be scored
+SENTIMENT_BATCH_SIZE = 500
+SENTIMENT_INTERVAL = 1.0
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?|[.,;:!?]")
+_CLAUSE_BREAKS = frozenset(".,;:!?")
+_TRAILING_FIRST = frozenset(trailing[0] for trailing in TRAILING_INTENSIFIERS)
+
+
+def label_for(score: float) -> str:
+    if score >= POSITIVE_THRESHOLD:
+        return "positive"
+    if score <= NEGATIVE_THRESHOLD:
+        return "negative"
+    return "neutral"
+
+
+class SentimentScorer:
+    """Lexicon-based scorer; score_batch scores each distinct text of a batch once."""
+
+    def __init__(
+        self,
+        words: Optional[Dict[str, float]] = None,
+        phrases: Optional[Dict[Tuple[str, ...], float]] = None,
+    ):
+        self.words = dict(WORD_VALENCE if words is None else words)
+        self.phrases = dict(PHRASE_VALENCE if phrases is None else phrases)
+        # First word -> phrase lengths starting with it, longest first
+        self._phrase_lengths: Dict[str, List[int]] = {}
+        for phrase in self.phrases:
+            self._phrase_lengths.setdefault(phrase[0], []).append(len(phrase))
+        for lengths in self._phrase_lengths.values():
+            lengths.sort(reverse=True)
+        # Tokens the scorer has to look at; everything else is skipped without a lookup chain
+        self._relevant = frozenset(self.words) | frozenset(self._phrase_lengths) | _CLAUSE_BREAKS
+
+    def score(self, text: Optional[str]) -> float:
+        """Compound sentiment of text in -1..1."""
+        if not text:
+            return 0.0
+        tokens = _TOKEN.findall(text.lower().replace("\u2019", "'"))
+        relevant = self._relevant
+        words, phrases, phrase_lengths = self.words, self.phrases, self._phrase_lengths
+        total = 0.0
+        clause_start = 0
+        # Tokens before this one belong to a phrase already scored
+        free = 0
+        for i in [i for i, token in enumerate(tokens) if token in relevant]:
+            if i < free:
+                continue
+            token = tokens[i]
+            if token in _CLAUSE_BREAKS:
+                if token == "!":
+                    # Exclamations strengthen whatever was said
+                    total *= 1.1
+                clause_start = i + 1
+                continue
+
+            valence = 0.0
+            width = 1
+            for length in phrase_lengths.get(token, ()):
+                phrase = tuple(tokens[i:i + length])
+                if phrase in phrases:
+                    valence = phrases[phrase]
+                    width = length
+                    break
+            else:
+                valence = words.get(token, 0.0)
+            if not valence:
+                continue
+
+            previous = tokens[i - 1] if i > clause_start else None
+            if previous in INTENSIFIERS:
+                valence *= INTENSIFIERS[previous]
+            following = tokens[i + width] if i + width < len(tokens) else None
+            if following in _TRAILING_FIRST:
+                for trailing, scale in TRAILING_INTENSIFIERS.items():
+                    if tuple(tokens[i + width:i + width + len(trailing)]) == trailing:
+                        valence *= scale
+                        break
+            for word in tokens[max(clause_start, i - NEGATION_WINDOW):i]:
+                if word in NEGATORS:
+                    valence *= NEGATION_SCALE
+                    break
+            total += valence
+            free = i + width
+
+        return total / math.sqrt(total * total + NORMALIZATION_ALPHA) if total else 0.0
+
+    def score_batch(self, texts: Sequence[Optional[str]]) -> List[Tuple[str, float]]:
+        """(label, compound score) per text, in order."""
+        scores = {text: self.score(text) for text in dict.fromkeys(texts)}
+        return [(label_for(scores[text]), round(scores[text], 4)) for text in texts]
+
+
+class SentimentRollup:
+    """Running sentiment of each call and convert from the convert's own lines."""
+
+    def __init__(self):
+        # Key -> [score sum, messages]
+        self.calls: Dict[str, List[float]] = {}
+        self.converts: Dict[str, List[float]] = {}
+
+    def clear(self):
+        self.__init__()
+
+    def add(self, call_id: str, convert_id: Optional[str], score: float, sign: int = 1):
+        for totals, key in ((self.calls, call_id), (self.converts, convert_id)):
+            if key is None:
+                continue
+            entry = totals.setdefault(key, [0.0, 0])
+            entry[0] += sign * score
+            entry[1] += sign
+            if entry[1] <= 0:
+                del totals[key]
+
+    def call(self, call_id: str) -> Optional[Dict[str, Any]]:
+        return self._summary(self.calls.get(call_id))
+
+    def convert(self, convert_id: str) -> Optional[Dict[str, Any]]:
+        return self._summary(self.converts.get(convert_id))
+
+    @staticmethod
+    def _summary(entry: Optional[List[float]]) -> Optional[Dict[str, Any]]:
+        if entry is None:
+            return None
+        score = round(entry[0] / entry[1], 4)
+        return {"sentiment": label_for(score), "sentiment_score": score, "sentiment_messages": entry[1]}
+
+
+class SentimentStage:
+    """Background stage that scores newly stored messages in batches.
+
+    on_scored(records, results) receives each batch of conversation
+    records with their (label, score) results; it may return an awaitable.
+    """
+
+    def __init__(
+        self,
+        scorer: Optional[SentimentScorer] = None,
+        batch_size: int = SENTIMENT_BATCH_SIZE,
+        interval: float = SENTIMENT_INTERVAL,
+    ):
+        self.scorer = scorer or SentimentScorer()
+        self.batch_size = batch_size
+        self.interval = interval
+        self.pending: List[Dict[str, Any]] = []
+        self.on_scored: Optional[Callable[[List[Dict[str, Any]], List[Tuple[str, float]]], Any]] = None
+        self.counters = {"scored": 0, "batches": 0, "errors": 0}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, records: Iterable[Dict[str, Any]]):
+        self.pending.extend(records)
+        if len(self.pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    def score_records(self, records: Sequence[Dict[str, Any]]) -> List[Tuple[str, float]]:
+        """Score records; a label a caller already set is kept, with its nominal score."""
+        results = self.scorer.score_batch([record.get("message") for record in records])
+        for i, record in enumerate(records):
+            label = record.get("sentiment")
+            if label in LABEL_SCORES and record.get("sentiment_score") is None:
+                results[i] = (label, LABEL_SCORES[label])
+        return results
+
+    async def process(self):
+        """Score everything pending, batch_size messages at a time."""
+        while self.pending:
+            # Take the backlog once; messages submitted meanwhile wait for the next pass
+            backlog, self.pending = self.pending, []
+            for start in range(0, len(backlog), self.batch_size):
+                await self._score(backlog[start:start + self.batch_size])
+
+    async def _score(self, batch: List[Dict[str, Any]]):
+        try:
+            results = self.score_records(batch)
+            if self.on_scored is not None:
+                result = self.on_scored(batch, results)
+                if inspect.isawaitable(result):
+                    await result
+            self.counters["scored"] += len(batch)
+            self.counters["batches"] += 1
+        except Exception as e:
+            self.counters["errors"] += 1
+            logger.error(f"Scoring {len(batch)} conversation messages failed: {e}")
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.process()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self._wakeup = None
+        await self.process()
+
+    def report(self) -> Dict[str, Any]:
+        return {**self.counters, "pending": len(self.pending)}
+
+
+sentiment_rollup = SentimentRollup()
+sentiment_stage = SentimentStage()
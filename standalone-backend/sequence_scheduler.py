@@ -0,0 +1,297 @@
+"""
+Sequence Message Scheduler
+Enrolls converts in message sequences and queues every day-offset message
+of an enrollment in a hierarchical timing wheel, so scheduling and firing
+stay O(1) per message with hundreds of thousands pending. Each tick, the
+messages that came due are sent in batches per channel; pending work is
+rebuilt from the stored enrollments after a restart.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import logging
+import time
+import uuid
+
+from timing_wheel import TimingWheel
+
+logger = logging.getLogger(__name__)
+
+# Sequences seeded into sequence_definitions; converts are enrolled when the
+# trigger event happens (or through the enroll endpoint). Follow-up reminder
+# messages go to the convert's assigned worker rather than the convert.
+DEFAULT_SEQUENCES = [
+    {
+        "name": "New Convert Welcome Series",
+        "description": "7-day email/SMS series for new converts",
+        "type": "onboarding",
+        "trigger": "convert_created",
+        "recipient": "convert",
+        "messages": [
+            {"day": 1, "channel": "sms", "content": "Welcome to Dependify Gospel! We're excited to have you. Service is Sunday 9am."},
+            {"day": 2, "channel": "email", "content": "Here's a guide to help you get started..."},
+            {"day": 3, "channel": "sms", "content": "Join us for midweek service tomorrow at 6pm!"},
+            {"day": 7, "channel": "email", "content": "How was your first week? We'd love to hear from you."},
+        ],
+        "is_active": True,
+    },
+    {
+        "name": "Follow-up Reminder Sequence",
+        "description": "Reminders for follow-up workers",
+        "type": "internal",
+        "trigger": "worker_assigned",
+        "recipient": "assigned_worker",
+        "messages": [
+            {"day": 0, "channel": "sms", "content": "New convert assigned to you. Please contact within 24 hours."},
+            {"day": 3, "channel": "sms", "content": "Reminder: Follow up on your assigned converts."},
+            {"day": 7, "channel": "email", "content": "Weekly follow-up summary..."},
+        ],
+        "is_active": True,
+    },
+]
+
+# Messages handed to a channel sender per call
+SEND_BATCH_SIZE = 500
+
+SEQUENCE_TICK_SECONDS = 1.0
+DAY_SECONDS = 86400.0
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp is not None else None
+
+
+def _epoch(value: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+class SequenceEnrollment:
+    """One convert's run through one sequence; message state is kept per message index."""
+
+    __slots__ = ("id", "sequence_id", "convert_id", "enrolled_at", "enrolled_iso", "status",
+                 "statuses", "sent_at", "finished_at")
+
+    def __init__(self, sequence_id: str, convert_id: str, enrolled_at: float, messages: int,
+                 enrollment_id: Optional[str] = None):
+        self.id = enrollment_id or str(uuid.uuid4())
+        self.sequence_id = sequence_id
+        self.convert_id = convert_id
+        self.enrolled_at = enrolled_at
+        self.enrolled_iso = _iso(enrolled_at)
+        self.status = "active"
+        # "pending", "sent", "failed" or "skipped" per message
+        self.statuses = ["pending"] * messages
+        self.sent_at: List[Optional[str]] = [None] * messages
+        self.finished_at: Optional[str] = None
+
+    def to_dict(self, definition: Dict[str, Any], day_seconds: float) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "sequence_id": self.sequence_id,
+            "convert_id": self.convert_id,
+            "status": self.status,
+            "enrolled_at": self.enrolled_iso,
+            "finished_at": self.finished_at,
+            "messages": [
+                {
+                    "day": message["day"],
+                    "channel": message["channel"],
+                    "due_at": _iso(self.enrolled_at + message["day"] * day_seconds),
+                    "status": status,
+                    "sent_at": sent_at,
+                }
+                for message, status, sent_at in zip(definition["messages"], self.statuses, self.sent_at)
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "SequenceEnrollment":
+        messages = record.get("messages", ())
+        enrollment = cls(record["sequence_id"], record["convert_id"], _epoch(record["enrolled_at"]),
+                         len(messages), record["id"])
+        enrollment.status = record.get("status", "active")
+        enrollment.statuses = [message["status"] for message in messages]
+        enrollment.sent_at = [message.get("sent_at") for message in messages]
+        enrollment.finished_at = record.get("finished_at")
+        return enrollment
+
+
+# A due message: (enrollment, message index, message definition)
+Delivery = Tuple[SequenceEnrollment, int, Dict[str, Any]]
+
+
+class SequenceScheduler:
+    """Queues sequence messages on a timing wheel and sends them per channel in batches.
+
+    Senders are registered per channel; each takes a list of deliveries and
+    returns, in order, None for each message sent or an error string. Every
+    batch of changed enrollments is handed to persist.
+    """
+
+    def __init__(
+        self,
+        tick_seconds: float = SEQUENCE_TICK_SECONDS,
+        day_seconds: float = DAY_SECONDS,
+        send_batch_size: int = SEND_BATCH_SIZE,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.tick_seconds = tick_seconds
+        self.day_seconds = day_seconds
+        self.send_batch_size = send_batch_size
+        self.clock = clock
+        self.definitions: Dict[str, Dict[str, Any]] = {}
+        self.by_trigger: Dict[str, List[Dict[str, Any]]] = {}
+        self.wheel = TimingWheel(tick_seconds, clock())
+        # (sequence id, convert id) -> active enrollment, so nobody is enrolled twice
+        self.active: Dict[Tuple[str, str], SequenceEnrollment] = {}
+        self.senders: Dict[str, Callable[[List[Delivery]], List[Optional[str]]]] = {}
+        self.persist: Optional[Callable[[List[SequenceEnrollment]], None]] = None
+        self.counters = {"enrolled": 0, "sent": 0, "failed": 0, "skipped": 0, "completed": 0, "cancelled": 0, "batches": 0}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, channel: str, sender: Callable[[List[Delivery]], List[Optional[str]]]):
+        self.senders[channel] = sender
+
+    def load(self, definitions: Iterable[Dict[str, Any]], enrollments: Iterable[Dict[str, Any]] = ()):
+        """Replace the definitions and requeue the pending messages of stored active enrollments."""
+        self.definitions = {definition["id"]: definition for definition in definitions}
+        self.by_trigger = {}
+        for definition in self.definitions.values():
+            if definition.get("is_active", True) and definition.get("trigger"):
+                self.by_trigger.setdefault(definition["trigger"], []).append(definition)
+        self.wheel = TimingWheel(self.tick_seconds, self.clock())
+        self.active = {}
+        for record in enrollments:
+            if record.get("status") == "active" and record["sequence_id"] in self.definitions:
+                # Overdue messages fire on the first tick after a restart
+                self._queue(SequenceEnrollment.from_dict(record))
+
+    def _queue(self, enrollment: SequenceEnrollment):
+        self.active[(enrollment.sequence_id, enrollment.convert_id)] = enrollment
+        messages = self.definitions[enrollment.sequence_id]["messages"]
+        for index, message in enumerate(messages):
+            if enrollment.statuses[index] == "pending":
+                self.wheel.schedule(enrollment.enrolled_at + message["day"] * self.day_seconds, (enrollment, index))
+
+    def enroll(self, sequence_id: str, convert_ids: Iterable[str]) -> List[SequenceEnrollment]:
+        """Enroll converts in a sequence, skipping ones already active in it."""
+        definition = self.definitions[sequence_id]
+        now = self.clock()
+        enrolled = []
+        for convert_id in convert_ids:
+            if (sequence_id, convert_id) in self.active:
+                continue
+            enrollment = SequenceEnrollment(sequence_id, convert_id, now, len(definition["messages"]))
+            self._queue(enrollment)
+            enrolled.append(enrollment)
+
+        if enrolled:
+            self.counters["enrolled"] += len(enrolled)
+            self._flush(enrolled)
+        return enrolled
+
+    def trigger(self, event: str, convert_ids: List[str]) -> List[SequenceEnrollment]:
+        """Enroll converts in every active sequence whose trigger is event."""
+        enrolled = []
+        for definition in self.by_trigger.get(event, ()):
+            enrolled += self.enroll(definition["id"], convert_ids)
+        return enrolled
+
+    def cancel(self, convert_id: str) -> List[SequenceEnrollment]:
+        """Stop a convert's active enrollments; their queued messages are skipped when they fire."""
+        cancelled = []
+        for sequence_id in self.definitions:
+            enrollment = self.active.pop((sequence_id, convert_id), None)
+            if enrollment is not None:
+                enrollment.status = "cancelled"
+                enrollment.finished_at = _iso(self.clock())
+                cancelled.append(enrollment)
+        if cancelled:
+            self.counters["cancelled"] += len(cancelled)
+            self._flush(cancelled)
+        return cancelled
+
+    def run_due(self) -> int:
+        """Send every message that has come due; returns how many were attempted."""
+        now = self.clock()
+        by_channel: Dict[str, List[Delivery]] = {}
+        for enrollment, index in self.wheel.advance(now):
+            if enrollment.status != "active":
+                continue
+            message = self.definitions[enrollment.sequence_id]["messages"][index]
+            by_channel.setdefault(message["channel"], []).append((enrollment, index, message))
+        if not by_channel:
+            return 0
+
+        sent_at = _iso(now)
+        changed: Dict[str, SequenceEnrollment] = {}
+        attempted = 0
+        for channel, deliveries in by_channel.items():
+            sender = self.senders.get(channel)
+            for start in range(0, len(deliveries), self.send_batch_size):
+                batch = deliveries[start:start + self.send_batch_size]
+                if sender is None:
+                    errors = ["skipped"] * len(batch)
+                else:
+                    try:
+                        errors = sender(batch)
+                    except Exception as e:
+                        logger.error(f"Sequence {channel} batch of {len(batch)} failed: {e}")
+                        errors = [str(e)] * len(batch)
+                self.counters["batches"] += 1
+                for (enrollment, index, _), error in zip(batch, errors):
+                    status = "sent" if error is None else ("skipped" if error == "skipped" else "failed")
+                    enrollment.statuses[index] = status
+                    enrollment.sent_at[index] = sent_at
+                    self.counters[status] += 1
+                    changed[enrollment.id] = enrollment
+                attempted += len(batch)
+
+        for enrollment in changed.values():
+            if "pending" not in enrollment.statuses:
+                enrollment.status = "completed"
+                enrollment.finished_at = sent_at
+                self.active.pop((enrollment.sequence_id, enrollment.convert_id), None)
+                self.counters["completed"] += 1
+        self._flush(list(changed.values()))
+        return attempted
+
+    def _flush(self, enrollments: List[SequenceEnrollment]):
+        if self.persist is not None:
+            self.persist(enrollments)
+
+    def to_dict(self, enrollment: SequenceEnrollment) -> Dict[str, Any]:
+        return enrollment.to_dict(self.definitions[enrollment.sequence_id], self.day_seconds)
+
+    async def run(self):
+        """Scheduler task: one wheel tick per tick_seconds."""
+        while True:
+            try:
+                self.run_due()
+            except Exception as e:
+                logger.error(f"Sequence scheduler tick failed: {e}")
+            await asyncio.sleep(self.tick_seconds - self.clock() % self.tick_seconds)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "active_enrollments": len(self.active),
+            "pending_messages": len(self.wheel),
+        }
+
+
+sequence_scheduler = SequenceScheduler()
@@ -3,13 +3,14 @@ Standalone Demo Server for Evangelism CRM
 Complete FastAPI application with all features for demo purposes.
 """
 
-from fastapi import FastAPI, APIRouter, HTTPException, status, Depends, BackgroundTasks, Query
+from fastapi import FastAPI, APIRouter, HTTPException, status, Depends, BackgroundTasks, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, HTMLResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, date, timezone
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, EmailStr
+from typing import List, Optional, Dict, Any, Callable, Iterable, Iterator, Tuple
+from pydantic import BaseModel, Field, EmailStr, ValidationError
 from enum import Enum
 import os
 import sys
@@ -18,8 +19,40 @@ import bcrypt
 import logging
 import random
 import hashlib
+import heapq
+import copy
+import tempfile
+from collections import OrderedDict
 from pathlib import Path
 
+from bulk import BULK_MAX_ITEMS, BulkResults, parse_bulk_body, validation_errors
+from alert_rules import DEFAULT_ALERT_RULES, RULE_SOURCES, alert_engine, alert_sweeper
+from workflow_runtime import DEFAULT_WORKFLOWS, workflow_runtime
+from sequence_scheduler import DEFAULT_SEQUENCES, sequence_scheduler
+from playbook_runtime import DEFAULT_PLAYBOOKS, playbook_runtime
+from sms_dispatcher import FakeSmsGateway, SmsMessage, sms_dispatcher
+from voice_dialer import scheduled_epoch, voice_dialer
+from call_analytics import call_analytics
+from call_templates import TemplateError, compile_template, template_cache, template_context
+from campaigns import (
+    CALLING_DAYS, CALLING_HOURS, CAMPAIGN_SPACING, PROGRESS_STATUSES,
+    campaign_tracker, plan_call_times, segment_index,
+)
+from change_feed import change_feed
+from columnar import COLUMNAR_FORMATS, Column, export_columnar, pa
+from exports import export_response
+from health_engine import SCORED_FIELDS, score_convert, score_population
+from live_transcripts import transcript_hub
+from importer import (
+    CSV_MEDIA_TYPES, IMPORT_MAX_BYTES, IMPORT_SPOOL_SIZE, XLSX_MEDIA_TYPES, convert_importer, openpyxl,
+)
+from projections import FieldProjector
+from recalculation import crossed_threshold, health_recalculator
+from sentiment import sentiment_rollup, sentiment_stage
+from search_index import call_search_index, snippet
+from responses import APIGZipMiddleware, FastJSONResponse, ResponseCache, GZIP_MINIMUM_SIZE, GZIP_COMPRESS_LEVEL
+from static_assets import StaticAsset, static_assets
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -34,6 +67,15 @@ logger = logging.getLogger(__name__)
 class DemoDatabase:
     """In-memory database for demo purposes."""
     
+    COLLECTIONS = (
+        "clients", "users", "converts", "services", "health_scores", "alerts",
+        "voice_calls", "voice_agents", "call_scripts", "conversations",
+        "followup_records", "workflows", "sequences", "playbooks", "analytics",
+        "membership_classes", "house_fellowships", "alert_rules",
+        "workflow_executions", "followup_tasks", "sequence_executions",
+        "sms_logs", "email_logs", "playbook_executions", "voice_campaigns",
+    )
+    
     def __init__(self):
         self.clients = {}
         self.users = {}
@@ -52,14 +94,173 @@ class DemoDatabase:
         self.analytics = {}
         self.membership_classes = {}
         self.house_fellowships = {}
+        self.alert_rules = {}
+        self.workflow_executions = {}
+        self.followup_tasks = {}
+        self.sequence_executions = {}
+        self.sms_logs = {}
+        self.email_logs = {}
+        self.playbook_executions = {}
+        self.voice_campaigns = {}
         self.initialized = False
         
+        # Write generations: each collection's counter only ever increases.
+        # The epoch changes on every reset/cold start so old ETags never match new data.
+        self.epoch = uuid.uuid4().hex[:12]
+        self.generations = {name: 0 for name in self.COLLECTIONS}
+        
+        # Delta sync index: per collection, record id -> (change seq, deleted),
+        # ordered by last change so "what changed since seq N" walks only the changes
+        self.change_seq = 0
+        self.change_index = {name: OrderedDict() for name in self.COLLECTIONS}
+        
     def reset(self):
         """Reset all data."""
         self.__init__()
+    
+    def touch(self, *collections: str):
+        """Record a write to collections, invalidating ETags and cached responses that read them."""
+        for name in collections:
+            self.generations[name] += 1
+    
+    def generation(self, *collections: str) -> tuple:
+        """Version key for data read from collections."""
+        return (self.epoch, *(self.generations[name] for name in collections))
+    
+    def mark_changed(self, collection: str, record_id: Optional[str], deleted: bool = False):
+        """Record a write to one record, or a tombstone for a delete."""
+        self.mark_changed_many(collection, [] if record_id is None else [record_id], deleted)
+    
+    def mark_changed_many(self, collection: str, record_ids: Iterable[str], deleted: bool = False):
+        """Record writes to several records with a single generation bump."""
+        self.touch(collection)
+        index = self.change_index[collection]
+        for record_id in record_ids:
+            self.change_seq += 1
+            index.pop(record_id, None)
+            index[record_id] = (self.change_seq, deleted)
+    
+    def changes_since(self, collection: str, seq: int) -> Tuple[List[str], List[str]]:
+        """Ids of records changed and deleted after change seq, oldest change first."""
+        changed, deleted = [], []
+        for record_id, (record_seq, is_deleted) in reversed(self.change_index[collection].items()):
+            if record_seq <= seq:
+                break
+            (deleted if is_deleted else changed).append(record_id)
+        changed.reverse()
+        deleted.reverse()
+        return changed, deleted
         
 db = DemoDatabase()
 
+# Rendered read responses, keyed by route + params + the generations they read
+response_cache = ResponseCache()
+
+def refresh_call_search(collection: str, record_ids: Iterable[Optional[str]]):
+    """Re-index the transcript and notes of changed voice calls; deleted calls leave the search index."""
+    if collection != "voice_calls":
+        return
+    for call_id in record_ids:
+        call = db.voice_calls.get(call_id)
+        if call is None:
+            call_search_index.remove(call_id)
+            continue
+        call_search_index.set_source(call_id, "transcript", call.get("transcript"))
+        call_search_index.set_source(call_id, "notes", call.get("notes"))
+
+def record_change(collection: str, op: str, record_id: Optional[str], changes: Optional[Dict[str, Any]] = None):
+    """Bump a collection's generation, index the change for delta sync and publish it to live subscribers."""
+    db.mark_changed(collection, record_id, deleted=(op == "delete"))
+    segment_index.refresh(collection, (record_id,), getattr(db, collection))
+    call_analytics.refresh(collection, (record_id,), getattr(db, collection))
+    refresh_call_search(collection, (record_id,))
+    change_feed.publish(collection, op, record_id, changes)
+
+def record_changes(collection: str, op: str, record_ids: List[str]):
+    """record_change for a bulk write: one generation bump and one feed event for the batch."""
+    db.mark_changed_many(collection, record_ids, deleted=(op == "delete"))
+    segment_index.refresh(collection, record_ids, getattr(db, collection))
+    call_analytics.refresh(collection, record_ids, getattr(db, collection))
+    refresh_call_search(collection, record_ids)
+    change_feed.publish(collection, f"bulk_{op}", None, {"count": len(record_ids)})
+
+def evaluate_alert_rules(collection: str, record_ids: Iterable[str]):
+    """Run the alert rules watching collection over changed (or deleted) records and record the alerts they touch.
+    
+    Writers call this after storing a change. Health scores are only passed in
+    when a score crosses one of the rules' thresholds or has an alert open (see
+    apply_health_results).
+    """
+    now = datetime.now(timezone.utc)
+    store = getattr(db, collection)
+    touched = []
+    for record_id in record_ids:
+        record = store.get(record_id)
+        convert_id = record_id if collection == "converts" else (record or {}).get("convert_id")
+        convert = db.converts.get(convert_id) if convert_id else None
+        touched += alert_engine.evaluate(collection, record_id, record, convert, now)
+        # Health score rules also read convert fields (and stop applying once it's deleted)
+        if collection == "converts" and record_id in db.health_scores:
+            touched += alert_engine.evaluate("health_scores", record_id, db.health_scores[record_id], convert, now)
+    
+    if touched:
+        touched = list(dict.fromkeys(touched))
+        db.mark_changed_many("alerts", touched)
+        change_feed.publish("alerts", "bulk_update", None, {"count": len(touched)})
+
+def sweep_alert_rules():
+    """Re-evaluate the records under time-based rules (e.g. follow-ups going overdue untouched)."""
+    for collection in alert_engine.timed_collections():
+        evaluate_alert_rules(collection, list(getattr(db, collection)))
+
+alert_sweeper.sweep = sweep_alert_rules
+
+def sync_token() -> str:
+    """Opaque ?since= token for the current state of the database."""
+    return f"{db.epoch}.{db.change_seq}"
+
+def parse_sync_token(since: str) -> Optional[int]:
+    """Change seq in a ?since= token, or None if the client needs a full resync."""
+    epoch, _, seq = since.partition(".")
+    if epoch != db.epoch or not seq.isdigit() or int(seq) > db.change_seq:
+        return None
+    return int(seq)
+
+def delta_sync(
+    collection: str,
+    since: str,
+    query: Callable[[Optional[Iterable[Dict[str, Any]]]], List[Dict[str, Any]]],
+    projector: Optional[FieldProjector] = None,
+    projection: Optional[Tuple[str, ...]] = None,
+) -> Dict[str, Any]:
+    """Records of a collection created, updated or deleted after a ?since= token.
+    
+    query applies the list endpoint's filters to the records it is given (all
+    records when given None). Changed records that no longer match the filters
+    are reported as deleted, so a filtered client view stays consistent.
+    The result embeds the current sync token, so cache it on db.change_seq
+    as well as the collection generations.
+    """
+    token = sync_token()
+    seq = parse_sync_token(since)
+    if seq is None:
+        records = query(None)
+        full = True
+        deleted = []
+    else:
+        changed_ids, deleted = db.changes_since(collection, seq)
+        store = getattr(db, collection)
+        changed = [store[record_id] for record_id in changed_ids if record_id in store]
+        records = query(changed)
+        matched = {id(record) for record in records}
+        deleted += [record_id for record_id in changed_ids
+                    if record_id in store and id(store[record_id]) not in matched]
+        full = False
+    
+    if projector is not None:
+        records = projector.project_all(records, projection)
+    return {"token": token, "full": full, "changed": records, "deleted": deleted}
+
 # =============================================================================
 # MODELS
 # =============================================================================
@@ -164,6 +365,8 @@ class Convert(ConvertBase):
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     created_by: Optional[str] = None
+    # Rolled up from the convert's lines on calls, -1..1
+    sentiment_score: Optional[float] = None
     
     class Config:
         from_attributes = True
@@ -210,6 +413,8 @@ class VoiceCall(BaseModel):
     transcript: Optional[str] = None
     notes: Optional[str] = None
     outcome: Optional[str] = None
+    sentiment: Optional[str] = None
+    sentiment_score: Optional[float] = None
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
@@ -220,6 +425,7 @@ class ConversationMessage(BaseModel):
     message: str
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     sentiment: Optional[str] = None
+    sentiment_score: Optional[float] = None
 
 class ServiceInstance(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -245,6 +451,43 @@ class DashboardStats(BaseModel):
     upcoming_services: int
     open_alerts: int
 
+# Field projections for list endpoints: ?fields=summary, ?fields=card or ?fields=a,b,c
+CONVERT_FIELDS = FieldProjector(
+    allowed=Convert.model_fields,
+    shapes={
+        "card": ["id", "first_name", "last_name", "phone", "occupation", "stage", "health_score"],
+        "summary": ["id", "first_name", "last_name", "phone", "stage", "source",
+                    "health_score", "assigned_worker_id", "created_at"],
+    },
+)
+
+ALERT_FIELDS = FieldProjector(
+    allowed=[*Alert.model_fields, "convert_name", "convert_phone"],
+    shapes={
+        "card": ["id", "convert_id", "convert_name", "title", "severity", "status", "created_at"],
+        "summary": ["id", "convert_id", "convert_name", "convert_phone", "type", "title",
+                    "severity", "status", "assigned_to", "created_at", "updated_at"],
+    },
+)
+
+VOICE_CALL_FIELDS = FieldProjector(
+    allowed=[*VoiceCall.model_fields, "script_id", "greeting", "script_text", "convert_name", "convert_phone"],
+    shapes={
+        "card": ["id", "convert_id", "convert_name", "convert_phone", "status",
+                 "outcome", "duration_seconds", "scheduled_time"],
+        "summary": ["id", "convert_id", "convert_name", "convert_phone", "agent_id", "script_id",
+                    "status", "outcome", "duration_seconds", "scheduled_time",
+                    "started_at", "ended_at", "created_at"],
+    },
+)
+
+def parse_fields(projector: FieldProjector, fields: Optional[str]):
+    """Resolve a fields= query parameter, rejecting unknown fields with a 400."""
+    try:
+        return projector.parse(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 class LoginRequest(BaseModel):
     email: EmailStr
     password: str
@@ -292,11 +535,10 @@ def create_access_token(user_id: str) -> str:
     }
     return base64.b64encode(json.dumps(payload).encode()).decode()
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
+def user_from_token(token: str) -> Optional[User]:
     import base64
     import json
     try:
-        token = credentials.credentials
         payload = json.loads(base64.b64decode(token))
         user_id = payload.get("user_id")
         if user_id and user_id in db.users:
@@ -305,6 +547,12 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
             return User(**user_data)
     except Exception as e:
         logger.error(f"Token validation error: {e}")
+    return None
+
+def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> User:
+    user = user_from_token(credentials.credentials)
+    if user:
+        return user
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Invalid authentication credentials"
@@ -444,7 +692,6 @@ def populate_demo_data():
         
         # Deterministic ID based on index
         convert_id = str(uuid.UUID(hashlib.md5(f"convert_{i}".encode()).hexdigest()[:32]))
-        health_score = random.randint(20, 95)
         
         db.converts[convert_id] = {
             "id": convert_id,
@@ -460,7 +707,8 @@ def populate_demo_data():
             "source_date": (date.today() - timedelta(days=days_ago)).isoformat(),
             "stage": stage.value,
             "assigned_worker_id": random.choice(worker_ids) if worker_ids else None,
-            "health_score": health_score,
+            # Scored by the health engine once the seeded calls exist
+            "health_score": None,
             "notes": random.choice([
                 "Very interested in joining the church",
                 "Has questions about baptism",
@@ -473,37 +721,6 @@ def populate_demo_data():
             "updated_at": created_at.isoformat(),
             "created_by": admin_id,
         }
-        
-        # Create health score record with deterministic ID
-        db.health_scores[convert_id] = {
-            "id": str(uuid.UUID(hashlib.md5(f"health_{convert_id}".encode()).hexdigest()[:32])),
-            "convert_id": convert_id,
-            "score": health_score,
-            "factors": {
-                "attendance_rate": random.randint(0, 100),
-                "engagement_level": random.randint(0, 100),
-                "response_time": random.randint(0, 100),
-                "spiritual_growth": random.randint(0, 100),
-                "social_connection": random.randint(0, 100),
-            },
-            "calculated_at": datetime.now(timezone.utc).isoformat(),
-        }
-        
-        # Create alerts for low health scores
-        if health_score < 40:
-            alert_id = str(uuid.UUID(hashlib.md5(f"alert_{convert_id}".encode()).hexdigest()[:32]))
-            db.alerts[alert_id] = {
-                "id": alert_id,
-                "convert_id": convert_id,
-                "type": "low_engagement",
-                "title": "Low Engagement Alert",
-                "description": f"{person['full_name']} has a low health score of {health_score}",
-                "severity": AlertSeverity.HIGH.value if health_score < 25 else AlertSeverity.MEDIUM.value,
-                "status": AlertStatus.OPEN.value,
-                "assigned_to": random.choice(worker_ids) if worker_ids else None,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat(),
-            }
     
     # Create services
     for i in range(20):
@@ -574,6 +791,7 @@ We also wanted to invite you to our upcoming service this Sunday at 10 AM.""",
             "name": script["name"],
             "content": script["content"],
             "purpose": script["purpose"],
+            "version": 1,
             "is_active": True,
             "created_at": datetime.now(timezone.utc).isoformat(),
         }
@@ -630,9 +848,66 @@ We also wanted to invite you to our upcoming service this Sunday at 10 AM.""",
                     "speaker": msg["speaker"],
                     "message": msg["message"],
                     "timestamp": (started_at + timedelta(seconds=random.randint(10, 300))).isoformat(),
-                    "sentiment": random.choice(["positive", "neutral", "positive"]),
+                    "sentiment": None,
                 }
     
+    # Queue the seeded calls still to be made; overdue ones are dialled first
+    voice_dialer.load(db.voice_calls.values(), lambda convert_id: db.converts.get(convert_id, {}).get("phone"))
+    segment_index.rebuild(db.converts.values(), db.voice_calls.values())
+    call_analytics.rebuild(db.voice_calls.values())
+    sentiment_rollup.clear()
+    seeded_messages = list(db.conversations.values())
+    apply_message_sentiment(seeded_messages, sentiment_stage.score_records(seeded_messages))
+    
+    # Score the seeded converts from their seeded calls and call sentiment, with deterministic record IDs
+    calculated_at = datetime.now(timezone.utc).isoformat()
+    for result in score_population(list(db.converts.values()), db.followup_records.values(), db.voice_calls.values()):
+        convert_id = result["convert_id"]
+        db.converts[convert_id]["health_score"] = result["score"]
+        db.health_scores[convert_id] = dict(
+            health_score_record(result, calculated_at),
+            id=str(uuid.UUID(hashlib.md5(f"health_{convert_id}".encode()).hexdigest()[:32])),
+        )
+    segment_index.rebuild(db.converts.values(), db.voice_calls.values())
+    call_search_index.clear()
+    refresh_call_search("voice_calls", list(db.voice_calls))
+    for msg in db.conversations.values():
+        call_search_index.set_source(msg["call_id"], f"message:{msg['id']}", msg["message"])
+    campaign_tracker.load(db.voice_campaigns.values())
+    
+    # Seed the alert rules and raise the alerts they imply for the seeded data
+    for rule in DEFAULT_ALERT_RULES:
+        db.alert_rules[rule["id"]] = copy.deepcopy(rule)
+    touched = alert_engine.load(
+        db.alert_rules.values(), db.alerts, {collection: getattr(db, collection) for collection in RULE_SOURCES}, db.converts
+    )
+    if touched:
+        db.mark_changed_many("alerts", touched)
+    
+    # Seed the workflow definitions; executions start as convert events arrive
+    for workflow in DEFAULT_WORKFLOWS:
+        workflow_id = str(uuid.UUID(hashlib.md5(f"workflow_{workflow['name']}".encode()).hexdigest()[:32]))
+        db.workflows[workflow_id] = dict(
+            copy.deepcopy(workflow), id=workflow_id, created_at=datetime.now(timezone.utc).isoformat()
+        )
+    workflow_runtime.load(db.workflows.values(), db.workflow_executions.values())
+    
+    # Seed the message sequences; enrollments start as convert events arrive
+    for sequence in DEFAULT_SEQUENCES:
+        sequence_id = str(uuid.UUID(hashlib.md5(f"sequence_{sequence['name']}".encode()).hexdigest()[:32]))
+        db.sequences[sequence_id] = dict(
+            copy.deepcopy(sequence), id=sequence_id, created_at=datetime.now(timezone.utc).isoformat()
+        )
+    sequence_scheduler.load(db.sequences.values(), db.sequence_executions.values())
+    
+    # Seed the playbooks; executions start as convert events arrive
+    for playbook in DEFAULT_PLAYBOOKS:
+        playbook_id = str(uuid.UUID(hashlib.md5(f"playbook_{playbook['name']}".encode()).hexdigest()[:32]))
+        db.playbooks[playbook_id] = dict(
+            copy.deepcopy(playbook), id=playbook_id, created_at=datetime.now(timezone.utc).isoformat()
+        )
+    playbook_runtime.load(db.playbooks.values(), db.playbook_executions.values())
+    
     db.initialized = True
     logger.info(f"Demo data populated: {len(db.users)} users, {len(db.converts)} converts, {len(db.voice_calls)} voice calls")
 
@@ -644,8 +919,25 @@ We also wanted to invite you to our upcoming service this Sunday at 10 AM.""",
 async def lifespan(app: FastAPI):
     logger.info("Starting Evangelism CRM Standalone Demo Server...")
     populate_demo_data()
+    static_assets.load()
+    sms_dispatcher.start()
+    transcript_hub.start()
+    sentiment_stage.start()
+    voice_dialer.start()
+    workflow_runtime.start()
+    sequence_scheduler.start()
+    playbook_runtime.start()
+    alert_sweeper.start()
     yield
     logger.info("Shutting down...")
+    await workflow_runtime.stop()
+    await sequence_scheduler.stop()
+    await playbook_runtime.stop()
+    await alert_sweeper.stop()
+    await sms_dispatcher.stop()
+    await voice_dialer.stop()
+    await transcript_hub.stop()
+    await sentiment_stage.stop()
 
 # =============================================================================
 # CREATE APP
@@ -655,7 +947,8 @@ app = FastAPI(
     title="Evangelism CRM - Standalone Demo",
     description="Complete standalone demo with Voice Agent feature",
     version="2.0.0-demo-standalone",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
@@ -666,6 +959,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON payloads; precompressed static assets pass through untouched
+app.add_middleware(
+    APIGZipMiddleware,
+    minimum_size=GZIP_MINIMUM_SIZE,
+    compresslevel=GZIP_COMPRESS_LEVEL,
+)
+
 # =============================================================================
 # ROUTERS
 # =============================================================================
@@ -723,37 +1023,286 @@ async def get_user(user_id: str, current_user: User = Depends(get_current_user))
 # CONVERT ROUTES
 # -----------------------------------------------------------------------------
 
+def iter_converts(
+    stage: Optional[str] = None,
+    search: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    records: Optional[Iterable[Dict[str, Any]]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Converts matching the list endpoint's filters (among records, if given), lazily."""
+    search_lower = search.lower() if search else None
+    for c in (db.converts.values() if records is None else records):
+        if stage and c["stage"] != stage:
+            continue
+        if assigned_to and c["assigned_worker_id"] != assigned_to:
+            continue
+        if search_lower and not (
+            search_lower in c["first_name"].lower()
+            or search_lower in c["last_name"].lower()
+            or (c.get("phone") and search_lower in c["phone"])
+        ):
+            continue
+        yield c
+
+def query_converts(
+    stage: Optional[str] = None,
+    search: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    records: Optional[Iterable[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Converts matching the list endpoint's filters (among records, if given)."""
+    return list(iter_converts(stage, search, assigned_to, records))
+
 @api_router.get("/converts")
 async def list_converts(
+    request: Request,
     stage: Optional[str] = None,
     search: Optional[str] = None,
     assigned_to: Optional[str] = None,
+    fields: Optional[str] = None,
+    since: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
-    converts = list(db.converts.values())
-    
-    if stage:
-        converts = [c for c in converts if c["stage"] == stage]
-    
-    if assigned_to:
-        converts = [c for c in converts if c["assigned_worker_id"] == assigned_to]
+    projection = parse_fields(CONVERT_FIELDS, fields)
+    if since is not None:
+        return response_cache.respond(
+            request,
+            db.generation("converts") + (db.change_seq,),
+            lambda: delta_sync(
+                "converts", since,
+                lambda records: query_converts(stage, search, assigned_to, records),
+                CONVERT_FIELDS, projection,
+            ),
+        )
     
-    if search:
-        search_lower = search.lower()
-        converts = [
-            c for c in converts 
-            if search_lower in c["first_name"].lower() 
-            or search_lower in c["last_name"].lower()
-            or (c.get("phone") and search_lower in c["phone"])
-        ]
+    response = response_cache.respond(
+        request,
+        db.generation("converts"),
+        lambda: CONVERT_FIELDS.project_all(query_converts(stage, search, assigned_to), projection),
+    )
+    response.headers["X-Sync-Token"] = sync_token()
+    return response
+
+def health_score_record(result: Dict[str, Any], calculated_at: str) -> Dict[str, Any]:
+    """Stored health score for a health_engine result, keeping the record id across recalculations."""
+    existing = db.health_scores.get(result["convert_id"])
+    return {
+        "id": existing["id"] if existing else str(uuid.uuid4()),
+        "convert_id": result["convert_id"],
+        "score": result["score"],
+        "factors": result["factors"],
+        "calculated_at": calculated_at,
+    }
+
+def insert_converts(validated: List[ConvertCreate], created_by: str) -> List[str]:
+    """Store validated converts in one pass with one change record per collection; returns their ids."""
+    now = datetime.now(timezone.utc).isoformat()
+    created_ids = []
+    for data in validated:
+        convert_id = str(uuid.uuid4())
+        convert_data = data.model_dump()
+        convert_data.update(id=convert_id, created_at=now, updated_at=now, created_by=created_by)
+        
+        # A new convert has no contacts yet; the engine scores stage and assignment alone
+        result = score_convert(convert_data)
+        convert_data["health_score"] = result["score"]
+        db.converts[convert_id] = convert_data
+        db.health_scores[convert_id] = health_score_record(result, now)
+        created_ids.append(convert_id)
+    
+    if created_ids:
+        record_changes("converts", "create", created_ids)
+        evaluate_alert_rules("converts", created_ids)
+        trigger_automations([(db.converts[convert_id], None) for convert_id in created_ids])
+        record_changes("health_scores", "create", created_ids)
+    return created_ids
+
+# Bulk routes are registered before /converts/{convert_id} so "bulk" isn't taken for an id
+
+async def read_bulk_items(request: Request) -> List[Tuple[Any, Optional[str]]]:
+    """Parse a bulk body (JSON array or NDJSON) into (item, parse error) pairs."""
+    try:
+        items = parse_bulk_body(await request.body(), request.headers.get("content-type"))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} items per bulk request")
+    return items
+
+@api_router.post("/converts/bulk")
+async def bulk_create_converts(request: Request, current_user: User = Depends(get_current_user)):
+    """Create many converts from a JSON array or NDJSON body; returns per-item results."""
+    items = await read_bulk_items(request)
+    results = BulkResults()
+    
+    # Validate the whole batch before touching the database
+    valid = []
+    for index, (item, error) in enumerate(items):
+        if error is not None:
+            results.error(index, error)
+            continue
+        try:
+            valid.append((index, ConvertCreate.model_validate(item)))
+        except ValidationError as e:
+            results.error(index, validation_errors(e))
+    
+    created_ids = insert_converts([data for _, data in valid], current_user.id)
+    for (index, _), convert_id in zip(valid, created_ids):
+        results.ok(index, convert_id, "created")
+    return results.to_dict()
+
+@api_router.patch("/converts/bulk")
+async def bulk_update_converts(request: Request, current_user: User = Depends(get_current_user)):
+    """Apply many partial updates, each an object with the convert "id" and the fields to change."""
+    items = await read_bulk_items(request)
+    results = BulkResults()
+    now = datetime.now(timezone.utc).isoformat()
     
-    return converts
+    valid = []
+    for index, (item, error) in enumerate(items):
+        if error is not None:
+            results.error(index, error)
+            continue
+        if not isinstance(item, dict) or not isinstance(item.get("id"), str):
+            results.error(index, "Each update must be an object with an \"id\"")
+            continue
+        convert_id = item["id"]
+        changes = {key: value for key, value in item.items() if key != "id"}
+        unknown = sorted(set(changes) - set(ConvertBase.model_fields))
+        if convert_id not in db.converts:
+            results.error(index, "Convert not found", convert_id)
+        elif unknown:
+            results.error(index, f"Unknown fields: {', '.join(unknown)}", convert_id)
+        else:
+            try:
+                merged = ConvertBase.model_validate({**db.converts[convert_id], **changes})
+            except ValidationError as e:
+                results.error(index, validation_errors(e), convert_id)
+                continue
+            valid.append((index, convert_id, merged.model_dump(mode="json", include=set(changes))))
+    
+    updated_ids, rescored_ids, transitions = [], [], []
+    for index, convert_id, changes in valid:
+        previous = dict(db.converts[convert_id])
+        db.converts[convert_id].update(changes)
+        db.converts[convert_id]["updated_at"] = now
+        if db.converts[convert_id].get("stage") != previous.get("stage"):
+            db.converts[convert_id]["stage_updated_at"] = now
+        if SCORED_FIELDS & changes.keys():
+            rescored_ids.append(convert_id)
+        updated_ids.append(convert_id)
+        transitions.append((db.converts[convert_id], previous))
+        results.ok(index, convert_id, "updated")
+    
+    if updated_ids:
+        record_changes("converts", "update", updated_ids)
+        rescore_converts(rescored_ids)
+        evaluate_alert_rules("converts", updated_ids)
+        trigger_automations(transitions)
+    return results.to_dict()
+
+@api_router.delete("/converts/bulk")
+async def bulk_delete_converts(request: Request, current_user: User = Depends(get_current_user)):
+    """Delete many converts, given as ids or objects with an "id"."""
+    items = await read_bulk_items(request)
+    results = BulkResults()
+    
+    deleted_ids = []
+    for index, (item, error) in enumerate(items):
+        convert_id = item.get("id") if isinstance(item, dict) else item
+        if error is not None:
+            results.error(index, error)
+        elif not isinstance(convert_id, str):
+            results.error(index, "Expected a convert id")
+        elif db.converts.pop(convert_id, None) is None:
+            results.error(index, "Convert not found", convert_id)
+        else:
+            deleted_ids.append(convert_id)
+            results.ok(index, convert_id, "deleted")
+    
+    if deleted_ids:
+        record_changes("converts", "delete", deleted_ids)
+        evaluate_alert_rules("converts", deleted_ids)
+        cancel_automations(deleted_ids)
+    return results.to_dict()
+
+@api_router.post("/converts/import", status_code=202)
+async def import_converts(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    filename: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Import converts from a CSV or XLSX upload sent as the request body.
+    
+    The upload is spooled (to disk past a small size) as it arrives, then
+    parsed and imported in the background; poll /converts/import/{job_id}
+    for progress and row-level errors.
+    """
+    media_type = (request.headers.get("content-type") or "").split(";", 1)[0].strip().lower()
+    if media_type in XLSX_MEDIA_TYPES or (filename or "").lower().endswith(".xlsx"):
+        if openpyxl is None:
+            raise HTTPException(status_code=415, detail="XLSX import needs openpyxl; upload CSV instead")
+        file_format = "xlsx"
+    elif media_type in CSV_MEDIA_TYPES or (filename or "").lower().endswith(".csv"):
+        file_format = "csv"
+    else:
+        raise HTTPException(status_code=415, detail="Upload a CSV (text/csv) or XLSX spreadsheet")
+    
+    upload = tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE)
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > IMPORT_MAX_BYTES:
+            upload.close()
+            raise HTTPException(status_code=413, detail=f"Uploads are limited to {IMPORT_MAX_BYTES // (1024 * 1024)} MB")
+        upload.write(chunk)
+    upload.seek(0)
+    
+    job = convert_importer.create_job(filename, current_user.id)
+    background_tasks.add_task(
+        convert_importer.run,
+        job,
+        upload,
+        file_format,
+        ConvertCreate,
+        lambda validated: len(insert_converts(validated, current_user.id)),
+    )
+    return job.to_dict(include_errors=False)
+
+@api_router.get("/converts/import/{job_id}")
+async def get_import_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Progress and row-level error report of a convert import."""
+    job = convert_importer.jobs.get(job_id)
+    # Error reports quote uploaded values, so only the uploader may read a job
+    if job is None or job.created_by != current_user.id:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job.to_dict()
+
+# Column order of CSV exports without ?fields=
+CONVERT_EXPORT_COLUMNS = ("id", *ConvertBase.model_fields, "created_at", "updated_at", "created_by")
+VOICE_CALL_EXPORT_COLUMNS = (*VoiceCall.model_fields, "script_id", "convert_name", "convert_phone")
+
+@api_router.get("/converts/export")
+async def export_converts(
+    stage: Optional[str] = None,
+    search: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    fields: Optional[str] = None,
+    file_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream converts matching the list filters as NDJSON or CSV."""
+    projection = parse_fields(CONVERT_FIELDS, fields)
+    # Iterate a snapshot of the records so writes during the export can't break it
+    records = iter_converts(stage, search, assigned_to, list(db.converts.values()))
+    return export_response(records, file_format, CONVERT_EXPORT_COLUMNS, projection, "converts")
 
 @api_router.get("/converts/{convert_id}")
 async def get_convert(convert_id: str, current_user: User = Depends(get_current_user)):
     if convert_id not in db.converts:
         raise HTTPException(status_code=404, detail="Convert not found")
-    return db.converts[convert_id]
+    return FastJSONResponse(db.converts[convert_id])
 
 @api_router.post("/converts", status_code=201)
 async def create_convert(
@@ -770,25 +1319,17 @@ async def create_convert(
     convert_data["created_by"] = current_user.id
     
     # Calculate initial health score
-    health_score = random.randint(30, 50)
+    result = score_convert(convert_data)
+    health_score = result["score"]
     convert_data["health_score"] = health_score
     
     db.converts[convert_id] = convert_data
+    db.health_scores[convert_id] = health_score_record(result, now)
     
-    # Create health score record
-    db.health_scores[convert_id] = {
-        "id": str(uuid.uuid4()),
-        "convert_id": convert_id,
-        "score": health_score,
-        "factors": {
-            "attendance_rate": random.randint(20, 40),
-            "engagement_level": random.randint(30, 50),
-            "response_time": random.randint(40, 60),
-            "spiritual_growth": random.randint(20, 40),
-            "social_connection": random.randint(10, 30),
-        },
-        "calculated_at": now,
-    }
+    record_change("converts", "create", convert_id, CONVERT_FIELDS.project(convert_data, CONVERT_FIELDS.shapes["summary"]))
+    evaluate_alert_rules("converts", [convert_id])
+    trigger_automations([(convert_data, None)])
+    record_change("health_scores", "create", convert_id, {"score": health_score})
     
     return convert_data
 
@@ -801,22 +1342,32 @@ async def update_convert(
     if convert_id not in db.converts:
         raise HTTPException(status_code=404, detail="Convert not found")
     
+    previous = dict(db.converts[convert_id])
     db.converts[convert_id].update(data)
     db.converts[convert_id]["updated_at"] = datetime.now(timezone.utc).isoformat()
+    if db.converts[convert_id].get("stage") != previous.get("stage"):
+        db.converts[convert_id]["stage_updated_at"] = db.converts[convert_id]["updated_at"]
+    record_change("converts", "update", convert_id, dict(data, updated_at=db.converts[convert_id]["updated_at"]))
+    if SCORED_FIELDS & data.keys():
+        rescore_converts([convert_id])
+    evaluate_alert_rules("converts", [convert_id])
+    trigger_automations([(db.converts[convert_id], previous)])
     return db.converts[convert_id]
 
 @api_router.delete("/converts/{convert_id}", status_code=204)
 async def delete_convert(convert_id: str, current_user: User = Depends(get_current_user)):
     if convert_id in db.converts:
         del db.converts[convert_id]
+        record_change("converts", "delete", convert_id)
+        evaluate_alert_rules("converts", [convert_id])
+        cancel_automations([convert_id])
     return None
 
 # -----------------------------------------------------------------------------
 # DASHBOARD ROUTES
 # -----------------------------------------------------------------------------
 
-@api_router.get("/dashboard/stats")
-async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
+def compute_dashboard_stats() -> Dict[str, Any]:
     total_converts = len(db.converts)
     
     # New this month
@@ -862,16 +1413,31 @@ async def get_dashboard_stats(current_user: User = Depends(get_current_user)):
         "open_alerts": open_alerts,
     }
 
-@api_router.get("/dashboard/stage-distribution")
-async def get_stage_distribution(current_user: User = Depends(get_current_user)):
+@api_router.get("/dashboard/stats")
+async def get_dashboard_stats(request: Request, current_user: User = Depends(get_current_user)):
+    # "New this month" moves with the calendar, so the day is part of the key
+    return response_cache.respond(
+        request,
+        db.generation("converts", "users", "services", "alerts") + (datetime.now(timezone.utc).date().isoformat(),),
+        compute_dashboard_stats,
+    )
+
+def compute_stage_distribution() -> Dict[str, Any]:
     distribution = {}
     for stage in ConvertStage:
         count = len([c for c in db.converts.values() if c["stage"] == stage.value])
         distribution[stage.value] = count
     return distribution
 
-@api_router.get("/dashboard/recent-activity")
-async def get_recent_activity(current_user: User = Depends(get_current_user)):
+@api_router.get("/dashboard/stage-distribution")
+async def get_stage_distribution(request: Request, current_user: User = Depends(get_current_user)):
+    return response_cache.respond(
+        request,
+        db.generation("converts"),
+        compute_stage_distribution,
+    )
+
+def compute_recent_activity() -> List[Dict[str, Any]]:
     # Combine recent converts, calls, and alerts
     activities = []
     
@@ -896,13 +1462,130 @@ async def get_recent_activity(current_user: User = Depends(get_current_user)):
     activities.sort(key=lambda x: x["timestamp"], reverse=True)
     return activities[:10]
 
+@api_router.get("/dashboard/recent-activity")
+async def get_recent_activity(request: Request, current_user: User = Depends(get_current_user)):
+    return response_cache.respond(
+        request,
+        db.generation("converts", "voice_calls"),
+        compute_recent_activity,
+    )
+
+def compute_dashboard_overview() -> Dict[str, Any]:
+    """Dashboard stats, stage/health distributions and recent activity in one pass over converts."""
+    month_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    
+    stage_dist = {stage.value: 0 for stage in ConvertStage}
+    health_dist = {"excellent": 0, "good": 0, "fair": 0, "poor": 0}
+    new_this_month = 0
+    at_risk = 0
+    health_total = 0
+    recent_converts = []  # min-heap of the 5 newest (created_at, seq, convert)
+    
+    for seq, c in enumerate(db.converts.values()):
+        stage = c["stage"]
+        stage_dist[stage] = stage_dist.get(stage, 0) + 1
+        
+        created_at = c["created_at"]
+        if datetime.fromisoformat(created_at) > month_ago:
+            new_this_month += 1
+        
+        if c.get("health_score", 100) < 40:
+            at_risk += 1
+        health_total += c.get("health_score", 0)
+        
+        score = c.get("health_score", 50)
+        if score >= 80:
+            health_dist["excellent"] += 1
+        elif score >= 60:
+            health_dist["good"] += 1
+        elif score >= 40:
+            health_dist["fair"] += 1
+        else:
+            health_dist["poor"] += 1
+        
+        if len(recent_converts) < 5:
+            heapq.heappush(recent_converts, (created_at, seq, c))
+        elif created_at > recent_converts[0][0]:
+            heapq.heapreplace(recent_converts, (created_at, seq, c))
+    
+    total_converts = len(db.converts)
+    
+    activities = [
+        {
+            "type": "convert_created",
+            "message": f"New convert: {c['first_name']} {c['last_name']}",
+            "timestamp": c["created_at"],
+        }
+        for _, _, c in recent_converts
+    ]
+    for call in heapq.nlargest(5, db.voice_calls.values(), key=lambda x: x["created_at"]):
+        convert = db.converts.get(call["convert_id"], {})
+        activities.append({
+            "type": "voice_call",
+            "message": f"Voice call with {convert.get('first_name', 'Unknown')} - {call['status']}",
+            "timestamp": call["created_at"],
+        })
+    activities.sort(key=lambda x: x["timestamp"], reverse=True)
+    
+    return {
+        "stats": {
+            "total_converts": total_converts,
+            "new_this_month": new_this_month,
+            "at_risk": at_risk,
+            "awaiting_followup": stage_dist.get(ConvertStage.NEW.value, 0),
+            "average_health_score": round(health_total / total_converts, 1) if total_converts else 0,
+            "active_workers": sum(1 for u in db.users.values() if u["is_active"]),
+            "upcoming_services": sum(
+                1 for s in db.services.values()
+                if datetime.fromisoformat(s["created_at"]) > month_ago
+            ),
+            "open_alerts": sum(
+                1 for a in db.alerts.values()
+                if a["status"] in ["open", "acknowledged"]
+            ),
+        },
+        "stage_distribution": stage_dist,
+        "health_distribution": health_dist,
+        "recent_activity": activities[:10],
+    }
+
+@api_router.get("/dashboard/overview")
+async def get_dashboard_overview(request: Request, current_user: User = Depends(get_current_user)):
+    """Everything the dashboard renders in one response, with an ETag for conditional GETs."""
+    # "New this month" moves with the calendar, so the day is part of the key
+    return response_cache.respond(
+        request,
+        db.generation("converts", "users", "services", "alerts", "voice_calls") + (datetime.now(timezone.utc).date().isoformat(),),
+        compute_dashboard_overview,
+    )
+
 # -----------------------------------------------------------------------------
 # HEALTH SCORE ROUTES
 # -----------------------------------------------------------------------------
 
 @api_router.get("/health-scores")
-async def list_health_scores(current_user: User = Depends(get_current_user)):
-    return list(db.health_scores.values())
+async def list_health_scores(
+    request: Request,
+    since: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    if since is not None:
+        return response_cache.respond(
+            request,
+            db.generation("health_scores") + (db.change_seq,),
+            lambda: delta_sync(
+                "health_scores", since,
+                lambda records: list(db.health_scores.values() if records is None else records),
+            ),
+        )
+    
+    response = response_cache.respond(
+        request,
+        db.generation("health_scores"),
+        lambda: list(db.health_scores.values()),
+    )
+    response.headers["X-Sync-Token"] = sync_token()
+    return response
 
 @api_router.get("/health-scores/{convert_id}")
 async def get_convert_health_score(
@@ -913,6 +1596,83 @@ async def get_convert_health_score(
         raise HTTPException(status_code=404, detail="Health score not found")
     return db.health_scores[convert_id]
 
+def apply_health_results(results: List[Dict[str, Any]]) -> Tuple[int, int]:
+    """Store a batch of health_engine results; returns (scores changed, alerts evaluated).
+    
+    Alert rules are only re-evaluated for converts whose score crossed one of their
+    thresholds, or that have a health score alert open (its severity and description
+    follow the score).
+    """
+    now = datetime.now(timezone.utc).isoformat()
+    thresholds = alert_engine.thresholds("health_score", "score")
+    changed_ids, crossed = [], []
+    for result in results:
+        convert = db.converts.get(result["convert_id"])
+        if convert is None:
+            continue
+        old_score = convert.get("health_score")
+        db.health_scores[convert["id"]] = health_score_record(result, now)
+        if result["score"] == old_score:
+            continue
+        convert["health_score"] = result["score"]
+        convert["updated_at"] = now
+        changed_ids.append(convert["id"])
+        if crossed_threshold(old_score, result["score"], thresholds) or alert_engine.has_open("health_score", convert["id"]):
+            crossed.append(convert["id"])
+    
+    if results:
+        record_changes("health_scores", "update", [result["convert_id"] for result in results])
+    if changed_ids:
+        record_changes("converts", "update", changed_ids)
+    if crossed:
+        evaluate_alert_rules("health_scores", crossed)
+    return len(changed_ids), len(crossed)
+
+@api_router.post("/health-scores/recalculate", status_code=202)
+async def recalculate_health_scores(
+    background_tasks: BackgroundTasks,
+    stage: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """Recalculate health scores for all converts, a stage or a worker's caseload in the background."""
+    converts = query_converts(stage=stage, assigned_to=assigned_to)
+    job = health_recalculator.create_job({"stage": stage, "assigned_to": assigned_to}, current_user.id)
+    background_tasks.add_task(
+        health_recalculator.run,
+        job,
+        converts,
+        list(db.followup_records.values()),
+        list(db.voice_calls.values()),
+        apply_health_results,
+    )
+    job.total = len(converts)
+    return job.to_dict()
+
+@api_router.get("/health-scores/jobs/{job_id}")
+async def get_recalculation_job(job_id: str, current_user: User = Depends(get_current_user)):
+    """Progress of a bulk health score recalculation."""
+    job = health_recalculator.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Recalculation job not found")
+    return job.to_dict()
+
+def rescore_converts(convert_ids: Iterable[str]):
+    """Re-run the health engine for converts from their own follow-ups and calls.
+    
+    Writes that change what a score depends on (a call ending, a follow-up
+    recorded, a stage or worker change) call this before evaluate_alert_rules,
+    so the rules judge the new score, not the one from before the change.
+    """
+    wanted = {convert_id for convert_id in convert_ids if convert_id in db.converts}
+    if not wanted:
+        return
+    apply_health_results(score_population(
+        [db.converts[convert_id] for convert_id in wanted],
+        [r for r in db.followup_records.values() if r.get("convert_id") in wanted],
+        [c for c in db.voice_calls.values() if c.get("convert_id") in wanted],
+    ))
+
 @api_router.post("/health-scores/{convert_id}/recalculate")
 async def recalculate_health_score(
     convert_id: str,
@@ -921,39 +1681,20 @@ async def recalculate_health_score(
     if convert_id not in db.converts:
         raise HTTPException(status_code=404, detail="Convert not found")
     
-    # Simulate recalculation
-    new_score = random.randint(30, 95)
-    db.health_scores[convert_id] = {
-        "id": str(uuid.uuid4()),
-        "convert_id": convert_id,
-        "score": new_score,
-        "factors": {
-            "attendance_rate": random.randint(0, 100),
-            "engagement_level": random.randint(0, 100),
-            "response_time": random.randint(0, 100),
-            "spiritual_growth": random.randint(0, 100),
-            "social_connection": random.randint(0, 100),
-        },
-        "calculated_at": datetime.now(timezone.utc).isoformat(),
-    }
-    
-    # Update convert
-    db.converts[convert_id]["health_score"] = new_score
-    db.converts[convert_id]["updated_at"] = datetime.now(timezone.utc).isoformat()
-    
+    rescore_converts([convert_id])
     return db.health_scores[convert_id]
 
 # -----------------------------------------------------------------------------
 # ALERT ROUTES
 # -----------------------------------------------------------------------------
 
-@api_router.get("/alerts")
-async def list_alerts(
+def query_alerts(
     status: Optional[str] = None,
     severity: Optional[str] = None,
-    current_user: User = Depends(get_current_user)
-):
-    alerts = list(db.alerts.values())
+    records: Optional[Iterable[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Alerts matching the list endpoint's filters (among records, if given), with convert info added."""
+    alerts = list(db.alerts.values() if records is None else records)
     
     if status:
         alerts = [a for a in alerts if a["status"] == status]
@@ -969,6 +1710,40 @@ async def list_alerts(
     
     return alerts
 
+@api_router.get("/alerts")
+async def list_alerts(
+    request: Request,
+    status: Optional[str] = None,
+    severity: Optional[str] = None,
+    fields: Optional[str] = None,
+    since: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    projection = parse_fields(ALERT_FIELDS, fields)
+    if since is not None:
+        return response_cache.respond(
+            request,
+            db.generation("alerts", "converts") + (db.change_seq,),
+            lambda: delta_sync(
+                "alerts", since,
+                lambda records: query_alerts(status, severity, records),
+                ALERT_FIELDS, projection,
+            ),
+        )
+    
+    response = response_cache.respond(
+        request,
+        db.generation("alerts", "converts"),
+        lambda: ALERT_FIELDS.project_all(query_alerts(status, severity), projection),
+    )
+    response.headers["X-Sync-Token"] = sync_token()
+    return response
+
+@api_router.get("/alerts/rules")
+async def list_alert_rules(current_user: User = Depends(get_current_user)):
+    """Alert rules with their evaluation cost, most expensive first."""
+    return alert_engine.report()
+
 @api_router.get("/alerts/{alert_id}")
 async def get_alert(alert_id: str, current_user: User = Depends(get_current_user)):
     if alert_id not in db.alerts:
@@ -989,12 +1764,690 @@ async def update_alert(
     
     db.alerts[alert_id].update(data)
     db.alerts[alert_id]["updated_at"] = datetime.now(timezone.utc).isoformat()
+    record_change("alerts", "update", alert_id, dict(data, updated_at=db.alerts[alert_id]["updated_at"]))
     return db.alerts[alert_id]
 
+# -----------------------------------------------------------------------------
+# SMS ROUTES
+# -----------------------------------------------------------------------------
+
+def persist_sms_logs(records: List[Dict[str, Any]]):
+    for record in records:
+        db.sms_logs[record["id"]] = record
+    record_changes("sms_logs", "create", [record["id"] for record in records])
+
+# The demo sends through the local gateway stand-in; a deployment registers its provider here
+sms_dispatcher.register(FakeSmsGateway())
+sms_dispatcher.persist = persist_sms_logs
+
+def queue_sms(to: str, body: str, convert_id: Optional[str] = None, **fields) -> Optional[SmsMessage]:
+    """Hand an SMS to the dispatcher; None when the queue is full."""
+    message = SmsMessage(to, body, convert_id, fields=fields or None)
+    return message if sms_dispatcher.submit_nowait(message) else None
+
+@api_router.get("/sms/dispatcher")
+async def sms_dispatcher_stats(current_user: User = Depends(get_current_user)):
+    return sms_dispatcher.report()
+
+@api_router.get("/sms/logs")
+async def list_sms_logs(
+    convert_id: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user)
+):
+    logs = []
+    for record in db.sms_logs.values():
+        if convert_id and record["convert_id"] != convert_id:
+            continue
+        if status and record["status"] != status:
+            continue
+        logs.append(record)
+        if len(logs) >= limit:
+            break
+    return logs
+
+@api_router.post("/sms/send")
+async def send_sms(data: Dict[str, Any], current_user: User = Depends(get_current_user)):
+    """Send a message ({"convert_ids": [...], "message": "..."}) to converts; waits for queue room."""
+    convert_ids = data.get("convert_ids")
+    body = data.get("message")
+    if not isinstance(convert_ids, list) or not all(isinstance(i, str) for i in convert_ids):
+        raise HTTPException(status_code=400, detail="convert_ids must be a list of convert ids")
+    if not isinstance(body, str) or not body.strip():
+        raise HTTPException(status_code=400, detail="message is required")
+    missing = [convert_id for convert_id in convert_ids if convert_id not in db.converts]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Converts not found: {', '.join(missing[:10])}")
+    
+    queued = rejected = 0
+    for convert_id in convert_ids:
+        phone = db.converts[convert_id].get("phone")
+        if not phone:
+            continue
+        if await sms_dispatcher.submit(SmsMessage(phone, body, convert_id, fields={"sent_by": current_user.id})):
+            queued += 1
+        else:
+            rejected += 1
+    return {"queued": queued, "rejected": rejected, "skipped": len(convert_ids) - queued - rejected}
+
+# -----------------------------------------------------------------------------
+# WORKFLOW ROUTES
+# -----------------------------------------------------------------------------
+
+def convert_events(convert: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> List[str]:
+    """Workflow, sequence and playbook trigger events implied by a convert being created (previous=None) or changed.
+    
+    The demo has no attendance records, so a convert turning inactive stands
+    in for no_attendance_14_days.
+    """
+    events = []
+    if previous is None:
+        events.append("convert_created")
+    if convert.get("stage") == ConvertStage.INACTIVE.value and (previous or {}).get("stage") != ConvertStage.INACTIVE.value:
+        events.append("no_attendance_14_days")
+    if convert.get("stage") == ConvertStage.IN_CLASSES.value and (previous or {}).get("stage") != ConvertStage.IN_CLASSES.value:
+        events.append("joined_classes")
+    if "baptism" in (convert.get("notes") or "").lower() and "baptism" not in ((previous or {}).get("notes") or "").lower():
+        events.append("baptism_interest")
+    if convert.get("assigned_worker_id") and convert["assigned_worker_id"] != (previous or {}).get("assigned_worker_id"):
+        events.append("worker_assigned")
+    return events
+
+def trigger_automations(transitions: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]):
+    """Start workflows, sequence enrollments and playbooks for (convert, previous state) pairs from a write."""
+    by_event: Dict[str, List[str]] = {}
+    for convert, previous in transitions:
+        for event in convert_events(convert, previous):
+            by_event.setdefault(event, []).append(convert["id"])
+    for event, convert_ids in by_event.items():
+        workflow_runtime.trigger(event, convert_ids)
+        sequence_scheduler.trigger(event, convert_ids)
+        playbook_runtime.trigger(event, convert_ids)
+
+def cancel_automations(convert_ids: Iterable[str]):
+    """Stop the workflows, sequences, playbooks and queued calls of deleted converts."""
+    convert_ids = set(convert_ids)
+    for convert_id in convert_ids:
+        workflow_runtime.cancel(convert_id)
+        sequence_scheduler.cancel(convert_id)
+        playbook_runtime.cancel(convert_id)
+        voice_dialer.cancel_convert(convert_id)
+    
+    # Their scheduled calls will never be made; end them so their campaigns can finish
+    now = datetime.now(timezone.utc).isoformat()
+    cancelled = []
+    for call in db.voice_calls.values():
+        if call["convert_id"] in convert_ids and call["status"] == VoiceCallStatus.SCHEDULED.value:
+            voice_dialer.cancel(call["id"])
+            call.update(status=VoiceCallStatus.FAILED.value, outcome="cancelled", ended_at=now, updated_at=now)
+            advance_campaign(call, VoiceCallStatus.SCHEDULED.value)
+            cancelled.append(call["id"])
+    if cancelled:
+        record_changes("voice_calls", "update", cancelled)
+
+# Task-creating step actions and the kind of task each creates
+WORKFLOW_TASK_ACTIONS = {
+    "create_followup_task": ("followup", "Follow up with {name}"),
+    "schedule_call": ("call", "Call {name}"),
+    "create_welfare_task": ("welfare", "Welfare check on {name}"),
+    "pastor_call": ("pastoral_call", "Pastoral call to {name}"),
+    "home_visit": ("visit", "Home visit to {name}"),
+    "enroll_baptism_class": ("baptism_class", "Enroll {name} in baptism class"),
+    "schedule_baptism": ("baptism", "Schedule baptism for {name}"),
+}
+
+# SMS-sending step actions and their messages
+WORKFLOW_SMS_ACTIONS = {
+    "send_welcome_sms": "Welcome to Dependify Gospel, {first_name}! We're glad you joined us. Service is Sunday 9am.",
+    "send_care_sms": "Hi {first_name}, we've missed you at church. We're praying for you; reply if we can help in any way.",
+    "send_class_reminder": "Hi {first_name}, a reminder that your baptism class holds this week. See you there!",
+    "send_confirmation": "Hi {first_name}, your baptism is confirmed. We look forward to celebrating with you!",
+}
+
+# Follow-up tasks created since the last persist, published with the executions
+pending_followup_tasks: List[str] = []
+
+def create_workflow_task(execution, step: Dict[str, Any]) -> Optional[str]:
+    convert = db.converts.get(execution.convert_id)
+    if convert is None:
+        return None
+    task_type, title = WORKFLOW_TASK_ACTIONS[step["action"]]
+    now = datetime.now(timezone.utc)
+    task_id = str(uuid.uuid4())
+    db.followup_tasks[task_id] = {
+        "id": task_id,
+        "convert_id": convert["id"],
+        "workflow_execution_id": execution.id,
+        "type": task_type,
+        "title": title.format(name=f"{convert.get('first_name', '')} {convert.get('last_name', '')}".strip()),
+        "assignee_id": convert.get("assigned_worker_id"),
+        "status": "pending",
+        "due_date": (now + timedelta(days=1)).isoformat(),
+        "created_at": now.isoformat(),
+    }
+    pending_followup_tasks.append(task_id)
+    return task_id
+
+def assign_followup_worker(execution, step: Dict[str, Any]) -> Optional[str]:
+    convert = db.converts.get(execution.convert_id)
+    if convert is None or convert.get("assigned_worker_id"):
+        return convert and convert.get("assigned_worker_id")
+    worker_ids = [u["id"] for u in db.users.values() if u["role"] == UserRole.FOLLOWUP_WORKER.value]
+    if not worker_ids:
+        return None
+    previous = dict(convert)
+    convert["assigned_worker_id"] = random.choice(worker_ids)
+    convert["updated_at"] = datetime.now(timezone.utc).isoformat()
+    record_change("converts", "update", convert["id"], {
+        "assigned_worker_id": convert["assigned_worker_id"],
+        "updated_at": convert["updated_at"],
+    })
+    # A worker is a scoring input; the same path as the convert update routes
+    rescore_converts([convert["id"]])
+    evaluate_alert_rules("converts", [convert["id"]])
+    trigger_automations([(convert, previous)])
+    return convert["assigned_worker_id"]
+
+def send_workflow_sms(execution, step: Dict[str, Any]) -> Optional[str]:
+    convert = db.converts.get(execution.convert_id)
+    if convert is None or not convert.get("phone"):
+        return None
+    body = WORKFLOW_SMS_ACTIONS[step["action"]].format(first_name=convert.get("first_name", ""))
+    message = queue_sms(convert["phone"], body, convert["id"], workflow_execution_id=execution.id)
+    if message is None:
+        raise RuntimeError("SMS queue full")
+    return message.id
+
+def persist_workflow_executions(executions):
+    """Store a batch of changed executions and the tasks their steps created."""
+    for execution in executions:
+        db.workflow_executions[execution.id] = execution.to_dict()
+    record_changes("workflow_executions", "update", [execution.id for execution in executions])
+    if pending_followup_tasks:
+        record_changes("followup_tasks", "create", list(pending_followup_tasks))
+        pending_followup_tasks.clear()
+
+# Email steps (send_followup_email) have no gateway in the demo; they are only recorded on the execution
+for action in WORKFLOW_TASK_ACTIONS:
+    workflow_runtime.register(action, create_workflow_task)
+for action in WORKFLOW_SMS_ACTIONS:
+    workflow_runtime.register(action, send_workflow_sms)
+workflow_runtime.register("assign_followup_worker", assign_followup_worker)
+workflow_runtime.persist = persist_workflow_executions
+
+@api_router.get("/workflows")
+async def list_workflows(current_user: User = Depends(get_current_user)):
+    running: Dict[str, int] = {}
+    for workflow_id, _ in workflow_runtime.running:
+        running[workflow_id] = running.get(workflow_id, 0) + 1
+    return [dict(workflow, running_executions=running.get(workflow["id"], 0)) for workflow in db.workflows.values()]
+
+@api_router.get("/workflows/executions")
+async def list_workflow_executions(
+    convert_id: Optional[str] = None,
+    workflow_id: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user)
+):
+    executions = []
+    for execution in db.workflow_executions.values():
+        if convert_id and execution["convert_id"] != convert_id:
+            continue
+        if workflow_id and execution["workflow_id"] != workflow_id:
+            continue
+        if status and execution["status"] != status:
+            continue
+        executions.append(execution)
+        if len(executions) >= limit:
+            break
+    return executions
+
+@api_router.get("/workflows/runtime")
+async def workflow_runtime_stats(current_user: User = Depends(get_current_user)):
+    return workflow_runtime.report()
+
+@api_router.get("/followup-tasks")
+async def list_followup_tasks(
+    assignee_id: Optional[str] = None,
+    convert_id: Optional[str] = None,
+    status: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    tasks = [
+        task for task in db.followup_tasks.values()
+        if (not assignee_id or task["assignee_id"] == assignee_id)
+        and (not convert_id or task["convert_id"] == convert_id)
+        and (not status or task["status"] == status)
+    ]
+    tasks.sort(key=lambda task: task["due_date"])
+    return tasks
+
+# -----------------------------------------------------------------------------
+# SEQUENCE ROUTES
+# -----------------------------------------------------------------------------
+
+def sequence_recipient(enrollment, channel: str) -> Optional[str]:
+    """Phone number or email address a sequence message goes to."""
+    convert = db.converts.get(enrollment.convert_id)
+    if convert is None:
+        return None
+    if sequence_scheduler.definitions[enrollment.sequence_id].get("recipient") == "assigned_worker":
+        person = db.users.get(convert.get("assigned_worker_id")) or {}
+    else:
+        person = convert
+    return person.get("phone" if channel == "sms" else "email")
+
+def queue_sequence_sms(deliveries) -> List[Optional[str]]:
+    """Hand a batch of sequence SMS to the dispatcher, which logs them to sms_logs once sent."""
+    errors = []
+    for enrollment, index, message in deliveries:
+        recipient = sequence_recipient(enrollment, "sms")
+        if not recipient:
+            errors.append("No phone number")
+        elif queue_sms(recipient, message["content"], enrollment.convert_id, sequence_execution_id=enrollment.id) is None:
+            errors.append("SMS queue full")
+        else:
+            errors.append(None)
+    return errors
+
+def log_sequence_messages(collection: str, channel: str, deliveries) -> List[Optional[str]]:
+    """Record a batch of sequence messages in the channel's log; the demo has no gateway to send them."""
+    now = datetime.now(timezone.utc).isoformat()
+    store = getattr(db, collection)
+    errors, logged = [], []
+    for enrollment, index, message in deliveries:
+        recipient = sequence_recipient(enrollment, channel)
+        if not recipient:
+            errors.append(f"No {'phone number' if channel == 'sms' else 'email address'}")
+            continue
+        log_id = str(uuid.uuid4())
+        store[log_id] = {
+            "id": log_id,
+            "convert_id": enrollment.convert_id,
+            "sequence_execution_id": enrollment.id,
+            "to": recipient,
+            "message": message["content"],
+            "status": "sent",
+            "created_at": now,
+        }
+        logged.append(log_id)
+        errors.append(None)
+    if logged:
+        record_changes(collection, "create", logged)
+    return errors
+
+def persist_sequence_enrollments(enrollments):
+    for enrollment in enrollments:
+        db.sequence_executions[enrollment.id] = sequence_scheduler.to_dict(enrollment)
+    record_changes("sequence_executions", "update", [enrollment.id for enrollment in enrollments])
+
+sequence_scheduler.register("sms", queue_sequence_sms)
+sequence_scheduler.register("email", lambda deliveries: log_sequence_messages("email_logs", "email", deliveries))
+sequence_scheduler.persist = persist_sequence_enrollments
+
+@api_router.get("/sequences")
+async def list_sequences(current_user: User = Depends(get_current_user)):
+    active: Dict[str, int] = {}
+    for sequence_id, _ in sequence_scheduler.active:
+        active[sequence_id] = active.get(sequence_id, 0) + 1
+    return [dict(sequence, active_enrollments=active.get(sequence["id"], 0)) for sequence in db.sequences.values()]
+
+@api_router.get("/sequences/executions")
+async def list_sequence_executions(
+    convert_id: Optional[str] = None,
+    sequence_id: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user)
+):
+    executions = []
+    for execution in db.sequence_executions.values():
+        if convert_id and execution["convert_id"] != convert_id:
+            continue
+        if sequence_id and execution["sequence_id"] != sequence_id:
+            continue
+        if status and execution["status"] != status:
+            continue
+        executions.append(execution)
+        if len(executions) >= limit:
+            break
+    return executions
+
+@api_router.get("/sequences/scheduler")
+async def sequence_scheduler_stats(current_user: User = Depends(get_current_user)):
+    return sequence_scheduler.report()
+
+@api_router.post("/sequences/{sequence_id}/enroll")
+async def enroll_in_sequence(
+    sequence_id: str,
+    data: Dict[str, Any],
+    current_user: User = Depends(get_current_user)
+):
+    """Enroll converts ({"convert_ids": [...]}) in a sequence; ones already enrolled are skipped."""
+    if sequence_id not in db.sequences:
+        raise HTTPException(status_code=404, detail="Sequence not found")
+    convert_ids = data.get("convert_ids")
+    if not isinstance(convert_ids, list) or not all(isinstance(i, str) for i in convert_ids):
+        raise HTTPException(status_code=400, detail="convert_ids must be a list of convert ids")
+    missing = [convert_id for convert_id in convert_ids if convert_id not in db.converts]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Converts not found: {', '.join(missing[:10])}")
+    
+    enrolled = sequence_scheduler.enroll(sequence_id, convert_ids)
+    return {"enrolled": len(enrolled), "skipped": len(convert_ids) - len(enrolled)}
+
+# -----------------------------------------------------------------------------
+# PLAYBOOK ROUTES
+# -----------------------------------------------------------------------------
+
+# User roles that take each step owner's tasks; admins can take any of them
+PLAYBOOK_OWNER_ROLES = {
+    "followup_worker": (UserRole.FOLLOWUP_WORKER, UserRole.FOLLOWUP_LEADER),
+    "followup_leader": (UserRole.FOLLOWUP_LEADER,),
+    "welfare_officer": (UserRole.WELFARE_OFFICER,),
+    "usher_team": (UserRole.FOLLOWUP_WORKER,),
+    "discipleship_team": (UserRole.MENTOR, UserRole.COUNSELLING_LEADER),
+    "mentorship_coordinator": (UserRole.MENTOR, UserRole.FOLLOWUP_LEADER),
+    "head_of_departments": (UserRole.CLIENT_ADMIN,),
+    "pastor": (UserRole.CLIENT_ADMIN,),
+}
+PLAYBOOK_ADMIN_ROLES = {UserRole.MAIN_ADMIN, UserRole.CLIENT_ADMIN}
+
+def playbook_owners(user: User) -> List[str]:
+    """Step owners whose role queues a user takes tasks from."""
+    if user.role in PLAYBOOK_ADMIN_ROLES:
+        return list(PLAYBOOK_OWNER_ROLES)
+    return [owner for owner, roles in PLAYBOOK_OWNER_ROLES.items() if user.role in roles]
+
+def assign_playbook_step(execution, step: Dict[str, Any]) -> Optional[str]:
+    """Follow-up worker steps go straight to the convert's assigned worker; the rest to the owner role."""
+    if step["owner"] != "followup_worker":
+        return None
+    convert = db.converts.get(execution.convert_id)
+    return convert and convert.get("assigned_worker_id")
+
+def playbook_priority(execution) -> float:
+    """Converts with the lowest health score come first."""
+    convert = db.converts.get(execution.convert_id) or {}
+    return convert.get("health_score") or 50
+
+def run_playbook_automation(tasks) -> List[Optional[str]]:
+    """Automated steps have no gateway in the demo; they are only recorded on the execution."""
+    return [None if task.execution.convert_id in db.converts else "Convert not found" for task in tasks]
+
+def persist_playbook_executions(executions):
+    for execution in executions:
+        db.playbook_executions[execution.id] = playbook_runtime.to_dict(execution)
+    record_changes("playbook_executions", "update", [execution.id for execution in executions])
+
+playbook_runtime.assign = assign_playbook_step
+playbook_runtime.priority = playbook_priority
+playbook_runtime.automate = run_playbook_automation
+playbook_runtime.persist = persist_playbook_executions
+
+@api_router.get("/playbooks")
+async def list_playbooks(current_user: User = Depends(get_current_user)):
+    active: Dict[str, int] = {}
+    for playbook_id, _ in playbook_runtime.active:
+        active[playbook_id] = active.get(playbook_id, 0) + 1
+    return [dict(playbook, active_executions=active.get(playbook["id"], 0)) for playbook in db.playbooks.values()]
+
+@api_router.get("/playbooks/executions")
+async def list_playbook_executions(
+    convert_id: Optional[str] = None,
+    playbook_id: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: User = Depends(get_current_user)
+):
+    executions = []
+    for execution in db.playbook_executions.values():
+        if convert_id and execution["convert_id"] != convert_id:
+            continue
+        if playbook_id and execution["playbook_id"] != playbook_id:
+            continue
+        if status and execution["status"] != status:
+            continue
+        executions.append(execution)
+        if len(executions) >= limit:
+            break
+    return executions
+
+@api_router.get("/playbooks/runtime")
+async def playbook_runtime_stats(current_user: User = Depends(get_current_user)):
+    return playbook_runtime.report()
+
+@api_router.get("/playbooks/tasks")
+async def list_playbook_tasks(
+    limit: int = Query(20, ge=1, le=200),
+    current_user: User = Depends(get_current_user)
+):
+    """The current user's claimed tasks and, most urgent first, the queued tasks they could take next."""
+    claimed = playbook_runtime.claimed.get(current_user.id, {}).values()
+    queued = playbook_runtime.peek(current_user.id, playbook_owners(current_user), limit)
+    return {
+        "claimed": [playbook_runtime.task_dict(task) for task in claimed],
+        "queued": [playbook_runtime.task_dict(task) for task in queued],
+    }
+
+@api_router.post("/playbooks/tasks/next")
+async def take_next_playbook_tasks(
+    limit: int = Query(1, ge=1, le=50),
+    current_user: User = Depends(get_current_user)
+):
+    """Claim the most urgent tasks from the user's own queue and their roles' queues."""
+    tasks = playbook_runtime.next_tasks(current_user.id, playbook_owners(current_user), limit)
+    return [playbook_runtime.task_dict(task) for task in tasks]
+
+@api_router.post("/playbooks/tasks/{task_id}/complete")
+async def complete_playbook_task(
+    task_id: str,
+    data: Optional[Dict[str, Any]] = None,
+    current_user: User = Depends(get_current_user)
+):
+    try:
+        execution = playbook_runtime.complete(task_id, current_user.id, (data or {}).get("outcome"))
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Task not found or not claimed by you")
+    return playbook_runtime.to_dict(execution)
+
+@api_router.post("/playbooks/tasks/{task_id}/release")
+async def release_playbook_task(task_id: str, current_user: User = Depends(get_current_user)):
+    """Put a claimed task back on its queue for someone else to take."""
+    try:
+        task = playbook_runtime.release(task_id, current_user.id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Task not found or not claimed by you")
+    return playbook_runtime.task_dict(task)
+
+@api_router.post("/playbooks/{playbook_id}/start")
+async def start_playbook(
+    playbook_id: str,
+    data: Dict[str, Any],
+    current_user: User = Depends(get_current_user)
+):
+    """Start converts ({"convert_ids": [...]}) on a playbook; ones already on it are skipped."""
+    if playbook_id not in db.playbooks:
+        raise HTTPException(status_code=404, detail="Playbook not found")
+    convert_ids = data.get("convert_ids")
+    if not isinstance(convert_ids, list) or not all(isinstance(i, str) for i in convert_ids):
+        raise HTTPException(status_code=400, detail="convert_ids must be a list of convert ids")
+    missing = [convert_id for convert_id in convert_ids if convert_id not in db.converts]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Converts not found: {', '.join(missing[:10])}")
+    
+    started = playbook_runtime.launch(playbook_id, convert_ids)
+    return {"started": len(started), "skipped": len(convert_ids) - len(started)}
+
 # -----------------------------------------------------------------------------
 # VOICE AGENT ROUTES
 # -----------------------------------------------------------------------------
 
+def advance_campaign(call: Dict[str, Any], previous: str):
+    """Roll a campaign call's status change up into its campaign."""
+    campaign_id = campaign_tracker.campaign_of(call["id"])
+    if campaign_id is None or campaign_id not in db.voice_campaigns:
+        return
+    changes = campaign_tracker.transition(
+        db.voice_campaigns[campaign_id], previous, call, datetime.now(timezone.utc).isoformat()
+    )
+    if changes:
+        record_change("voice_campaigns", "update", campaign_id, changes)
+
+CHURCH_NAME = "Dependify Gospel Centre"
+
+# Template fields of the voice agent config, checked when the config is saved
+AGENT_TEMPLATE_FIELDS = ("greeting_template", "script_template")
+
+def check_template(value: Any, field: str):
+    """Reject a template with unknown placeholders before it is saved."""
+    try:
+        compile_template(value)
+    except TemplateError as e:
+        raise HTTPException(status_code=400, detail=f"{field}: {e}")
+
+def render_call_texts(convert_ids: List[str], script_id: Optional[str] = None) -> List[Dict[str, Optional[str]]]:
+    """Personalized greeting and script for each convert, rendered in one pass per template."""
+    agent = next(iter(db.voice_agents.values()), None)
+    caller_name = agent.get("name", "") if agent else ""
+    contexts = [template_context(db.converts[convert_id], caller_name, CHURCH_NAME) for convert_id in convert_ids]
+    greetings = scripts = [None] * len(contexts)
+    if agent and agent.get("greeting_template"):
+        greeting = template_cache.get(f"agent:{agent['id']}", agent.get("updated_at") or agent.get("created_at"),
+                                      agent["greeting_template"])
+        greetings = greeting.render_many(contexts)
+    script = db.call_scripts.get(script_id) if script_id is not None else None
+    if script and script.get("content"):
+        scripts = template_cache.get(script_id, script.get("version", 1), script["content"]).render_many(contexts)
+    return [{"greeting": g, "script_text": t} for g, t in zip(greetings, scripts)]
+
+def mark_call_dialing(request):
+    now = datetime.now(timezone.utc).isoformat()
+    previous = db.voice_calls[request.call_id]["status"]
+    db.voice_calls[request.call_id].update({
+        "status": VoiceCallStatus.IN_PROGRESS.value,
+        "started_at": now,
+        "attempts": request.attempts,
+        "updated_at": now,
+    })
+    record_change("voice_calls", "update", request.call_id, {
+        "status": VoiceCallStatus.IN_PROGRESS.value,
+        "started_at": now,
+        "attempts": request.attempts,
+    })
+    advance_campaign(db.voice_calls[request.call_id], previous)
+    transcript_hub.open(request.call_id)
+
+def stream_call_message(request, speaker: str, text: str):
+    transcript_hub.append(request.call_id, speaker, text)
+
+def record_call_result(request, result: Dict[str, Any], retry_at: Optional[float]):
+    """Store how a dialled call ended; an unanswered or failed call due a redial goes back to scheduled."""
+    call = db.voice_calls.get(request.call_id)
+    if call is None:
+        return
+    now = datetime.now(timezone.utc)
+    previous = call["status"]
+    if retry_at is not None:
+        changes = {
+            "status": VoiceCallStatus.SCHEDULED.value,
+            "scheduled_time": datetime.fromtimestamp(retry_at, timezone.utc).isoformat(),
+            "last_attempt_status": result["status"],
+        }
+    else:
+        changes = {
+            "status": result["status"],
+            "ended_at": now.isoformat(),
+            "duration_seconds": result["duration_seconds"],
+            "transcript": result["transcript"],
+            "outcome": result["outcome"],
+        }
+        if result["duration_seconds"]:
+            changes["started_at"] = (now - timedelta(seconds=result["duration_seconds"])).isoformat()
+    call.update(changes, updated_at=now.isoformat())
+    record_change("voice_calls", "update", request.call_id, changes)
+    advance_campaign(call, previous)
+    transcript_hub.end(request.call_id, result["status"])
+    if retry_at is None:
+        rescore_converts([call["convert_id"]])
+        evaluate_alert_rules("converts", [call["convert_id"]])
+        logger.info(f"Voice call {request.call_id} {result['status']} after {request.attempts} attempt(s)")
+
+def campaign_retry_time(request, when: float) -> float:
+    """Redial time of a campaign call, moved into its campaign's calling hours and days."""
+    campaign = db.voice_campaigns.get(campaign_tracker.campaign_of(request.call_id))
+    if campaign is None:
+        return when
+    hours = campaign["calling_hours"]
+    return plan_call_times(
+        1, datetime.fromtimestamp(when, timezone.utc), campaign["spacing_seconds"],
+        (hours["start"], hours["end"]), campaign["calling_days"],
+    )[0].timestamp()
+
+voice_dialer.on_dial = mark_call_dialing
+voice_dialer.retry_time = campaign_retry_time
+voice_dialer.backend.on_message = stream_call_message
+
+def persist_conversation_messages(records: List[Dict[str, Any]]):
+    """Store a coalesced batch of live call messages: one change per call, not per message."""
+    counts: Dict[str, int] = {}
+    for record in records:
+        db.conversations[record["id"]] = record
+        call_search_index.set_source(record["call_id"], f"message:{record['id']}", record["message"])
+        counts[record["call_id"]] = counts.get(record["call_id"], 0) + 1
+    for call_id, count in counts.items():
+        record_change("conversations", "create", call_id, {"call_id": call_id, "messages": count})
+    sentiment_stage.submit(records)
+
+transcript_hub.persist = persist_conversation_messages
+
+def apply_message_sentiment(records: List[Dict[str, Any]], results: List[Tuple[str, float]]):
+    """Store scored message sentiment and roll the convert's lines up into their calls and converts."""
+    message_ids, call_ids, convert_ids = [], set(), set()
+    for record, (label, score) in zip(records, results):
+        message = db.conversations.get(record["id"])
+        if message is None:
+            continue
+        message.update(sentiment=label, sentiment_score=score)
+        message_ids.append(record["id"])
+        call = db.voice_calls.get(record["call_id"])
+        # Agent lines are scripted; only the convert's own words say how they are doing
+        if record["speaker"] != "convert" or call is None:
+            continue
+        sentiment_rollup.add(call["id"], call["convert_id"], score)
+        call_ids.add(call["id"])
+        if call["convert_id"] in db.converts:
+            convert_ids.add(call["convert_id"])
+    
+    for call_id in call_ids:
+        summary = sentiment_rollup.call(call_id)
+        db.voice_calls[call_id].update(sentiment=summary["sentiment"], sentiment_score=summary["sentiment_score"])
+    for convert_id in convert_ids:
+        db.converts[convert_id]["sentiment_score"] = sentiment_rollup.convert(convert_id)["sentiment_score"]
+    if message_ids:
+        record_changes("conversations", "update", message_ids)
+    if call_ids:
+        record_changes("voice_calls", "update", list(call_ids))
+    if convert_ids:
+        record_changes("converts", "update", list(convert_ids))
+        # Call sentiment feeds engagement_level
+        rescore_converts(convert_ids)
+
+sentiment_stage.on_scored = apply_message_sentiment
+
+def call_conversation(call_id: str) -> List[Dict[str, Any]]:
+    conversation = [msg for msg in db.conversations.values() if msg["call_id"] == call_id]
+    conversation.sort(key=lambda x: x["timestamp"])
+    return conversation
+voice_dialer.on_result = record_call_result
+
+@api_router.get("/voice-agent/dialer")
+async def voice_dialer_stats(current_user: User = Depends(get_current_user)):
+    """Dialer queue depth, line utilization and call outcome counts."""
+    return voice_dialer.report()
+
 @api_router.get("/voice-agent/config")
 async def get_voice_agent_config(current_user: User = Depends(get_current_user)):
     """Get the voice agent configuration."""
@@ -1015,21 +2468,32 @@ async def update_voice_agent_config(
     current_user: User = Depends(get_current_user)
 ):
     """Update voice agent configuration."""
+    for field in AGENT_TEMPLATE_FIELDS:
+        if config.get(field) is not None:
+            check_template(config[field], field)
     if db.voice_agents:
         agent_id = list(db.voice_agents.keys())[0]
+        template_cache.invalidate(f"agent:{agent_id}")
         db.voice_agents[agent_id].update(config)
         db.voice_agents[agent_id]["updated_at"] = datetime.now(timezone.utc).isoformat()
+        record_change("voice_agents", "update", agent_id, config)
         return db.voice_agents[agent_id]
     else:
         agent_id = str(uuid.uuid4())
         config["id"] = agent_id
         config["created_at"] = datetime.now(timezone.utc).isoformat()
         db.voice_agents[agent_id] = config
+        record_change("voice_agents", "create", agent_id, config)
         return config
 
 @api_router.get("/voice-agent/scripts")
-async def list_call_scripts(current_user: User = Depends(get_current_user)):
-    """List all call scripts."""
+async def list_call_scripts(since: Optional[str] = None, current_user: User = Depends(get_current_user)):
+    """List all call scripts (or, with ?since=, only what changed)."""
+    if since is not None:
+        return delta_sync(
+            "call_scripts", since,
+            lambda records: list(db.call_scripts.values() if records is None else records),
+        )
     return list(db.call_scripts.values())
 
 @api_router.post("/voice-agent/scripts", status_code=201)
@@ -1037,18 +2501,22 @@ async def create_call_script(
     data: Dict[str, Any],
     current_user: User = Depends(get_current_user)
 ):
-    """Create a new call script."""
+    """Create a new call script; placeholders in content are checked here rather than per call."""
+    if data.get("content") is not None:
+        check_template(data["content"], "content")
     script_id = str(uuid.uuid4())
     script = {
         "id": script_id,
         "name": data.get("name"),
         "content": data.get("content"),
         "purpose": data.get("purpose", "general"),
+        "version": 1,
         "is_active": data.get("is_active", True),
         "created_at": datetime.now(timezone.utc).isoformat(),
         "updated_at": datetime.now(timezone.utc).isoformat(),
     }
     db.call_scripts[script_id] = script
+    record_change("call_scripts", "create", script_id, script)
     return script
 
 @api_router.put("/voice-agent/scripts/{script_id}")
@@ -1060,10 +2528,17 @@ async def update_call_script(
     """Update a call script."""
     if script_id not in db.call_scripts:
         raise HTTPException(status_code=404, detail="Script not found")
-    
-    db.call_scripts[script_id].update(data)
-    db.call_scripts[script_id]["updated_at"] = datetime.now(timezone.utc).isoformat()
-    return db.call_scripts[script_id]
+    if data.get("content") is not None:
+        check_template(data["content"], "content")
+    
+    data = {key: value for key, value in data.items() if key not in ("id", "version")}
+    script = db.call_scripts[script_id]
+    script.update(data)
+    script["version"] = script.get("version", 1) + 1
+    script["updated_at"] = datetime.now(timezone.utc).isoformat()
+    template_cache.invalidate(script_id)
+    record_change("call_scripts", "update", script_id, dict(data, version=script["version"], updated_at=script["updated_at"]))
+    return script
 
 @api_router.delete("/voice-agent/scripts/{script_id}", status_code=204)
 async def delete_call_script(
@@ -1073,22 +2548,55 @@ async def delete_call_script(
     """Delete a call script."""
     if script_id in db.call_scripts:
         del db.call_scripts[script_id]
+        template_cache.invalidate(script_id)
+        record_change("call_scripts", "delete", script_id)
     return None
 
-@api_router.get("/voice-agent/calls")
-async def list_voice_calls(
-    status: Optional[str] = None,
-    convert_id: Optional[str] = None,
+@api_router.post("/voice-agent/scripts/{script_id}/render")
+async def render_call_script(
+    script_id: str,
+    data: Dict[str, Any],
     current_user: User = Depends(get_current_user)
 ):
-    """List all voice calls with optional filtering."""
-    calls = list(db.voice_calls.values())
-    
-    if status:
-        calls = [c for c in calls if c["status"] == status]
-    
-    if convert_id:
-        calls = [c for c in calls if c["convert_id"] == convert_id]
+    """Render a script and the agent greeting for a batch of converts."""
+    if script_id not in db.call_scripts:
+        raise HTTPException(status_code=404, detail="Script not found")
+    convert_ids = data.get("convert_ids")
+    if not isinstance(convert_ids, list) or not convert_ids:
+        raise HTTPException(status_code=400, detail="convert_ids must be a non-empty list")
+    if len(convert_ids) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ITEMS} converts per request")
+    missing = [convert_id for convert_id in convert_ids if convert_id not in db.converts]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Converts not found: {', '.join(missing[:10])}")
+    
+    texts = render_call_texts(convert_ids, script_id)
+    return {
+        "script_id": script_id,
+        "version": db.call_scripts[script_id].get("version", 1),
+        "renders": [dict(text, convert_id=convert_id) for convert_id, text in zip(convert_ids, texts)],
+    }
+
+def iter_voice_calls(
+    status: Optional[str] = None,
+    convert_id: Optional[str] = None,
+    records: Optional[Iterable[Dict[str, Any]]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Voice calls matching the list endpoint's filters (among records, if given), lazily."""
+    for c in (db.voice_calls.values() if records is None else records):
+        if status and c["status"] != status:
+            continue
+        if convert_id and c["convert_id"] != convert_id:
+            continue
+        yield c
+
+def query_voice_calls(
+    status: Optional[str] = None,
+    convert_id: Optional[str] = None,
+    records: Optional[Iterable[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Voice calls matching the list endpoint's filters (among records, if given), with convert info added."""
+    calls = list(iter_voice_calls(status, convert_id, records))
     
     # Add convert info
     for call in calls:
@@ -1098,6 +2606,105 @@ async def list_voice_calls(
     
     return calls
 
+@api_router.get("/voice-agent/calls")
+async def list_voice_calls(
+    request: Request,
+    status: Optional[str] = None,
+    convert_id: Optional[str] = None,
+    fields: Optional[str] = None,
+    since: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+):
+    """List all voice calls with optional filtering."""
+    projection = parse_fields(VOICE_CALL_FIELDS, fields)
+    if since is not None:
+        return response_cache.respond(
+            request,
+            db.generation("voice_calls", "converts") + (db.change_seq,),
+            lambda: delta_sync(
+                "voice_calls", since,
+                lambda records: query_voice_calls(status, convert_id, records),
+                VOICE_CALL_FIELDS, projection,
+            ),
+        )
+    
+    response = response_cache.respond(
+        request,
+        db.generation("voice_calls", "converts"),
+        lambda: VOICE_CALL_FIELDS.project_all(query_voice_calls(status, convert_id), projection),
+    )
+    response.headers["X-Sync-Token"] = sync_token()
+    return response
+
+@api_router.get("/voice-agent/calls/export")
+async def export_voice_calls(
+    status: Optional[str] = None,
+    convert_id: Optional[str] = None,
+    fields: Optional[str] = None,
+    file_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream voice calls matching the list filters, with convert info, as NDJSON or CSV."""
+    projection = parse_fields(VOICE_CALL_FIELDS, fields)
+    
+    def with_convert_info(calls: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for call in calls:
+            convert = db.converts.get(call["convert_id"], {})
+            yield dict(
+                call,
+                convert_name=f"{convert.get('first_name', '')} {convert.get('last_name', '')}",
+                convert_phone=convert.get("phone"),
+            )
+    
+    records = with_convert_info(iter_voice_calls(status, convert_id, list(db.voice_calls.values())))
+    return export_response(records, file_format, VOICE_CALL_EXPORT_COLUMNS, projection, "voice_calls")
+
+def search_snippets(call: Dict[str, Any], terms: Iterable[str], limit: int = 3) -> List[Dict[str, Any]]:
+    """Where a call matched: up to limit excerpts of its transcript, notes and messages."""
+    snippets = []
+    for source in call_search_index.sources_with(call["id"], terms)[:limit]:
+        if source.startswith("message:"):
+            msg = db.conversations.get(source[len("message:"):])
+            if msg is not None:
+                snippets.append({"source": "message", "speaker": msg["speaker"], "timestamp": msg["timestamp"],
+                                 "text": snippet(msg["message"], terms)})
+        elif call.get(source):
+            snippets.append({"source": source, "text": snippet(call[source], terms)})
+    return snippets
+
+@api_router.get("/voice-agent/calls/search")
+async def search_voice_calls(
+    q: str = Query(..., min_length=1, max_length=200),
+    match: str = Query("all", pattern="^(all|any)$"),
+    status: Optional[str] = None,
+    fields: Optional[str] = "summary",
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    current_user: User = Depends(get_current_user)
+):
+    """Search call transcripts, notes and conversation messages, best match first.
+    
+    Words are matched whole ("job" does not find "jobs"); end one with * to
+    match by prefix ("bapt*"). With match=any a call needs only one of the
+    words, ranked higher the more it has.
+    """
+    projection = parse_fields(VOICE_CALL_FIELDS, fields)
+    candidates = {c["id"] for c in iter_voice_calls(status)} if status else None
+    scores, matched = call_search_index.search(q, match_all=(match == "all"), candidates=candidates)
+    ranked = heapq.nsmallest(offset + limit, scores, key=lambda call_id: (-scores[call_id], call_id))[offset:]
+    
+    results = []
+    for call_id, call in zip(ranked, query_voice_calls(records=[db.voice_calls[call_id] for call_id in ranked])):
+        result = VOICE_CALL_FIELDS.project(call, projection)
+        result = dict(
+            result,
+            score=round(scores[call_id], 3),
+            matched_terms=sorted(matched[call_id]),
+            snippets=search_snippets(call, matched[call_id]),
+        )
+        results.append(result)
+    return {"query": q, "total": len(scores), "offset": offset, "limit": limit, "results": results}
+
 @api_router.get("/voice-agent/calls/{call_id}")
 async def get_voice_call(
     call_id: str,
@@ -1111,21 +2718,89 @@ async def get_voice_call(
     convert = db.converts.get(call["convert_id"], {})
     call["convert"] = convert
     
-    # Get conversation
-    conversation = [
-        msg for msg in db.conversations.values() if msg["call_id"] == call_id
-    ]
-    conversation.sort(key=lambda x: x["timestamp"])
-    call["conversation"] = conversation
+    call["conversation"] = call_conversation(call_id)
     
     return call
 
+@api_router.post("/voice-agent/calls/{call_id}/messages", status_code=202)
+async def append_call_message(
+    call_id: str,
+    data: Dict[str, Any],
+    current_user: User = Depends(get_current_user)
+):
+    """Append one message to a call in progress; it is written and streamed with the next flush."""
+    if call_id not in db.voice_calls:
+        raise HTTPException(status_code=404, detail="Call not found")
+    if db.voice_calls[call_id]["status"] != VoiceCallStatus.IN_PROGRESS.value:
+        raise HTTPException(status_code=409, detail="Call is not in progress")
+    if data.get("speaker") not in ("agent", "convert"):
+        raise HTTPException(status_code=400, detail="speaker must be 'agent' or 'convert'")
+    if not isinstance(data.get("message"), str) or not data["message"].strip():
+        raise HTTPException(status_code=400, detail="message is required")
+    
+    return transcript_hub.append(call_id, data["speaker"], data["message"], sentiment=data.get("sentiment"))
+
+@api_router.websocket("/voice-agent/calls/{call_id}/live")
+async def watch_voice_call(websocket: WebSocket, call_id: str, token: str = ""):
+    """Stream a call's conversation messages as they are written.
+    
+    Browsers can't set headers on a WebSocket, so the bearer token comes as
+    ?token=. Frames are JSON: "ready", "messages" (a batch), "ping" and a
+    final "ended"; a call that is not live is replayed and closed.
+    """
+    if user_from_token(token) is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Invalid authentication credentials")
+        return
+    if call_id not in db.voice_calls:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Call not found")
+        return
+    
+    await websocket.accept()
+    frames = transcript_hub.watch(call_id, lambda: call_conversation(call_id))
+    try:
+        # Each frame is sent before the next is read, so a slow socket only delays itself
+        async for frame in frames:
+            await websocket.send_json(frame)
+        await websocket.close()
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        await frames.aclose()
+
+@api_router.get("/voice-agent/live")
+async def live_voice_calls(current_user: User = Depends(get_current_user)):
+    """Calls in progress with their message and watcher counts, and transcript write stats."""
+    return transcript_hub.report()
+
+@api_router.get("/voice-agent/sentiment")
+async def voice_sentiment_stats(current_user: User = Depends(get_current_user)):
+    """Sentiment scoring stage progress, and how many calls and converts sound positive, neutral or negative."""
+    labels = ("positive", "neutral", "negative")
+    calls = {label: 0 for label in labels}
+    for call_id in sentiment_rollup.calls:
+        calls[sentiment_rollup.call(call_id)["sentiment"]] += 1
+    converts = {label: 0 for label in labels}
+    for convert_id in sentiment_rollup.converts:
+        converts[sentiment_rollup.convert(convert_id)["sentiment"]] += 1
+    return {"stage": sentiment_stage.report(), "calls": calls, "converts": converts}
+
 @api_router.post("/voice-agent/calls", status_code=201)
 async def schedule_voice_call(
     data: Dict[str, Any],
     current_user: User = Depends(get_current_user)
 ):
-    """Schedule a new voice call."""
+    """Schedule a new voice call; the dialer places it at scheduled_time (now if not given)."""
+    convert_id = data.get("convert_id")
+    if convert_id not in db.converts:
+        raise HTTPException(status_code=404, detail="Convert not found")
+    pending = voice_dialer.pending_for(convert_id)
+    if pending is not None:
+        raise HTTPException(status_code=409, detail=f"Convert already has call {pending.call_id} pending")
+    try:
+        due = scheduled_epoch(data.get("scheduled_time"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="scheduled_time must be an ISO 8601 timestamp")
+    
     call_id = str(uuid.uuid4())
     
     # Get agent
@@ -1133,17 +2808,24 @@ async def schedule_voice_call(
     
     call = {
         "id": call_id,
-        "convert_id": data.get("convert_id"),
+        "convert_id": convert_id,
         "agent_id": agent_id,
         "status": VoiceCallStatus.SCHEDULED.value,
         "scheduled_time": data.get("scheduled_time"),
         "script_id": data.get("script_id"),
+        **render_call_texts([convert_id], data.get("script_id"))[0],
         "notes": data.get("notes"),
         "created_at": datetime.now(timezone.utc).isoformat(),
         "updated_at": datetime.now(timezone.utc).isoformat(),
     }
     
     db.voice_calls[call_id] = call
+    record_change("voice_calls", "create", call_id, {
+        "convert_id": call["convert_id"],
+        "status": call["status"],
+        "scheduled_time": call["scheduled_time"],
+    })
+    voice_dialer.enqueue(call_id, convert_id, db.converts[convert_id].get("phone"), due)
     
     # Add convert info to response
     convert = db.converts.get(call["convert_id"], {})
@@ -1157,13 +2839,21 @@ async def start_voice_call(
     call_id: str,
     current_user: User = Depends(get_current_user)
 ):
-    """Mark a voice call as started."""
+    """Mark a voice call as started; it is taken off the dialer queue."""
     if call_id not in db.voice_calls:
         raise HTTPException(status_code=404, detail="Call not found")
+    voice_dialer.cancel(call_id)
+    previous = db.voice_calls[call_id]["status"]
     
     db.voice_calls[call_id]["status"] = VoiceCallStatus.IN_PROGRESS.value
     db.voice_calls[call_id]["started_at"] = datetime.now(timezone.utc).isoformat()
     db.voice_calls[call_id]["updated_at"] = datetime.now(timezone.utc).isoformat()
+    record_change("voice_calls", "update", call_id, {
+        "status": VoiceCallStatus.IN_PROGRESS.value,
+        "started_at": db.voice_calls[call_id]["started_at"],
+    })
+    advance_campaign(db.voice_calls[call_id], previous)
+    transcript_hub.open(call_id)
     
     return db.voice_calls[call_id]
 
@@ -1177,9 +2867,11 @@ async def complete_voice_call(
     if call_id not in db.voice_calls:
         raise HTTPException(status_code=404, detail="Call not found")
     
-    started_at = datetime.fromisoformat(db.voice_calls[call_id]["started_at"])
+    previous = db.voice_calls[call_id]["status"]
+    started_at = db.voice_calls[call_id].get("started_at")
     ended_at = datetime.now(timezone.utc)
-    duration = int((ended_at - started_at).total_seconds())
+    # A queued call completed by hand was never started
+    duration = int((ended_at - datetime.fromisoformat(started_at)).total_seconds()) if started_at else 0
     
     db.voice_calls[call_id].update({
         "status": VoiceCallStatus.COMPLETED.value,
@@ -1190,13 +2882,31 @@ async def complete_voice_call(
         "outcome": data.get("outcome"),
         "updated_at": ended_at.isoformat(),
     })
+    record_change("voice_calls", "update", call_id, {
+        "status": VoiceCallStatus.COMPLETED.value,
+        "ended_at": ended_at.isoformat(),
+        "duration_seconds": duration,
+        "outcome": data.get("outcome"),
+    })
+    voice_dialer.cancel(call_id)
+    advance_campaign(db.voice_calls[call_id], previous)
+    transcript_hub.end(call_id, VoiceCallStatus.COMPLETED.value)
     
-    # Update convert stage if interested
-    if data.get("outcome") == "interested":
-        convert_id = db.voice_calls[call_id]["convert_id"]
-        if convert_id in db.converts:
-            db.converts[convert_id]["stage"] = ConvertStage.IN_FOLLOWUP.value
-            db.converts[convert_id]["updated_at"] = ended_at.isoformat()
+    convert_id = db.voice_calls[call_id]["convert_id"]
+    if convert_id in db.converts:
+        # Update convert stage if interested
+        if data.get("outcome") == "interested":
+            db.converts[convert_id].update({
+                "stage": ConvertStage.IN_FOLLOWUP.value,
+                "stage_updated_at": ended_at.isoformat(),
+                "updated_at": ended_at.isoformat(),
+            })
+            record_change("converts", "update", convert_id, {
+                "stage": ConvertStage.IN_FOLLOWUP.value,
+                "updated_at": ended_at.isoformat(),
+            })
+        rescore_converts([convert_id])
+        evaluate_alert_rules("converts", [convert_id])
     
     return db.voice_calls[call_id]
 
@@ -1208,18 +2918,23 @@ async def simulate_voice_call(
     """Simulate a complete voice call (for demo purposes)."""
     if call_id not in db.voice_calls:
         raise HTTPException(status_code=404, detail="Call not found")
+    voice_dialer.cancel(call_id)
     
     call = db.voice_calls[call_id]
     convert = db.converts.get(call["convert_id"], {})
+    previous = call["status"]
     
     # Simulate call duration (2-10 minutes)
     duration = random.randint(120, 600)
     now = datetime.now(timezone.utc)
     started_at = now - timedelta(seconds=duration)
     
-    # Simulate conversation
+    # Simulate conversation, opening with the call's personalized greeting
+    greeting = call.get("greeting")
+    if greeting is None and call["convert_id"] in db.converts:
+        greeting = render_call_texts([call["convert_id"]], call.get("script_id"))[0]["greeting"]
     conversation = [
-        {"speaker": "agent", "message": f"Hello, may I speak with {convert.get('first_name', 'there')}?", "delay": 2},
+        {"speaker": "agent", "message": greeting or f"Hello, may I speak with {convert.get('first_name', 'there')}?", "delay": 2},
         {"speaker": "convert", "message": "Yes, speaking. Who is this?", "delay": 3},
         {"speaker": "agent", "message": "This is Dependify Gospel Centre. We wanted to check on you and invite you to our service this Sunday.", "delay": 8},
         {"speaker": "convert", "message": "Oh, thank you for calling! I've been meaning to come back.", "delay": 5},
@@ -1229,19 +2944,12 @@ async def simulate_voice_call(
         {"speaker": "convert", "message": "You too. Bye!", "delay": 2},
     ]
     
-    # Save conversation
+    # Save conversation through the live transcript writer, so watchers see it too
     current_time = started_at
+    transcript_hub.open(call_id)
     for msg in conversation:
         current_time += timedelta(seconds=msg["delay"])
-        msg_id = str(uuid.uuid4())
-        db.conversations[msg_id] = {
-            "id": msg_id,
-            "call_id": call_id,
-            "speaker": msg["speaker"],
-            "message": msg["message"],
-            "timestamp": current_time.isoformat(),
-            "sentiment": "positive" if msg["speaker"] == "convert" else None,
-        }
+        transcript_hub.append(call_id, msg["speaker"], msg["message"], current_time.isoformat())
     
     # Update call
     transcript = " ".join([msg["message"] for msg in conversation])
@@ -1255,11 +2963,30 @@ async def simulate_voice_call(
         "notes": "Convert expressed interest in attending Sunday service",
         "updated_at": now.isoformat(),
     })
+    record_change("voice_calls", "update", call_id, {
+        "status": VoiceCallStatus.COMPLETED.value,
+        "ended_at": now.isoformat(),
+        "duration_seconds": duration,
+        "outcome": "interested",
+    })
+    advance_campaign(db.voice_calls[call_id], previous)
+    transcript_hub.end(call_id, VoiceCallStatus.COMPLETED.value)
+    await transcript_hub.flush()
+    await sentiment_stage.process()
     
     # Update convert stage
     if call["convert_id"] in db.converts:
-        db.converts[call["convert_id"]]["stage"] = ConvertStage.IN_FOLLOWUP.value
-        db.converts[call["convert_id"]]["updated_at"] = now.isoformat()
+        db.converts[call["convert_id"]].update({
+            "stage": ConvertStage.IN_FOLLOWUP.value,
+            "stage_updated_at": now.isoformat(),
+            "updated_at": now.isoformat(),
+        })
+        record_change("converts", "update", call["convert_id"], {
+            "stage": ConvertStage.IN_FOLLOWUP.value,
+            "updated_at": now.isoformat(),
+        })
+        rescore_converts([call["convert_id"]])
+        evaluate_alert_rules("converts", [call["convert_id"]])
     
     return {
         "call": db.voice_calls[call_id],
@@ -1267,20 +2994,23 @@ async def simulate_voice_call(
         "summary": {
             "duration_minutes": round(duration / 60, 1),
             "outcome": "interested",
-            "sentiment": "positive",
+            "sentiment": db.voice_calls[call_id].get("sentiment"),
+            "sentiment_score": db.voice_calls[call_id].get("sentiment_score"),
         }
     }
 
 @api_router.post("/voice-agent/make-call")
 async def make_voice_call(
     data: Dict[str, Any],
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user)
 ):
-    """Initiate an immediate voice call to a convert."""
+    """Queue a voice call to a convert for the next free dialer line."""
     convert_id = data.get("convert_id")
     if convert_id not in db.converts:
         raise HTTPException(status_code=404, detail="Convert not found")
+    pending = voice_dialer.pending_for(convert_id)
+    if pending is not None:
+        raise HTTPException(status_code=409, detail=f"Convert already has call {pending.call_id} pending")
     
     convert = db.converts[convert_id]
     
@@ -1297,56 +3027,184 @@ async def make_voice_call(
         "status": VoiceCallStatus.SCHEDULED.value,
         "scheduled_time": now.isoformat(),
         "script_id": data.get("script_id"),
+        **render_call_texts([convert_id], data.get("script_id"))[0],
         "notes": data.get("notes"),
         "created_at": now.isoformat(),
         "updated_at": now.isoformat(),
     }
     
     db.voice_calls[call_id] = call
+    record_change("voice_calls", "create", call_id, {
+        "convert_id": convert_id,
+        "status": call["status"],
+        "scheduled_time": call["scheduled_time"],
+    })
     
-    # Simulate the call in background
-    background_tasks.add_task(simulate_call_async, call_id)
+    voice_dialer.enqueue(call_id, convert_id, convert.get("phone"))
     
     return {
-        "message": "Voice call initiated",
+        "message": "Voice call queued",
         "call_id": call_id,
         "convert_name": f"{convert['first_name']} {convert['last_name']}",
         "phone": convert["phone"],
         "status": "scheduled",
+        "queue_depth": voice_dialer.report()["queue_depth"],
     }
 
-async def simulate_call_async(call_id: str):
-    """Simulate a call asynchronously."""
-    import asyncio
-    
-    # Wait a moment then mark as completed
-    await asyncio.sleep(5)
+# Segment filter fields a campaign can target
+CAMPAIGN_SEGMENT_FIELDS = {"stage", "min_health_score", "max_health_score", "assigned_worker_id", "last_call_outcome"}
+
+def validate_segment(segment: Any) -> Dict[str, Any]:
+    if not isinstance(segment, dict):
+        raise HTTPException(status_code=400, detail="segment must be an object")
+    unknown = set(segment) - CAMPAIGN_SEGMENT_FIELDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown segment fields: {', '.join(sorted(unknown))}")
+    stages = segment.get("stage")
+    stage_values = {stage.value for stage in ConvertStage}
+    if stages is not None and not set(stages if isinstance(stages, list) else [stages]) <= stage_values:
+        raise HTTPException(status_code=400, detail=f"stage must be one of: {', '.join(sorted(stage_values))}")
+    for field in ("min_health_score", "max_health_score"):
+        value = segment.get(field)
+        if value is not None and (not isinstance(value, (int, float)) or not 0 <= value <= 100):
+            raise HTTPException(status_code=400, detail=f"{field} must be a number from 0 to 100")
+    return segment
+
+def segment_converts(segment: Dict[str, Any]) -> List[str]:
+    """Convert ids in a segment, most at risk (lowest health score) first."""
+    convert_ids = [convert_id for convert_id in segment_index.resolve(segment) if convert_id in db.converts]
+    convert_ids.sort(key=lambda convert_id: (segment_index.score_of(convert_id) is None, segment_index.score_of(convert_id) or 0))
+    return convert_ids
+
+def campaign_summary(campaign: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in campaign.items() if key != "call_ids"}
+
+@api_router.post("/voice-agent/campaigns/preview")
+async def preview_voice_campaign(data: Dict[str, Any], current_user: User = Depends(get_current_user)):
+    """How many converts a segment ({"segment": {...}}) reaches, with a sample."""
+    convert_ids = segment_converts(validate_segment(data.get("segment") or {}))
+    pending = sum(1 for convert_id in convert_ids if voice_dialer.pending_for(convert_id) is not None)
+    return {
+        "matched": len(convert_ids),
+        "already_pending": pending,
+        "sample": [
+            {key: db.converts[convert_id].get(key) for key in ("id", "first_name", "last_name", "stage", "health_score")}
+            for convert_id in convert_ids[:10]
+        ],
+    }
+
+@api_router.post("/voice-agent/campaigns", status_code=201)
+async def create_voice_campaign(data: Dict[str, Any], current_user: User = Depends(get_current_user)):
+    """Schedule calls to every convert in a segment in one batch.
+    
+    Calls go out lowest health score first, spacing_seconds apart, inside the
+    calling_hours ({"start": 9, "end": 18}, local time) of calling_days
+    (0 = Monday ... 6 = Sunday); redials of unanswered calls stay inside them
+    too. Converts with a call already pending are skipped, as are calls that
+    would start after deadline.
+    """
+    name = data.get("name")
+    if not isinstance(name, str) or not name.strip():
+        raise HTTPException(status_code=400, detail="name is required")
+    segment = validate_segment(data.get("segment") or {})
+    script_id = data.get("script_id")
+    if script_id is not None and script_id not in db.call_scripts:
+        raise HTTPException(status_code=404, detail="Script not found")
+    hours = data.get("calling_hours") or {}
+    try:
+        start_at = scheduled_epoch(data.get("start_at"))
+        deadline = scheduled_epoch(data.get("deadline"))
+        calling_hours = (int(hours.get("start", CALLING_HOURS[0])), int(hours.get("end", CALLING_HOURS[1])))
+        calling_days = [int(day) for day in data.get("calling_days", CALLING_DAYS)]
+        spacing = float(data.get("spacing_seconds", CAMPAIGN_SPACING))
+    except (TypeError, ValueError, OverflowError):
+        raise HTTPException(status_code=400, detail="Invalid start_at, deadline, calling_hours, calling_days or spacing_seconds")
     
-    if call_id in db.voice_calls:
-        call = db.voice_calls[call_id]
-        convert = db.converts.get(call["convert_id"], {})
-        
-        now = datetime.now(timezone.utc)
-        duration = random.randint(120, 600)
-        
-        db.voice_calls[call_id].update({
-            "status": VoiceCallStatus.COMPLETED.value,
-            "started_at": (now - timedelta(seconds=duration)).isoformat(),
-            "ended_at": now.isoformat(),
-            "duration_seconds": duration,
-            "transcript": f"Simulated call with {convert.get('first_name', 'convert')}. Positive response received.",
-            "outcome": "interested",
-            "updated_at": now.isoformat(),
-        })
-        
-        logger.info(f"Voice call {call_id} completed")
+    now = datetime.now(timezone.utc)
+    start = datetime.fromtimestamp(start_at, timezone.utc) if start_at is not None else now
+    convert_ids = segment_converts(segment)
+    targets = [convert_id for convert_id in convert_ids if voice_dialer.pending_for(convert_id) is None]
+    try:
+        times = plan_call_times(
+            len(targets), max(start, now), spacing, calling_hours, calling_days,
+            datetime.fromtimestamp(deadline, timezone.utc) if deadline is not None else None,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    campaign_id = str(uuid.uuid4())
+    agent_id = next(iter(db.voice_agents), None)
+    created_at = now.isoformat()
+    call_ids = []
+    texts = render_call_texts(targets[:len(times)], script_id)
+    for convert_id, when, text in zip(targets, times, texts):
+        call_id = str(uuid.uuid4())
+        db.voice_calls[call_id] = {
+            "id": call_id,
+            "convert_id": convert_id,
+            "agent_id": agent_id,
+            "campaign_id": campaign_id,
+            "status": VoiceCallStatus.SCHEDULED.value,
+            "scheduled_time": when.isoformat(),
+            "script_id": script_id,
+            **text,
+            "notes": None,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+        call_ids.append(call_id)
+    
+    campaign = {
+        "id": campaign_id,
+        "name": name.strip(),
+        "segment": segment,
+        "script_id": script_id,
+        "status": "scheduled" if call_ids else "completed",
+        "calling_hours": {"start": calling_hours[0], "end": calling_hours[1]},
+        "calling_days": calling_days,
+        "spacing_seconds": spacing,
+        "matched": len(convert_ids),
+        "skipped_pending": len(convert_ids) - len(targets),
+        "skipped_after_deadline": len(targets) - len(call_ids),
+        "total_calls": len(call_ids),
+        "first_call_at": times[0].isoformat() if times else None,
+        "last_call_at": times[len(call_ids) - 1].isoformat() if call_ids else None,
+        "progress": {status: 0 for status in PROGRESS_STATUSES},
+        "outcomes": {},
+        "completion_rate": 0.0 if call_ids else 100.0,
+        "answer_rate": 0.0,
+        "call_ids": call_ids,
+        "created_by": current_user.id,
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+    campaign["progress"]["scheduled"] = len(call_ids)
+    db.voice_campaigns[campaign_id] = campaign
+    campaign_tracker.add(campaign, call_ids)
+    record_change("voice_campaigns", "create", campaign_id, campaign_summary(campaign))
+    if call_ids:
+        record_changes("voice_calls", "create", call_ids)
+        for call_id, convert_id, when in zip(call_ids, targets, times):
+            voice_dialer.enqueue(call_id, convert_id, db.converts[convert_id].get("phone"), when.timestamp())
+    
+    return campaign_summary(campaign)
+
+@api_router.get("/voice-agent/campaigns")
+async def list_voice_campaigns(current_user: User = Depends(get_current_user)):
+    campaigns = sorted(db.voice_campaigns.values(), key=lambda campaign: campaign["created_at"], reverse=True)
+    return [campaign_summary(campaign) for campaign in campaigns]
+
+@api_router.get("/voice-agent/campaigns/{campaign_id}")
+async def get_voice_campaign(campaign_id: str, current_user: User = Depends(get_current_user)):
+    if campaign_id not in db.voice_campaigns:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return db.voice_campaigns[campaign_id]
 
 # -----------------------------------------------------------------------------
 # ANALYTICS ROUTES
 # -----------------------------------------------------------------------------
 
-@api_router.get("/analytics/converts")
-async def get_convert_analytics(current_user: User = Depends(get_current_user)):
+def compute_convert_analytics() -> Dict[str, Any]:
     """Get convert analytics."""
     converts = list(db.converts.values())
     
@@ -1387,35 +3245,119 @@ async def get_convert_analytics(current_user: User = Depends(get_current_user)):
         "health_distribution": health_dist,
     }
 
+@api_router.get("/analytics/converts")
+async def get_convert_analytics(request: Request, current_user: User = Depends(get_current_user)):
+    """Get convert analytics."""
+    return response_cache.respond(
+        request,
+        db.generation("converts"),
+        compute_convert_analytics,
+    )
+
 @api_router.get("/analytics/voice-calls")
-async def get_voice_call_analytics(current_user: User = Depends(get_current_user)):
-    """Get voice call analytics."""
-    calls = list(db.voice_calls.values())
-    
-    total_calls = len(calls)
-    completed = len([c for c in calls if c["status"] == "completed"])
-    failed = len([c for c in calls if c["status"] == "failed"])
-    no_answer = len([c for c in calls if c["status"] == "no_answer"])
-    
-    avg_duration = 0
-    durations = [c.get("duration_seconds", 0) for c in calls if c.get("duration_seconds")]
-    if durations:
-        avg_duration = sum(durations) / len(durations)
-    
-    outcomes = {}
-    for call in calls:
-        outcome = call.get("outcome", "unknown")
-        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+async def get_voice_call_analytics(
+    request: Request,
+    days: int = Query(30, ge=1, le=366),
+    current_user: User = Depends(get_current_user)
+):
+    """Voice call totals, outcomes and duration percentiles, overall and per day, agent and script.
+    
+    The figures are kept up to date as calls change, so this never scans
+    the calls; by_day covers the latest days days with calls.
+    """
+    return response_cache.respond(
+        request,
+        db.generation("voice_calls"),
+        lambda: call_analytics.report(days),
+    )
+
+@api_router.get("/analytics/voice-calls/state")
+async def get_voice_call_analytics_state(current_user: User = Depends(get_current_user)):
+    """This process's mergeable voice call rollups and sketches, for combining across workers."""
+    return call_analytics.to_dict()
+
+# Columnar tables for the data team's notebooks; enum columns are dictionary-encoded
+ANALYTICS_TABLES = {
+    "converts": (
+        Column("id"), Column("first_name"), Column("last_name"), Column("phone"), Column("email"),
+        Column("gender"), Column("city"), Column("state"), Column("occupation"),
+        Column("source", enum=ConvertSource), Column("stage", enum=ConvertStage),
+        Column("assigned_worker_id"), Column("health_score", "int"),
+        Column("created_at", "timestamp"), Column("updated_at", "timestamp"),
+    ),
+    "health_scores": (
+        Column("convert_id"), Column("score", "int"),
+        *(Column(factor, "int", path=("factors", factor)) for factor in (
+            "attendance_rate", "engagement_level", "response_time", "spiritual_growth", "social_connection",
+        )),
+        Column("calculated_at", "timestamp"),
+    ),
+    "voice_calls": (
+        Column("id"), Column("convert_id"), Column("agent_id"), Column("script_id"),
+        Column("status", enum=VoiceCallStatus), Column("outcome"), Column("duration_seconds", "int"),
+        Column("scheduled_time", "timestamp"), Column("started_at", "timestamp"),
+        Column("ended_at", "timestamp"), Column("created_at", "timestamp"),
+    ),
+    "alerts": (
+        Column("id"), Column("convert_id"), Column("type"), Column("severity", enum=AlertSeverity),
+        Column("status", enum=AlertStatus), Column("assigned_to"),
+        Column("created_at", "timestamp"), Column("updated_at", "timestamp"),
+    ),
+    "followup_records": (
+        Column("id"), Column("convert_id"), Column("worker_id"), Column("type"), Column("status"),
+        Column("scheduled_date", "timestamp"), Column("completed_date", "timestamp"),
+        Column("created_at", "timestamp"),
+    ),
+}
+
+@api_router.get("/analytics/export/{table}")
+async def export_analytics_table(
+    table: str,
+    file_format: str = Query("parquet", alias="format", pattern="^(parquet|arrow)$"),
+    current_user: User = Depends(get_current_user)
+):
+    """Download a collection as a Parquet or Arrow IPC file."""
+    if table not in ANALYTICS_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table. Available: {', '.join(ANALYTICS_TABLES)}")
+    if pa is None:
+        raise HTTPException(status_code=501, detail="Columnar export is not available (pyarrow is not installed)")
+    
+    records = list(getattr(db, table).values())
+    content = await run_in_threadpool(export_columnar, ANALYTICS_TABLES[table], records, file_format)
+    extension = "parquet" if file_format == "parquet" else "arrow"
+    return Response(
+        content=content,
+        media_type=COLUMNAR_FORMATS[file_format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{extension}"'},
+    )
+
+# -----------------------------------------------------------------------------
+# LIVE UPDATES (SERVER-SENT EVENTS)
+# -----------------------------------------------------------------------------
+
+@api_router.get("/stream")
+async def stream_changes(request: Request, token: Optional[str] = None):
+    """Stream every write as a Server-Sent Event.
+    
+    EventSource cannot send an Authorization header, so the token may also
+    be passed as ?token=. Clients that fall behind get a "resync" event and
+    should refetch what they display.
+    """
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token or user_from_token(token) is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials"
+        )
     
-    return {
-        "total_calls": total_calls,
-        "completed": completed,
-        "failed": failed,
-        "no_answer": no_answer,
-        "average_duration_seconds": round(avg_duration, 1),
-        "outcomes": outcomes,
-        "success_rate": round((completed / total_calls * 100), 1) if total_calls > 0 else 0,
-    }
+    subscription = change_feed.subscribe()
+    return StreamingResponse(
+        change_feed.stream(subscription, request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 # -----------------------------------------------------------------------------
 # DEMO INFO ROUTES
@@ -1467,8 +3409,16 @@ async def demo_stats():
 @api_router.post("/demo/reset")
 async def reset_demo():
     """Reset demo data."""
+    # Nothing queued before the reset may be dialled, sent or streamed after it
+    runtimes = (voice_dialer, sms_dispatcher, transcript_hub)
+    for runtime in runtimes:
+        await runtime.stop()
+        runtime.clear()
     db.reset()
     populate_demo_data()
+    for runtime in runtimes:
+        runtime.start()
+    change_feed.publish("*", "reset", None)
     return {
         "status": "success",
         "message": "Demo data reset successfully",
@@ -1500,29 +3450,8 @@ async def root():
 app.include_router(api_router)
 
 # Static files - serve frontend for non-API routes (monolithic deployment)
-from fastapi.responses import FileResponse, HTMLResponse
-from fastapi.staticfiles import StaticFiles
-import pathlib
-
-# Try to serve static index.html for root and non-API paths
-@app.get("/", response_class=HTMLResponse)
-async def serve_root():
-    """Serve the frontend index.html for root path."""
-    # Look for index.html in various locations
-    possible_paths = [
-        pathlib.Path(__file__).parent.parent / "standalone-frontend" / "index.html",
-        pathlib.Path(__file__).parent / "standalone-frontend" / "index.html",
-        pathlib.Path("standalone-frontend") / "index.html",
-        pathlib.Path("index.html"),
-    ]
-    
-    for path in possible_paths:
-        if path.exists():
-            with open(path, "r", encoding="utf-8") as f:
-                return HTMLResponse(content=f.read())
-    
-    # Fallback: return simple message if index.html not found
-    return HTMLResponse(content="""
+# Files are read and precompressed once per process by static_assets
+FALLBACK_INDEX_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -1543,24 +3472,51 @@ async def serve_root():
         </div>
     </body>
     </html>
-    """)
+    """
+
+def serve_static_asset(asset: StaticAsset, request: Request) -> Response:
+    """Serve a cached asset, negotiating encoding and answering conditional GETs."""
+    encoding, body = asset.select(request.headers.get("accept-encoding"))
+    headers = {
+        "ETag": asset.etag(encoding),
+        "Cache-Control": asset.cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    
+    if asset.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=asset.media_type, headers=headers)
+
+@app.get("/", response_class=HTMLResponse)
+async def serve_root(request: Request):
+    """Serve the frontend index.html for root path."""
+    asset = static_assets.get("index.html")
+    if asset is None:
+        return HTMLResponse(content=FALLBACK_INDEX_HTML)
+    return serve_static_asset(asset, request)
 
 # Catch-all for other non-API routes (SPA support)
 # This must be defined AFTER all API routes
 @app.get("/{path:path}", response_class=HTMLResponse)
-async def serve_spa(path: str, request):
-    """Serve the frontend for any non-API, non-static path (SPA routing)."""
+async def serve_spa(path: str, request: Request):
+    """Serve frontend files, or index.html for any other non-API path (SPA routing)."""
     # Skip API routes - check the actual request path
     full_path = str(request.url.path)
     if full_path.startswith("/api/"):
         raise HTTPException(status_code=404, detail="Not found")
     
-    # Skip static files (paths with file extensions)
+    # Static files (paths with file extensions) come straight from the cache
     if "." in path and not path.endswith("/"):
-        raise HTTPException(status_code=404, detail="Not found")
+        asset = static_assets.get(path)
+        if asset is None:
+            raise HTTPException(status_code=404, detail="Not found")
+        return serve_static_asset(asset, request)
     
     # Serve index.html for all other routes
-    return await serve_root()
+    return await serve_root(request)
 
 # Error handler
 @app.exception_handler(Exception)
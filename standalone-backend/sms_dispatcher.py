@@ -0,0 +1,407 @@
+"""
+SMS Dispatch Pipeline
+Queues outgoing SMS per provider and sends them in batched gateway calls,
+within each provider's rate limit. Transient failures are retried with
+jittered exponential backoff, and every final outcome is written to
+sms_logs in bulk. Gateways are pluggable; FakeSmsGateway stands in for a
+real provider locally.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+from abc import ABC, abstractmethod
+from collections import deque
+import asyncio
+import heapq
+import inspect
+import itertools
+import logging
+import random
+import re
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Messages waiting per provider before submit() blocks and submit_nowait() refuses
+SMS_QUEUE_SIZE = 10000
+
+# Sends attempted per message before it is logged as failed
+SMS_MAX_ATTEMPTS = 4
+
+# Retry delays are drawn from [0, min(max, base * 2 ** attempts)) seconds
+SMS_BACKOFF_BASE = 1.0
+SMS_BACKOFF_MAX = 60.0
+
+# sms_logs records written per bulk write, and the longest one waits
+SMS_LOG_BATCH_SIZE = 500
+SMS_LOG_INTERVAL = 0.5
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+class SmsMessage:
+    """One outgoing SMS; fields holds extra sms_logs fields such as the sequence execution id."""
+
+    __slots__ = ("id", "to", "body", "convert_id", "provider", "fields", "attempts", "queued_at", "error")
+
+    def __init__(self, to: str, body: str, convert_id: Optional[str] = None, provider: Optional[str] = None,
+                 fields: Optional[Dict[str, Any]] = None):
+        self.id = str(uuid.uuid4())
+        self.to = to
+        self.body = body
+        self.convert_id = convert_id
+        self.provider = provider
+        self.fields = fields
+        self.attempts = 0
+        self.queued_at = time.time()
+        self.error: Optional[str] = None
+
+
+# Outcome of one message in a gateway batch: (provider message id, error, retryable)
+SmsResult = Tuple[Optional[str], Optional[str], bool]
+
+
+class SmsGatewayError(Exception):
+    """A whole gateway call failed; every message in it is retried."""
+
+
+class SmsGateway(ABC):
+    """A provider the dispatcher sends through.
+
+    send_batch takes at most max_batch messages and returns one SmsResult per
+    message, in order. The dispatcher keeps the provider under
+    rate_per_second messages and concurrency calls in flight.
+    """
+
+    name = "gateway"
+    max_batch = 100
+    rate_per_second = 100.0
+    concurrency = 1
+
+    @abstractmethod
+    async def send_batch(self, messages: List[SmsMessage]) -> List[SmsResult]:
+        ...
+
+
+class FakeSmsGateway(SmsGateway):
+    """Local stand-in for an SMS provider: simulated latency, rejected numbers and transient errors."""
+
+    NUMBER = re.compile(r"^\+?\d{10,14}$")
+
+    def __init__(
+        self,
+        name: str = "local",
+        rate_per_second: float = 200.0,
+        max_batch: int = 100,
+        concurrency: int = 4,
+        latency: float = 0.02,
+        per_message_latency: float = 0.0001,
+        failure_rate: float = 0.01,
+        batch_failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.name = name
+        self.rate_per_second = rate_per_second
+        self.max_batch = max_batch
+        self.concurrency = concurrency
+        self.latency = latency
+        self.per_message_latency = per_message_latency
+        self.failure_rate = failure_rate
+        self.batch_failure_rate = batch_failure_rate
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.delivered: List[Tuple[str, str]] = []
+        self._ids = itertools.count(1)
+
+    async def send_batch(self, messages: List[SmsMessage]) -> List[SmsResult]:
+        self.calls += 1
+        await asyncio.sleep(self.latency + self.per_message_latency * len(messages))
+        if self.random.random() < self.batch_failure_rate:
+            raise SmsGatewayError("503 Service Unavailable")
+        results: List[SmsResult] = []
+        for message in messages:
+            if not self.NUMBER.match(message.to.replace(" ", "")):
+                results.append((None, "invalid_number", False))
+            elif self.random.random() < self.failure_rate:
+                results.append((None, "gateway_timeout", True))
+            else:
+                self.delivered.append((message.to, message.body))
+                results.append((f"{self.name}-{next(self._ids)}", None, False))
+        return results
+
+
+class TokenBucket:
+    """Rate limiter allowing rate tokens a second with bursts of up to burst."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    async def acquire(self, tokens: float):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # A batch larger than the burst is let through once the bucket is full
+            if self.tokens >= min(tokens, self.burst):
+                self.tokens -= tokens
+                return
+            await asyncio.sleep((min(tokens, self.burst) - self.tokens) / self.rate)
+
+
+class _Provider:
+    """A gateway with its queue of new messages, retries waiting on backoff and rate limiter."""
+
+    __slots__ = ("gateway", "queue", "retries", "bucket", "wakeup", "space", "in_flight")
+
+    def __init__(self, gateway: SmsGateway):
+        self.gateway = gateway
+        self.queue: Deque[SmsMessage] = deque()
+        # Heap of (retry at, tiebreak, message)
+        self.retries: List[Tuple[float, int, SmsMessage]] = []
+        self.bucket = TokenBucket(gateway.rate_per_second)
+        self.wakeup: Optional[asyncio.Event] = None
+        self.space: Optional[asyncio.Event] = None
+        self.in_flight = 0
+
+
+class SmsDispatcher:
+    """Sends queued SMS through registered gateways in batches, with retries and bulk logging.
+
+    persist receives lists of sms_logs records; it may return an awaitable
+    (e.g. a Mongo bulk write), which the dispatcher waits on.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = SMS_QUEUE_SIZE,
+        max_attempts: int = SMS_MAX_ATTEMPTS,
+        backoff_base: float = SMS_BACKOFF_BASE,
+        backoff_max: float = SMS_BACKOFF_MAX,
+        log_batch_size: int = SMS_LOG_BATCH_SIZE,
+        log_interval: float = SMS_LOG_INTERVAL,
+    ):
+        self.queue_size = queue_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.log_batch_size = log_batch_size
+        self.log_interval = log_interval
+        self.providers: Dict[str, _Provider] = {}
+        self.default_provider: Optional[str] = None
+        self.persist: Optional[Callable[[List[Dict[str, Any]]], Any]] = None
+        self.logs: List[Dict[str, Any]] = []
+        self.counters = {"submitted": 0, "rejected": 0, "sent": 0, "failed": 0, "retried": 0,
+                         "batches": 0, "batch_errors": 0, "log_writes": 0}
+        self.started_at: Optional[float] = None
+        self._sequence = itertools.count()
+        self._log_wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    def register(self, gateway: SmsGateway, default: bool = False):
+        self.providers[gateway.name] = _Provider(gateway)
+        if default or self.default_provider is None:
+            self.default_provider = gateway.name
+
+    def _provider(self, message: SmsMessage) -> _Provider:
+        message.provider = message.provider or self.default_provider
+        return self.providers[message.provider]
+
+    def submit_nowait(self, message: SmsMessage) -> bool:
+        """Queue a message; False when its provider's queue is full."""
+        provider = self._provider(message)
+        if len(provider.queue) >= self.queue_size:
+            self.counters["rejected"] += 1
+            return False
+        provider.queue.append(message)
+        self.counters["submitted"] += 1
+        if provider.wakeup is not None:
+            provider.wakeup.set()
+        return True
+
+    async def submit(self, message: SmsMessage) -> bool:
+        """Queue a message, waiting for room when its provider's queue is full.
+
+        Returns False when the message is rejected: a stopped dispatcher
+        frees no room, so its full queues reject instead of waiting.
+        """
+        provider = self._provider(message)
+        while len(provider.queue) >= self.queue_size and provider.space is not None:
+            provider.space.clear()
+            await provider.space.wait()
+        return self.submit_nowait(message)
+
+    async def submit_many(self, messages: Iterable[SmsMessage]) -> int:
+        """Queue messages in order; returns how many were accepted."""
+        queued = 0
+        for message in messages:
+            queued += await self.submit(message)
+        return queued
+
+    def _take(self, provider: _Provider) -> List[SmsMessage]:
+        """Next batch for a provider: retries that have come due first, then new messages."""
+        size = provider.gateway.max_batch
+        batch = []
+        now = time.time()
+        retries = provider.retries
+        while retries and retries[0][0] <= now and len(batch) < size:
+            batch.append(heapq.heappop(retries)[2])
+        queue = provider.queue
+        while queue and len(batch) < size:
+            batch.append(queue.popleft())
+        if batch and provider.space is not None and len(queue) < self.queue_size:
+            provider.space.set()
+        return batch
+
+    async def _send(self, provider: _Provider):
+        """Gateway worker: one of gateway.concurrency per provider."""
+        gateway = provider.gateway
+        while True:
+            batch = self._take(provider)
+            if not batch:
+                provider.wakeup.clear()
+                timeout = provider.retries[0][0] - time.time() if provider.retries else None
+                try:
+                    await asyncio.wait_for(provider.wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            provider.in_flight += len(batch)
+            try:
+                await provider.bucket.acquire(len(batch))
+                results = await gateway.send_batch(batch)
+            except asyncio.CancelledError:
+                # Put the batch back so it is reported as queued, not lost
+                provider.queue.extendleft(reversed(batch))
+                raise
+            except Exception as e:
+                self.counters["batch_errors"] += 1
+                results = [(None, str(e) or type(e).__name__, True)] * len(batch)
+            finally:
+                provider.in_flight -= len(batch)
+            self.counters["batches"] += 1
+            self._settle(provider, batch, results)
+
+    def _settle(self, provider: _Provider, batch: List[SmsMessage], results: List[SmsResult]):
+        now = time.time()
+        now_iso = None
+        for message, (provider_id, error, retryable) in zip(batch, results):
+            message.attempts += 1
+            if error is not None and retryable and message.attempts < self.max_attempts:
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** message.attempts))
+                message.error = error
+                heapq.heappush(provider.retries, (now + delay, next(self._sequence), message))
+                self.counters["retried"] += 1
+                continue
+            now_iso = now_iso or _iso(now)
+            status = "sent" if error is None else "failed"
+            self.counters[status] += 1
+            record = {
+                "id": message.id,
+                "convert_id": message.convert_id,
+                "to": message.to,
+                "message": message.body,
+                "provider": provider.gateway.name,
+                "provider_message_id": provider_id,
+                "status": status,
+                "error": error,
+                "attempts": message.attempts,
+                "queued_at": _iso(message.queued_at),
+                "created_at": now_iso,
+            }
+            if message.fields:
+                record.update(message.fields)
+            self.logs.append(record)
+        if len(self.logs) >= self.log_batch_size and self._log_wakeup is not None:
+            self._log_wakeup.set()
+
+    async def flush_logs(self):
+        """Write the buffered sms_logs records, log_batch_size per write."""
+        while self.logs:
+            batch, self.logs = self.logs[:self.log_batch_size], self.logs[self.log_batch_size:]
+            if self.persist is None:
+                continue
+            try:
+                result = self.persist(batch)
+                if inspect.isawaitable(result):
+                    await result
+                self.counters["log_writes"] += 1
+            except Exception as e:
+                logger.error(f"Writing {len(batch)} sms_logs records failed: {e}")
+
+    async def _write_logs(self):
+        """Log writer task: flush when a batch is full or log_interval has passed."""
+        while True:
+            self._log_wakeup.clear()
+            try:
+                await asyncio.wait_for(self._log_wakeup.wait(), self.log_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush_logs()
+
+    def start(self):
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        self.started_at = time.time()
+        self._log_wakeup = asyncio.Event()
+        for provider in self.providers.values():
+            provider.wakeup = asyncio.Event()
+            provider.space = asyncio.Event()
+            for _ in range(provider.gateway.concurrency):
+                self._tasks.append(loop.create_task(self._send(provider)))
+        self._tasks.append(loop.create_task(self._write_logs()))
+
+    def pending(self) -> int:
+        return sum(len(p.queue) + len(p.retries) + p.in_flight for p in self.providers.values())
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Wait until every queued message and retry has settled and been logged."""
+        deadline = None if timeout is None else time.time() + timeout
+        while self.pending() and (deadline is None or time.time() < deadline):
+            await asyncio.sleep(0.01)
+        await self.flush_logs()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.flush_logs()
+        for provider in self.providers.values():
+            provider.wakeup = provider.space = None
+        self._log_wakeup = None
+
+    def clear(self):
+        """Drop every queued message, pending retry and unwritten log record, e.g. on a data reset; call while stopped."""
+        for provider in self.providers.values():
+            provider.queue.clear()
+            provider.retries = []
+        self.logs = []
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = time.time() - self.started_at if self.started_at else 0.0
+        return {
+            **self.counters,
+            "sent_per_second": round(self.counters["sent"] / elapsed, 1) if elapsed else 0.0,
+            "unlogged": len(self.logs),
+            "providers": {
+                name: {
+                    "queued": len(provider.queue),
+                    "retrying": len(provider.retries),
+                    "in_flight": provider.in_flight,
+                    "rate_per_second": provider.gateway.rate_per_second,
+                    "max_batch": provider.gateway.max_batch,
+                }
+                for name, provider in self.providers.items()
+            },
+        }
+
+
+sms_dispatcher = SmsDispatcher()
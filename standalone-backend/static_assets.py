@@ -0,0 +1,163 @@
+"""
+Static Asset Cache for the Standalone Demo
+Loads the frontend files once, precompresses them and serves them with
+strong ETags so repeat page loads can be answered with 304s.
+"""
+
+from typing import Dict, List, Optional, Tuple
+from pathlib import Path
+import gzip
+import hashlib
+import logging
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Directories searched for the frontend, in order of preference
+FRONTEND_DIRS = [
+    Path(__file__).parent.parent / "standalone-frontend",
+    Path(__file__).parent / "standalone-frontend",
+    Path("standalone-frontend"),
+    Path("."),
+]
+
+# Only these file types are served; editor backups such as app.js.backup are not
+SERVED_EXTENSIONS = {
+    ".html": "text/html; charset=utf-8",
+    ".js": "application/javascript; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".svg": "image/svg+xml",
+    ".ico": "image/x-icon",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".webp": "image/webp",
+    ".woff2": "font/woff2",
+}
+
+# Already-compressed formats gain nothing from gzip/brotli
+COMPRESSIBLE_EXTENSIONS = {".html", ".js", ".css", ".svg"}
+
+# index.html is not fingerprinted, so browsers must revalidate it on every load
+HTML_CACHE_CONTROL = "no-cache"
+ASSET_CACHE_CONTROL = "public, max-age=3600"
+
+
+class StaticAsset:
+    """A single frontend file held in memory with its encoded variants."""
+
+    def __init__(self, name: str, content: bytes, media_type: str, compressible: bool):
+        self.name = name
+        self.media_type = media_type
+        self.digest = hashlib.sha256(content).hexdigest()[:20]
+        self.cache_control = HTML_CACHE_CONTROL if name.endswith(".html") else ASSET_CACHE_CONTROL
+
+        # encoding -> body; only keep variants that are actually smaller
+        self.variants: Dict[str, bytes] = {"identity": content}
+        if compressible:
+            gzipped = gzip.compress(content, compresslevel=9, mtime=0)
+            if len(gzipped) < len(content):
+                self.variants["gzip"] = gzipped
+            if brotli is not None:
+                brotlied = brotli.compress(content, quality=11)
+                if len(brotlied) < len(content):
+                    self.variants["br"] = brotlied
+
+    def etag(self, encoding: str) -> str:
+        """Strong ETag for one representation of the asset."""
+        if encoding == "identity":
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{encoding}"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Whether an If-None-Match header refers to any representation of this asset."""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*":
+                return True
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag.strip('"').split("-", 1)[0] == self.digest:
+                return True
+        return False
+
+    def select(self, accept_encoding: Optional[str]) -> Tuple[str, bytes]:
+        """Pick the best encoding the client accepts."""
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and accepted.get(encoding, 0) > 0:
+                return encoding, self.variants[encoding]
+        return "identity", self.variants["identity"]
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q}."""
+    accepted: Dict[str, float] = {}
+    if not header:
+        return accepted
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    if "*" in accepted:
+        for coding in ("br", "gzip"):
+            accepted.setdefault(coding, accepted["*"])
+    return accepted
+
+
+class StaticAssetCache:
+    """In-memory cache of the frontend directory, loaded once per process."""
+
+    def __init__(self, directories: Optional[List[Path]] = None):
+        self.directories = directories or FRONTEND_DIRS
+        self.assets: Dict[str, StaticAsset] = {}
+        self.root: Optional[Path] = None
+        self.loaded = False
+
+    def load(self):
+        """Read and precompress every servable file from the first frontend directory found."""
+        self.assets = {}
+        self.root = None
+        for directory in self.directories:
+            if (directory / "index.html").is_file():
+                self.root = directory.resolve()
+                break
+
+        if self.root is not None:
+            for path in sorted(self.root.iterdir()):
+                suffix = path.suffix.lower()
+                if not path.is_file() or suffix not in SERVED_EXTENSIONS:
+                    continue
+                self.assets[path.name] = StaticAsset(
+                    path.name,
+                    path.read_bytes(),
+                    SERVED_EXTENSIONS[suffix],
+                    suffix in COMPRESSIBLE_EXTENSIONS,
+                )
+            logger.info(f"Loaded {len(self.assets)} static assets from {self.root}")
+        else:
+            logger.warning("Frontend directory not found; serving fallback page")
+
+        self.loaded = True
+
+    def get(self, name: str) -> Optional[StaticAsset]:
+        if not self.loaded:
+            self.load()
+        return self.assets.get(name)
+
+
+static_assets = StaticAssetCache()
@@ -0,0 +1,116 @@
+"""
+Hierarchical Timing Wheel
+Schedules timers in O(1) and fires them in O(1) per timer, however many are
+pending. Level 0 has one slot per tick; each higher level has slots as wide
+as a whole turn of the level below and is cascaded down one slot at a time
+as the wheel turns, so every timer moves down at most once per level.
+"""
+
+from typing import Any, List, Tuple
+
+# Slots per level; with 1 second ticks the levels span ~4 minutes, ~4.5 hours,
+# ~12 days and ~2 years. Timers further out wait in the top level and are
+# re-placed each time its slot comes round.
+WHEEL_LEVELS = (256, 64, 64, 64)
+
+
+class TimingWheel:
+    """Timers keyed by due time (seconds), fired by advance(now).
+
+    Entries are (due tick, item) tuples. There is no cancel: callers mark
+    an item dead and skip it when it fires, as with a lazily pruned heap.
+    """
+
+    def __init__(self, tick_seconds: float = 1.0, start: float = 0.0, levels: Tuple[int, ...] = WHEEL_LEVELS):
+        self.tick_seconds = tick_seconds
+        self.sizes = levels
+        self.widths = []
+        width = 1
+        for size in levels:
+            self.widths.append(width)
+            width *= size
+        self.span = width
+        # (level, slot width, ticks the level reaches ahead of base) above level 0
+        self._upper = [(level, self.widths[level], self.widths[level] * levels[level]) for level in range(1, len(levels))]
+        self.slots: List[List[List[Tuple[int, Any]]]] = [[[] for _ in range(size)] for size in levels]
+        # Next tick to process; everything due before it has fired
+        self.base = int(start // tick_seconds)
+        # Timers scheduled for ticks already processed, fired by the next advance
+        self.ready: List[Any] = []
+        self.size = 0
+        # Timers in level 0, so stretches with nothing to fire are skipped whole
+        self.bottom = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def tick_of(self, when: float) -> int:
+        return int(when // self.tick_seconds)
+
+    def schedule(self, when: float, item: Any):
+        """Add a timer; one already due fires on the next advance."""
+        self.size += 1
+        due = int(when // self.tick_seconds)
+        if due < self.base:
+            self.ready.append(item)
+        else:
+            self._place(due, item)
+
+    def _place(self, due: int, item: Any):
+        offset = due - self.base
+        first_size = self.sizes[0]
+        if offset < first_size:
+            self.slots[0][due % first_size].append((due, item))
+            self.bottom += 1
+            return
+        for level, width, reach in self._upper:
+            if offset < reach:
+                self.slots[level][(due // width) % self.sizes[level]].append((due, item))
+                return
+        # Beyond the top level: park it in the top level slot that comes round last
+        level = len(self.sizes) - 1
+        self.slots[level][((self.base + self.span - 1) // self.widths[level]) % self.sizes[level]].append((due, item))
+
+    def _cascade(self, level: int):
+        """Move the slot of a level that starts at base down into the levels below it."""
+        slot = self.slots[level]
+        index = (self.base // self.widths[level]) % self.sizes[level]
+        entries, slot[index] = slot[index], []
+        for due, item in entries:
+            self._place(due, item)
+
+    def advance(self, now: float) -> List[Any]:
+        """Remove and return the items of every timer due at or before now, in due order."""
+        target = int(now // self.tick_seconds)
+        fired, self.ready = self.ready, []
+        self.size -= len(fired)
+        first_size = self.sizes[0]
+        bottom_slots = self.slots[0]
+        while self.base <= target and self.size:
+            index = self.base % first_size
+            if index == 0:
+                # Start of a new turn of level 0: refill it from level 1, and so on up
+                for level in range(1, len(self.sizes)):
+                    self._cascade(level)
+                    if (self.base // self.widths[level]) % self.sizes[level]:
+                        break
+            if not self.bottom:
+                # Nothing left in this turn of level 0; jump to the next one
+                self.base = min(self.base - index + first_size, target + 1)
+                continue
+            bucket = bottom_slots[index]
+            if bucket:
+                bottom_slots[index] = []
+                self.bottom -= len(bucket)
+                for due, item in bucket:
+                    if due > self.base:
+                        # Parked beyond the top level; not due yet
+                        self._place(due, item)
+                        continue
+                    fired.append(item)
+                    self.size -= 1
+            self.base += 1
+        # Nothing left to cascade: skip the empty ticks
+        if not self.size:
+            self.base = max(self.base, target + 1)
+        return fired
@@ -0,0 +1,359 @@
+"""
+Voice Call Dialer
+Places queued voice calls in scheduled_time order over a fixed number of
+lines. A convert has at most one call queued or on a line at a time;
+calls that go unanswered or fail are redialled after a backoff. Calls are
+placed through a pluggable telephony backend; SimulatedTelephony stands
+in for a real one locally.
+"""
+
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+# Calls on the line at once
+DIALER_LINES = 4
+
+# Dial attempts per call, and the wait before the first redial (doubling after that)
+DIALER_MAX_ATTEMPTS = 3
+DIALER_RETRY_DELAY = 300.0
+
+# Call outcomes that are redialled while attempts remain
+RETRY_STATUSES = frozenset({"no_answer", "failed"})
+
+# Longest the dialer sleeps before looking at the queue again
+MAX_DIALER_SLEEP = 60.0
+
+# Turns of an answered simulated call, spoken one by one over its talk time
+SIMULATED_CONVERSATION = (
+    ("agent", "Hello, this is Dependify Gospel Centre. Do you have a moment to talk?"),
+    ("convert", "Yes, I do. Who is this?"),
+    ("agent", "We wanted to check on you and invite you to our service this Sunday at 10 AM."),
+    ("convert", "Thank you for calling, I'll try to be there."),
+    ("agent", "Wonderful. Is there anything we can pray with you about?"),
+    ("convert", "Please pray for my family. Thank you."),
+    ("agent", "We will. God bless you, and see you on Sunday!"),
+)
+
+
+def scheduled_epoch(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds of an ISO 8601 scheduled_time; naive times are taken as UTC."""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class DialRequest:
+    """A call waiting for, or on, a line."""
+
+    __slots__ = ("call_id", "convert_id", "phone", "due", "attempts", "state", "started")
+
+    def __init__(self, call_id: str, convert_id: str, phone: Optional[str], due: float, attempts: int = 0):
+        self.call_id = call_id
+        self.convert_id = convert_id
+        self.phone = phone
+        self.due = due
+        self.attempts = attempts
+        # "queued", "dialing", "done" or "cancelled"
+        self.state = "queued"
+        self.started: Optional[float] = None
+
+
+class TelephonyBackend(ABC):
+    """Places calls for the dialer.
+
+    dial returns the call's result: {"status": "completed" | "voicemail" |
+    "no_answer" | "failed", "duration_seconds", "transcript", "outcome"}.
+    While a call is answered, each spoken turn is passed to
+    on_message(request, speaker, text) as it happens.
+    """
+
+    name = "telephony"
+    on_message: Optional[Callable[[DialRequest, str, str], None]] = None
+
+    @abstractmethod
+    async def dial(self, request: DialRequest) -> Dict[str, Any]:
+        ...
+
+
+class SimulatedTelephony(TelephonyBackend):
+    """Local stand-in for a telephony provider: rings, then answers, goes to voicemail or fails."""
+
+    name = "simulator"
+
+    def __init__(
+        self,
+        answer_rate: float = 0.7,
+        voicemail_rate: float = 0.1,
+        failure_rate: float = 0.05,
+        ring_seconds: Tuple[float, float] = (1.0, 2.0),
+        talk_seconds: Tuple[float, float] = (2.0, 4.0),
+        seed: Optional[int] = None,
+    ):
+        self.answer_rate = answer_rate
+        self.voicemail_rate = voicemail_rate
+        self.failure_rate = failure_rate
+        self.ring_seconds = ring_seconds
+        self.talk_seconds = talk_seconds
+        self.random = random.Random(seed)
+
+    async def dial(self, request: DialRequest) -> Dict[str, Any]:
+        roll = self.random.random()
+        await asyncio.sleep(self.random.uniform(*self.ring_seconds))
+        if not request.phone or roll < self.failure_rate:
+            return {"status": "failed", "duration_seconds": 0, "transcript": None, "outcome": None}
+        if roll < self.failure_rate + self.answer_rate:
+            pause = self.random.uniform(*self.talk_seconds) / len(SIMULATED_CONVERSATION)
+            for speaker, text in SIMULATED_CONVERSATION:
+                await asyncio.sleep(pause)
+                if self.on_message is not None:
+                    self.on_message(request, speaker, text)
+            return {
+                "status": "completed",
+                # Talk time is compressed for the demo; report a realistic call length
+                "duration_seconds": self.random.randint(120, 600),
+                "transcript": " ".join(text for _, text in SIMULATED_CONVERSATION),
+                "outcome": self.random.choice(["interested", "interested", "callback_requested", "not_interested"]),
+            }
+        if roll < self.failure_rate + self.answer_rate + self.voicemail_rate:
+            return {"status": "voicemail", "duration_seconds": self.random.randint(20, 40),
+                    "transcript": None, "outcome": "voicemail"}
+        return {"status": "no_answer", "duration_seconds": 0, "transcript": None, "outcome": None}
+
+
+class VoiceDialer:
+    """Priority queue of calls by due time, dialled over a fixed number of lines.
+
+    on_dial(request) is called as a call goes on a line; on_result(request,
+    result, retry_at) when it ends, with retry_at the time of the redial or
+    None when the call is finished. retry_time(request, when), if set, may
+    move a redial later, e.g. into calling hours.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[TelephonyBackend] = None,
+        lines: int = DIALER_LINES,
+        max_attempts: int = DIALER_MAX_ATTEMPTS,
+        retry_delay: float = DIALER_RETRY_DELAY,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.backend = backend or SimulatedTelephony()
+        self.lines = lines
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.clock = clock
+        # Heap of (due, tiebreak, request); cancelled or rescheduled entries are skipped when popped
+        self.queue: List[Tuple[float, int, DialRequest]] = []
+        self.requests: Dict[str, DialRequest] = {}
+        # Convert id -> its queued or dialling call, so nobody is called twice at once
+        self.by_convert: Dict[str, DialRequest] = {}
+        self.busy = 0
+        self.on_dial: Optional[Callable[[DialRequest], None]] = None
+        self.on_result: Optional[Callable[[DialRequest, Dict[str, Any], Optional[float]], None]] = None
+        self.retry_time: Optional[Callable[[DialRequest, float], float]] = None
+        self.counters = {"queued": 0, "deduplicated": 0, "dialed": 0, "completed": 0, "voicemail": 0,
+                         "no_answer": 0, "failed": 0, "retried": 0, "cancelled": 0}
+        self.busy_seconds = 0.0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.started_at: Optional[float] = None
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    def enqueue(self, call_id: str, convert_id: str, phone: Optional[str], when: Optional[float] = None,
+                attempts: int = 0) -> Optional[DialRequest]:
+        """Queue a call for when (now if None); returns the convert's pending call instead if it has one."""
+        existing = self.by_convert.get(convert_id)
+        if existing is not None:
+            self.counters["deduplicated"] += 1
+            return existing
+        request = DialRequest(call_id, convert_id, phone, when if when is not None else self.clock(), attempts)
+        self.requests[call_id] = request
+        self.by_convert[convert_id] = request
+        self._push(request)
+        self.counters["queued"] += 1
+        return request
+
+    def load(self, calls: Iterable[Dict[str, Any]], phones: Callable[[str], Optional[str]]):
+        """Replace the queue with stored scheduled calls; a call cut off mid-dial is placed again."""
+        self.queue = []
+        self.requests = {call_id: r for call_id, r in self.requests.items() if r.state == "dialing"}
+        self.by_convert = {r.convert_id: r for r in self.requests.values()}
+        for call in sorted(calls, key=lambda call: call.get("scheduled_time") or ""):
+            if call.get("status") in ("scheduled", "in_progress"):
+                self.enqueue(call["id"], call["convert_id"], phones(call["convert_id"]),
+                             scheduled_epoch(call.get("scheduled_time")), call.get("attempts", 0))
+
+    def _push(self, request: DialRequest):
+        heapq.heappush(self.queue, (request.due, next(self._sequence), request))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def pending_for(self, convert_id: str) -> Optional[DialRequest]:
+        return self.by_convert.get(convert_id)
+
+    def cancel(self, call_id: str) -> bool:
+        """Drop a queued call; one already on the line is left to finish."""
+        request = self.requests.get(call_id)
+        if request is None or request.state != "queued":
+            return False
+        self._release(request, "cancelled")
+        self.counters["cancelled"] += 1
+        return True
+
+    def cancel_convert(self, convert_id: str) -> bool:
+        request = self.by_convert.get(convert_id)
+        return request is not None and self.cancel(request.call_id)
+
+    def _release(self, request: DialRequest, state: str):
+        request.state = state
+        self.requests.pop(request.call_id, None)
+        if self.by_convert.get(request.convert_id) is request:
+            del self.by_convert[request.convert_id]
+
+    def _pop_due(self, now: float) -> Optional[DialRequest]:
+        queue = self.queue
+        while queue and queue[0][0] <= now:
+            due, _, request = heapq.heappop(queue)
+            if request.state == "queued" and request.due == due:
+                return request
+        return None
+
+    def dial_due(self) -> int:
+        """Put due calls on free lines; returns how many were placed."""
+        now = self.clock()
+        placed = 0
+        while self.busy < self.lines:
+            request = self._pop_due(now)
+            if request is None:
+                break
+            wait = now - request.due
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            request.state = "dialing"
+            request.started = now
+            request.attempts += 1
+            self.busy += 1
+            self.counters["dialed"] += 1
+            if self.on_dial is not None:
+                self.on_dial(request)
+            self._calls[request.call_id] = asyncio.get_running_loop().create_task(self._call(request))
+            placed += 1
+        return placed
+
+    async def _call(self, request: DialRequest):
+        try:
+            result = await self.backend.dial(request)
+        except asyncio.CancelledError:
+            # Shutting down: the call goes back on the queue as it was
+            request.state = "queued"
+            request.attempts -= 1
+            self._push(request)
+            raise
+        except Exception as e:
+            logger.error(f"Dialing call {request.call_id} failed: {e}")
+            result = {"status": "failed", "duration_seconds": 0, "transcript": None, "outcome": None, "error": str(e)}
+        finally:
+            self.busy -= 1
+            self.busy_seconds += self.clock() - request.started
+            self._calls.pop(request.call_id, None)
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+        status = result["status"]
+        self.counters[status] = self.counters.get(status, 0) + 1
+        retry_at = None
+        if status in RETRY_STATUSES and request.attempts < self.max_attempts:
+            retry_at = self.clock() + self.retry_delay * 2 ** (request.attempts - 1)
+            if self.retry_time is not None:
+                try:
+                    retry_at = max(retry_at, self.retry_time(request, retry_at))
+                except Exception as e:
+                    logger.error(f"Planning the redial of call {request.call_id} failed: {e}")
+            request.state = "queued"
+            request.due = retry_at
+            self._push(request)
+            self.counters["retried"] += 1
+        else:
+            self._release(request, "done")
+        if self.on_result is not None:
+            try:
+                self.on_result(request, result, retry_at)
+            except Exception as e:
+                logger.error(f"Recording call {request.call_id} failed: {e}")
+
+    async def run(self):
+        """Dialer task: fill free lines with due calls, then wait for a line or the next due call."""
+        self._wakeup = asyncio.Event()
+        while True:
+            self._wakeup.clear()
+            try:
+                self.dial_due()
+            except Exception as e:
+                logger.error(f"Dialer failed: {e}")
+            timeout = MAX_DIALER_SLEEP
+            if self.busy < self.lines and self.queue:
+                timeout = min(timeout, max(self.queue[0][0] - self.clock(), 0.0))
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self.started_at = self.clock()
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        tasks = list(self._calls.values())
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._wakeup = None
+
+    def clear(self):
+        """Forget every queued call, e.g. on a data reset; call while stopped (stop() requeues calls on a line)."""
+        self.queue = []
+        self.requests = {}
+        self.by_convert = {}
+
+    def report(self) -> Dict[str, Any]:
+        now = self.clock()
+        elapsed = now - self.started_at if self.started_at else 0.0
+        on_line = sum(now - self._started(call_id) for call_id in self._calls)
+        queued = [request for request in self.requests.values() if request.state == "queued"]
+        return {
+            **self.counters,
+            "backend": self.backend.name,
+            "lines": self.lines,
+            "lines_busy": self.busy,
+            "line_utilization": round((self.busy_seconds + on_line) / (self.lines * elapsed), 3) if elapsed else 0.0,
+            "queue_depth": len(queued),
+            "overdue": sum(1 for request in queued if request.due <= now),
+            "average_wait_seconds": round(self.wait_total / self.counters["dialed"], 2) if self.counters["dialed"] else 0.0,
+            "max_wait_seconds": round(self.wait_max, 2),
+        }
+
+    def _started(self, call_id: str) -> float:
+        request = self.requests.get(call_id)
+        return request.started if request is not None and request.started is not None else self.clock()
+
+
+voice_dialer = VoiceDialer()
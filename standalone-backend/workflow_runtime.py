@@ -0,0 +1,330 @@
+"""
+Workflow Execution Runtime
+Starts an execution of every active workflow whose trigger matches a convert
+event and runs its steps in order. Delayed steps wait in one timer heap
+shared by all executions and drained by a single asyncio task, so a pending
+execution costs a heap entry instead of a sleeping task of its own.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Workflows seeded into workflow_definitions. delay_hours counts from the
+# moment the execution started.
+DEFAULT_WORKFLOWS = [
+    {
+        "name": "New Convert Onboarding",
+        "description": "Automated workflow for welcoming and onboarding new converts",
+        "trigger": "convert_created",
+        "steps": [
+            {"step": 1, "action": "send_welcome_sms", "delay_hours": 0},
+            {"step": 2, "action": "assign_followup_worker", "delay_hours": 2},
+            {"step": 3, "action": "send_followup_email", "delay_hours": 24},
+            {"step": 4, "action": "create_followup_task", "delay_hours": 48},
+            {"step": 5, "action": "schedule_call", "delay_hours": 72},
+        ],
+        "is_active": True,
+    },
+    {
+        "name": "Absent Member Recovery",
+        "description": "Workflow for re-engaging absent members",
+        "trigger": "no_attendance_14_days",
+        "steps": [
+            {"step": 1, "action": "send_care_sms", "delay_hours": 0},
+            {"step": 2, "action": "create_welfare_task", "delay_hours": 24},
+            {"step": 3, "action": "pastor_call", "delay_hours": 72},
+            {"step": 4, "action": "home_visit", "delay_hours": 168},
+        ],
+        "is_active": True,
+    },
+    {
+        "name": "Baptism Preparation",
+        "description": "Workflow to prepare converts for water baptism",
+        "trigger": "baptism_interest",
+        "steps": [
+            {"step": 1, "action": "enroll_baptism_class", "delay_hours": 0},
+            {"step": 2, "action": "send_class_reminder", "delay_hours": 48},
+            {"step": 3, "action": "schedule_baptism", "delay_hours": 168},
+            {"step": 4, "action": "send_confirmation", "delay_hours": 336},
+        ],
+        "is_active": True,
+    },
+]
+
+# Due steps run per batch before the timer task yields to the event loop
+WORKFLOW_BATCH_SIZE = 1000
+
+# Longest the timer task sleeps before looking at the heap again
+MAX_TIMER_SLEEP = 60.0
+
+HOUR_SECONDS = 3600.0
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp is not None else None
+
+
+def _epoch(value: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+class WorkflowExecution:
+    """One run of a workflow for one convert."""
+
+    __slots__ = ("id", "workflow_id", "convert_id", "trigger", "step", "status",
+                 "started_at", "started_iso", "due", "finished_at", "history")
+
+    def __init__(self, workflow_id: str, convert_id: str, trigger: str, started_at: float,
+                 execution_id: Optional[str] = None):
+        self.id = execution_id or str(uuid.uuid4())
+        self.workflow_id = workflow_id
+        self.convert_id = convert_id
+        self.trigger = trigger
+        # Index into the definition's steps of the next step to run
+        self.step = 0
+        self.status = "running"
+        self.started_at = started_at
+        self.started_iso = _iso(started_at)
+        self.due: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # (step number, action, status, result, ran at ISO time) per step run,
+        # formatted once since executions are serialized after every step
+        self.history: List[Tuple[int, str, str, Any, str]] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "workflow_id": self.workflow_id,
+            "convert_id": self.convert_id,
+            "trigger": self.trigger,
+            "status": self.status,
+            "current_step": self.step,
+            "next_run_at": _iso(self.due) if self.status == "running" else None,
+            "started_at": self.started_iso,
+            "finished_at": _iso(self.finished_at),
+            "steps": [
+                {"step": step, "action": action, "status": status, "result": result, "ran_at": ran_at}
+                for step, action, status, result, ran_at in self.history
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "WorkflowExecution":
+        execution = cls(record["workflow_id"], record["convert_id"], record.get("trigger"),
+                        _epoch(record["started_at"]), record["id"])
+        execution.step = record.get("current_step", 0)
+        execution.status = record.get("status", "running")
+        execution.due = _epoch(record.get("next_run_at"))
+        execution.finished_at = _epoch(record.get("finished_at"))
+        execution.history = [
+            (s["step"], s["action"], s["status"], s.get("result"), s["ran_at"])
+            for s in record.get("steps", ())
+        ]
+        return execution
+
+
+class WorkflowRuntime:
+    """Matches convert events to workflow triggers and drives executions off one timer heap.
+
+    Step actions are plain callables registered with register(); each gets
+    (execution, step) and returns a result stored on the execution. Every
+    batch of changed executions is handed to persist.
+    """
+
+    def __init__(
+        self,
+        hour_seconds: float = HOUR_SECONDS,
+        batch_size: int = WORKFLOW_BATCH_SIZE,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.hour_seconds = hour_seconds
+        self.batch_size = batch_size
+        self.clock = clock
+        self.definitions: Dict[str, Dict[str, Any]] = {}
+        self.by_trigger: Dict[str, List[Dict[str, Any]]] = {}
+        # (workflow id, convert id) -> running execution, so a trigger never doubles up.
+        # Finished executions live only in storage.
+        self.running: Dict[Tuple[str, str], WorkflowExecution] = {}
+        # (due, tiebreak, execution); entries whose due no longer matches are stale and skipped
+        self.timers: List[Tuple[float, int, WorkflowExecution]] = []
+        self.actions: Dict[str, Callable[[WorkflowExecution, Dict[str, Any]], Any]] = {}
+        self.persist: Optional[Callable[[List[WorkflowExecution]], None]] = None
+        self.counters = {"started": 0, "steps_run": 0, "steps_failed": 0, "completed": 0, "cancelled": 0}
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, action: str, handler: Callable[[WorkflowExecution, Dict[str, Any]], Any]):
+        self.actions[action] = handler
+
+    def load(self, definitions: Iterable[Dict[str, Any]], executions: Iterable[Dict[str, Any]] = ()):
+        """Replace the definitions and resume persisted executions that were still running."""
+        self.definitions = {definition["id"]: definition for definition in definitions}
+        self.by_trigger = {}
+        for definition in self.definitions.values():
+            if definition.get("is_active", True):
+                self.by_trigger.setdefault(definition["trigger"], []).append(definition)
+        self.running, self.timers = {}, []
+        for record in executions:
+            if record.get("status") == "running" and record["workflow_id"] in self.definitions:
+                execution = WorkflowExecution.from_dict(record)
+                self.running[(execution.workflow_id, execution.convert_id)] = execution
+                self._schedule(execution)
+        self._wake()
+
+    def trigger(self, event: str, convert_ids: Iterable[str]) -> List[WorkflowExecution]:
+        """Start the workflows triggered by event for each convert; returns the new executions."""
+        definitions = self.by_trigger.get(event)
+        if not definitions:
+            return []
+        now = self.clock()
+        started = []
+        for convert_id in convert_ids:
+            for definition in definitions:
+                key = (definition["id"], convert_id)
+                if key in self.running:
+                    continue
+                execution = WorkflowExecution(definition["id"], convert_id, event, now)
+                self.running[key] = execution
+                self._schedule(execution)
+                started.append(execution)
+
+        if started:
+            self.counters["started"] += len(started)
+            self._flush(started)
+            self._wake()
+        return started
+
+    def cancel(self, convert_id: str) -> List[WorkflowExecution]:
+        """Stop every running execution for a convert (e.g. when it is deleted)."""
+        cancelled = []
+        for workflow_id in self.definitions:
+            execution = self.running.pop((workflow_id, convert_id), None)
+            if execution is not None:
+                self._finish(execution, "cancelled")
+                cancelled.append(execution)
+        if cancelled:
+            self.counters["cancelled"] += len(cancelled)
+            self._flush(cancelled)
+        return cancelled
+
+    def _schedule(self, execution: WorkflowExecution):
+        step = self.definitions[execution.workflow_id]["steps"][execution.step]
+        execution.due = execution.started_at + step.get("delay_hours", 0) * self.hour_seconds
+        heapq.heappush(self.timers, (execution.due, next(self._sequence), execution))
+
+    def _finish(self, execution: WorkflowExecution, status: str):
+        execution.status = status
+        execution.due = None
+        execution.finished_at = self.clock()
+
+    def run_due(self, limit: Optional[int] = None) -> int:
+        """Run steps whose time has come, at most limit of them; returns how many ran."""
+        now = self.clock()
+        now_iso = None
+        timers = self.timers
+        changed: Dict[str, WorkflowExecution] = {}
+        ran = 0
+        while timers and timers[0][0] <= now and (limit is None or ran < limit):
+            due, _, execution = heapq.heappop(timers)
+            if execution.status != "running" or execution.due != due:
+                continue
+            now_iso = now_iso or _iso(now)
+            self._run_step(execution, now, now_iso)
+            changed[execution.id] = execution
+            ran += 1
+
+        if changed:
+            self._flush(list(changed.values()))
+        return ran
+
+    def _run_step(self, execution: WorkflowExecution, now: float, now_iso: str):
+        steps = self.definitions[execution.workflow_id]["steps"]
+        step = steps[execution.step]
+        lag = now - execution.due
+        self.lag_total += lag
+        self.lag_max = max(self.lag_max, lag)
+        self.counters["steps_run"] += 1
+
+        handler = self.actions.get(step["action"])
+        try:
+            result = handler(execution, step) if handler is not None else None
+        except Exception as e:
+            logger.error(f"Workflow step {step['action']} failed for execution {execution.id}: {e}")
+            execution.history.append((step["step"], step["action"], "failed", str(e), now_iso))
+            self.counters["steps_failed"] += 1
+            self.running.pop((execution.workflow_id, execution.convert_id), None)
+            self._finish(execution, "failed")
+            return
+
+        execution.history.append((step["step"], step["action"], "completed", result, now_iso))
+        execution.step += 1
+        if execution.step < len(steps):
+            self._schedule(execution)
+        else:
+            self.running.pop((execution.workflow_id, execution.convert_id), None)
+            self._finish(execution, "completed")
+            self.counters["completed"] += 1
+
+    def _flush(self, executions: List[WorkflowExecution]):
+        if self.persist is not None:
+            self.persist(executions)
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def run(self):
+        """Timer task: drain due steps in batches, then sleep until the next one is due."""
+        self._wakeup = asyncio.Event()
+        while True:
+            if self.run_due(self.batch_size) >= self.batch_size:
+                # More may be due; let requests in first
+                await asyncio.sleep(0)
+                continue
+            self._wakeup.clear()
+            timeout = MAX_TIMER_SLEEP
+            if self.timers:
+                timeout = min(max(self.timers[0][0] - self.clock(), 0.0), MAX_TIMER_SLEEP)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wakeup = None
+
+    def report(self) -> Dict[str, Any]:
+        steps_run = self.counters["steps_run"]
+        return {
+            **self.counters,
+            "running": len(self.running),
+            "pending_timers": len(self.timers),
+            "next_due_at": _iso(self.timers[0][0]) if self.timers else None,
+            "mean_lag_ms": round(self.lag_total / steps_run * 1000, 3) if steps_run else 0.0,
+            "max_lag_ms": round(self.lag_max * 1000, 3),
+        }
+
+
+workflow_runtime = WorkflowRuntime()
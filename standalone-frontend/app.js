@@ -272,18 +272,24 @@ function Dashboard() {
     
     useEffect(() => {
         loadDashboard();
+        
+        // Live updates: refetch (at most once a second) whenever the server reports a change
+        let pending = null;
+        const scheduleReload = () => {
+            if (!pending) pending = setTimeout(() => { pending = null; loadDashboard(); }, 1000);
+        };
+        const events = new EventSource(`${API_URL}/stream?token=${encodeURIComponent(localStorage.getItem('token'))}`);
+        events.addEventListener('change', scheduleReload);
+        events.addEventListener('resync', scheduleReload);
+        return () => { events.close(); clearTimeout(pending); };
     }, []);
     
     const loadDashboard = async () => {
         try {
-            const [statsData, stageData, activityData] = await Promise.all([
-                api.get('/dashboard/stats'),
-                api.get('/dashboard/stage-distribution'),
-                api.get('/dashboard/recent-activity')
-            ]);
-            setStats(statsData);
-            setStageDist(stageData);
-            setRecentActivity(activityData);
+            const overview = await api.get('/dashboard/overview');
+            setStats(overview.stats);
+            setStageDist(overview.stage_distribution);
+            setRecentActivity(overview.recent_activity);
         } catch (err) {
             console.error('Error loading dashboard:', err);
         } finally {